@@ -42,19 +42,19 @@ def _get_library_path() -> str:
 
     return str(lib_path)
 
-# 延迟加载库（仅在macOS平台需要时加载）
+# 延迟加载库（仅在需要时加载）
 _lib = None
 
 def _ensure_library_loaded():
-    """确保库已加载（仅macOS平台）。"""
+    """确保库已加载（macOS / Linux / Windows）。"""
     global _lib
 
-    # 检查是否为macOS平台
+    # 检查平台：AEC 在 macOS/Linux 使用本库（Windows 使用系统级AEC），
+    # 录音预处理（降噪/自动增益等）在各平台都使用本库
     system = platform.system().lower()
-    if system != 'darwin':
+    if system not in ('darwin', 'linux', 'windows'):
         raise RuntimeError(
-            f"WebRTC APM library is only supported on macOS, current platform: {system}. "
-            f"Windows and Linux should use system-level AEC instead."
+            f"WebRTC APM library is not supported on current platform: {system}"
         )
 
     # 如果已加载，直接返回
@@ -283,7 +283,7 @@ class WebRTCAudioProcessing:
 
     def __init__(self):
         """初始化音频处理模块。"""
-        # 确保库已加载（仅macOS）
+        # 确保库已加载（macOS/Linux）
         _ensure_library_loaded()
         _init_function_signatures()
 
@@ -293,8 +293,13 @@ class WebRTCAudioProcessing:
     
     def __del__(self):
         """清理资源。"""
-        if hasattr(self, '_handle') and self._handle:
+        self.close()
+
+    def close(self) -> None:
+        """立即释放 APM 实例（可重复调用）。"""
+        if getattr(self, '_handle', None):
             _lib.WebRTC_APM_Destroy(self._handle)
+            self._handle = None
     
     def create_stream_config(self, sample_rate: int, num_channels: int) -> int:
         """创建流配置。
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+回声消除测试 用带声学回声的虚拟声卡驱动 AudioCodec，测量进程内参考AEC的回声抑制量.
+
+播放端播放一段类语音信号（带包络的噪声），虚拟声卡把播放输出延迟、衰减后叠加到录音输入，
+分别在关闭/开启AEC时采集经处理后的录音，计算回声抑制量 ERLE（dB）并对比延迟估计。
+可选在后半段加入近端语音（双讲），检查近端语音是否被保留。
+不需要声卡，可在无头 Linux 上运行（需要 libs/webrtc_apm 中对应平台的库）。
+
+用法:
+    python scripts/aec_echo_benchmark.py
+    python scripts/aec_echo_benchmark.py --echo-delay-ms 30 --device-latency-ms 20
+    python scripts/aec_echo_benchmark.py --double-talk --json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.aec_processor import AEC_MODE_LOOPBACK, AECProcessor  # noqa: E402
+from src.audio_codecs.audio_codec import AudioCodec  # noqa: E402
+from src.audio_codecs.virtual_device import VirtualAudioBackend  # noqa: E402
+from src.constants.constants import AudioConfig  # noqa: E402
+
+# 前多少秒不计入统计（AEC 收敛时间）
+CONVERGE_SECONDS = 1.0
+
+
+def make_far_end(sample_rate: int, duration: float, seed: int = 1) -> np.ndarray:
+    """
+    类语音的远端信号：带 4Hz 音节包络的低通噪声.
+    """
+    rng = np.random.default_rng(seed)
+    count = int(sample_rate * duration)
+    noise = rng.standard_normal(count)
+    # 简单低通，使频谱接近语音
+    kernel = np.ones(8) / 8
+    noise = np.convolve(noise, kernel, mode="same")
+    t = np.arange(count) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    signal = noise * envelope
+    signal *= 8000 / (np.abs(signal).max() or 1)
+    return signal.astype(np.int16)
+
+
+def make_near_end(sample_rate: int, duration: float, start: float) -> np.ndarray:
+    """
+    近端语音（双讲）：start 秒之后的 300Hz 短音.
+    """
+    count = int(sample_rate * duration)
+    signal = np.zeros(count, dtype=np.int16)
+    t = np.arange(count - int(start * sample_rate)) / sample_rate
+    signal[int(start * sample_rate) :] = (3000 * np.sin(2 * np.pi * 300 * t)).astype(
+        np.int16
+    )
+    return signal
+
+
+async def run_once(args, aec_enabled: bool) -> dict:
+    far_end = make_far_end(AudioConfig.OUTPUT_SAMPLE_RATE, args.duration)
+    near_end = (
+        make_near_end(args.input_rate, args.duration + 1, args.duration / 2)
+        if args.double_talk
+        else np.zeros(int(args.input_rate * (args.duration + 1)), dtype=np.int16)
+    )
+
+    backend = VirtualAudioBackend(
+        input_source=near_end,
+        input_rate=args.input_rate,
+        output_rate=args.output_rate,
+        speed=args.speed,
+        latency=args.device_latency_ms / 1000,
+        echo_gain=args.echo_gain,
+        echo_delay=args.echo_delay_ms / 1000,
+        record_output=False,
+        paused=True,
+    )
+    codec = AudioCodec(backend)
+    codec.aec_processor = AECProcessor(mode=AEC_MODE_LOOPBACK)
+    await codec.initialize()
+    if not codec.is_aec_enabled() or not codec.aec_processor.uses_playback_reference:
+        await codec.close()
+        raise RuntimeError("WebRTC APM 不可用（检查 libs/webrtc_apm 中的本平台库）")
+    codec.toggle_aec(aec_enabled)
+
+    captured = []
+
+    async def collect():
+        while True:
+            frame = await codec.wait_capture_frame()
+            try:
+                captured.append(frame.pcm.copy())
+            finally:
+                frame.release()
+
+    collector = asyncio.create_task(collect())
+    codec.play_sound(far_end, name="far_end")
+    backend.resume()
+    await asyncio.to_thread(backend.wait_input_exhausted)
+    collector.cancel()
+
+    status = codec.get_aec_status()
+    dropped = codec.get_buffer_stats()["wake_word"].get("dropped", 0)
+    await codec.close()
+
+    audio = np.concatenate(captured).astype(np.float64) if captured else np.zeros(1)
+    rate = AudioConfig.INPUT_SAMPLE_RATE
+    start = int(CONVERGE_SECONDS * rate)
+    if args.double_talk:
+        single_talk = audio[start : int(args.duration / 2 * rate)]
+        double_talk = audio[int(args.duration / 2 * rate) : int(args.duration * rate)]
+    else:
+        single_talk = audio[start : int(args.duration * rate)]
+        double_talk = np.zeros(1)
+    return {
+        "echo_power": float(np.mean(single_talk**2)) if len(single_talk) else 0.0,
+        "double_talk_power": float(np.mean(double_talk**2)),
+        "dropped_frames": dropped,
+        "delay": status.get("delay", {}),
+    }
+
+
+async def run_benchmark(args) -> dict:
+    off = await run_once(args, aec_enabled=False)
+    on = await run_once(args, aec_enabled=True)
+
+    def db(a, b):
+        return round(10 * np.log10((a + 1e-9) / (b + 1e-9)), 1)
+
+    result = {
+        "config": {
+            "input_rate": args.input_rate,
+            "output_rate": args.output_rate,
+            "echo_gain": args.echo_gain,
+            "echo_delay_ms": args.echo_delay_ms,
+            "device_latency_ms": args.device_latency_ms,
+            "duration": args.duration,
+        },
+        "erle_db": db(off["echo_power"], on["echo_power"]),
+        # 估计值只含设备路径（随回调时序变化），声学延迟由 APM 内部跟踪
+        "delay": {"acoustic_ms": args.echo_delay_ms, **on["delay"]},
+        "dropped_frames": off["dropped_frames"] + on["dropped_frames"],
+    }
+    if args.double_talk:
+        # 双讲段中近端语音的保留程度（越接近0dB越好）
+        result["double_talk_attenuation_db"] = db(
+            off["double_talk_power"], on["double_talk_power"]
+        )
+    return result
+
+
+def _print_report(result: dict):
+    config = result["config"]
+    print(
+        f"设备: 输入 {config['input_rate']}Hz, 输出 {config['output_rate']}Hz, "
+        f"设备延迟 {config['device_latency_ms']}ms, "
+        f"回声 {config['echo_gain']}x / {config['echo_delay_ms']}ms"
+    )
+    print(f"回声抑制 ERLE: {result['erle_db']} dB")
+    delay = result["delay"]
+    print(
+        f"延迟: 设备路径估计 {delay.get('estimated_delay_ms')}ms, "
+        f"APM {delay.get('applied_delay_ms')}ms, "
+        f"声学延迟 {delay['acoustic_ms']}ms（由APM内部跟踪）"
+    )
+    if "double_talk_attenuation_db" in result:
+        print(f"双讲近端衰减: {result['double_talk_attenuation_db']} dB")
+    if result["dropped_frames"]:
+        print(f"警告: 采集丢帧 {result['dropped_frames']}，请降低 --speed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回声消除测试（虚拟声卡）")
+    parser.add_argument("--duration", type=float, default=6.0, help="远端信号时长(秒)")
+    parser.add_argument("--input-rate", type=int, default=48000, help="录音设备采样率")
+    parser.add_argument("--output-rate", type=int, default=48000, help="播放设备采样率")
+    parser.add_argument("--echo-gain", type=float, default=0.5, help="回声增益")
+    parser.add_argument(
+        "--echo-delay-ms", type=float, default=20, help="扬声器到麦克风的声学延迟"
+    )
+    parser.add_argument(
+        "--device-latency-ms", type=float, default=10, help="模拟的声卡输入/输出延迟"
+    )
+    parser.add_argument("--double-talk", action="store_true", help="后半段加入近端语音")
+    parser.add_argument(
+        "--speed", type=float, default=4, help="1为实时，越大越快（过快会丢帧）"
+    )
+    parser.add_argument("--json", action="store_true", help="输出JSON结果")
+    args = parser.parse_args()
+
+    try:
+        result = asyncio.run(run_benchmark(args))
+    except RuntimeError as e:
+        print(f"无法运行: {e}")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        _print_report(result)
+
+
+if __name__ == "__main__":
+    main()
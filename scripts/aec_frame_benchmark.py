@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+AEC帧处理基准 测量 AECProcessor 处理每个录音帧（20ms/60ms等）的耗时.
+
+对比当前实现（numpy 缓冲区指针直接传给 APM、预分配输出、原地处理）与
+旧实现（每个10ms块逐采样构造 ctypes 数组、np.array 转回、np.concatenate 拼接）。
+--null-apm 使用空操作的 APM，只测量 Python/ctypes 调用开销，不需要 WebRTC 库。
+
+用法:
+    python scripts/aec_frame_benchmark.py
+    python scripts/aec_frame_benchmark.py --frames 10 20 40 60 --iterations 5000
+    python scripts/aec_frame_benchmark.py --null-apm --json
+"""
+
+import argparse
+import asyncio
+import ctypes
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.aec_processor import AEC_MODE_LOOPBACK, AECProcessor  # noqa: E402
+from src.constants.constants import AudioConfig  # noqa: E402
+
+WEBRTC_FRAME = 160
+
+
+class NullAPM:
+    """
+    空操作的 APM：不处理音频，只用于测量调用开销.
+    """
+
+    def process_reverse_stream(self, src, src_config, dest_config, dest):
+        return 0
+
+    def process_stream(self, src, src_config, dest_config, dest):
+        return 0
+
+    def set_stream_delay_ms(self, delay_ms):
+        pass
+
+
+def legacy_process(aec: AECProcessor, capture_audio: np.ndarray) -> np.ndarray:
+    """
+    旧实现：逐采样构造 ctypes 数组，处理后转回 numpy 并拼接.
+    """
+    chunks = []
+    for start in range(0, len(capture_audio), WEBRTC_FRAME):
+        chunk = capture_audio[start : start + WEBRTC_FRAME]
+        capture_buffer = (ctypes.c_short * WEBRTC_FRAME)(*chunk)
+        processed_capture = (ctypes.c_short * WEBRTC_FRAME)()
+        aec.apm.set_stream_delay_ms(aec._applied_delay_ms or 0)
+        aec.apm.process_stream(
+            capture_buffer, aec.capture_config, aec.capture_config, processed_capture
+        )
+        chunks.append(np.array(processed_capture, dtype=np.int16))
+    return np.concatenate(chunks)
+
+
+def _summary(samples: list, frame_ms: int) -> dict:
+    values = np.array(samples) * 1e6
+    mean = float(values.mean())
+    return {
+        "mean_us": round(mean, 2),
+        "p50_us": round(float(np.percentile(values, 50)), 2),
+        "p95_us": round(float(np.percentile(values, 95)), 2),
+        "max_us": round(float(values.max()), 2),
+        "per_10ms_us": round(mean * 10 / frame_ms, 2),
+        # 占实时的比例（处理耗时 / 帧时长）
+        "cpu_load": round(mean / (frame_ms * 1000), 5),
+    }
+
+
+def run_frame_size(aec: AECProcessor, frame_ms: int, args) -> dict:
+    rng = np.random.default_rng(frame_ms)
+    frame_size = AudioConfig.INPUT_SAMPLE_RATE * frame_ms // 1000
+    frames = [
+        (rng.standard_normal(frame_size) * 3000).astype(np.int16) for _ in range(16)
+    ]
+    reference = (rng.standard_normal(frame_size) * 3000).astype(np.int16)
+    work = np.zeros(frame_size, dtype=np.int16)
+
+    def feed():
+        # 每帧送入等长的播放参考，保持两路采样数一致
+        aec.feed_reference(reference, 0.02)
+
+    # 预热
+    for i in range(50):
+        feed()
+        np.copyto(work, frames[i % len(frames)])
+        aec.process_audio(work, out=work)
+
+    render, current = [], []
+    for i in range(args.iterations):
+        start = time.perf_counter()
+        feed()
+        render.append(time.perf_counter() - start)
+
+        np.copyto(work, frames[i % len(frames)])
+        start = time.perf_counter()
+        aec.process_audio(work, out=work)
+        current.append(time.perf_counter() - start)
+
+    result = {
+        "frame_ms": frame_ms,
+        "current": _summary(current, frame_ms),
+        "render": _summary(render, frame_ms),
+    }
+
+    if not args.no_legacy:
+        legacy = []
+        for i in range(args.iterations):
+            feed()
+            frame = frames[i % len(frames)]
+            start = time.perf_counter()
+            legacy_process(aec, frame)
+            legacy.append(time.perf_counter() - start)
+        result["legacy"] = _summary(legacy, frame_ms)
+        result["speedup"] = round(
+            result["legacy"]["mean_us"] / max(result["current"]["mean_us"], 1e-9), 2
+        )
+    return result
+
+
+async def run_benchmark(args) -> dict:
+    aec = AECProcessor(mode=AEC_MODE_LOOPBACK)
+    if args.null_apm:
+        # 不加载 WebRTC 库，直接使用空操作 APM
+        aec.apm = NullAPM()
+        aec._is_initialized = True
+    else:
+        try:
+            await aec.initialize()
+        except Exception as e:
+            raise RuntimeError(f"WebRTC APM 初始化失败: {e}")
+        if aec.apm is None:
+            await aec.close()
+            raise RuntimeError("WebRTC APM 不可用（检查 libs/webrtc_apm 中的本平台库）")
+    aec.attach_playback(AudioConfig.INPUT_SAMPLE_RATE)
+
+    try:
+        results = [run_frame_size(aec, frame_ms, args) for frame_ms in args.frames]
+    finally:
+        if not args.null_apm:
+            await aec.close()
+    return {
+        "apm": "null" if args.null_apm else "webrtc",
+        "iterations": args.iterations,
+        "results": results,
+    }
+
+
+def _print_report(result: dict):
+    print(f"APM: {result['apm']}, 每种帧长 {result['iterations']} 次\n")
+    for item in result["results"]:
+        current = item["current"]
+        print(
+            f"{item['frame_ms']}ms帧: 平均 {current['mean_us']}us "
+            f"(p95 {current['p95_us']}us, 最大 {current['max_us']}us), "
+            f"每10ms {current['per_10ms_us']}us, 负载 {current['cpu_load']:.3%}"
+        )
+        print(f"  参考送入: 平均 {item['render']['mean_us']}us")
+        if "legacy" in item:
+            print(
+                f"  旧实现: 平均 {item['legacy']['mean_us']}us "
+                f"(p95 {item['legacy']['p95_us']}us), 加速 {item['speedup']}x"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AEC帧处理基准")
+    parser.add_argument(
+        "--frames", type=int, nargs="+", default=[20, 60], help="帧长度(毫秒)"
+    )
+    parser.add_argument("--iterations", type=int, default=2000, help="每种帧长次数")
+    parser.add_argument(
+        "--null-apm", action="store_true", help="使用空操作APM，只测调用开销"
+    )
+    parser.add_argument("--no-legacy", action="store_true", help="不对比旧实现")
+    parser.add_argument("--json", action="store_true", help="输出JSON结果")
+    args = parser.parse_args()
+
+    for frame_ms in args.frames:
+        if frame_ms <= 0 or frame_ms % 10:
+            parser.error(f"帧长度必须是10ms的整数倍: {frame_ms}")
+
+    try:
+        result = asyncio.run(run_benchmark(args))
+    except RuntimeError as e:
+        print(f"无法运行: {e}")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        _print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+重采样缓冲区微基准 对比旧的 deque 逐采样实现与 AudioRingBuffer 向量化实现在单次音频回调中的耗时.
+
+模拟两条路径:
+1. 录音: 重采样器产出一块数据 -> 写入缓冲 -> 取出一帧16kHz数据
+2. 播放: 解码帧重采样后写入缓冲 -> 读出设备需要的采样数写入 outdata
+
+用法:
+    python scripts/audio_buffer_benchmark.py
+    python scripts/audio_buffer_benchmark.py --frame-ms 60 --iterations 5000
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.ring_buffer import AudioRingBuffer  # noqa: E402
+
+
+def _chunks(frame_size: int, iterations: int) -> list:
+    """
+    生成带抖动的"重采样器输出"块，模拟 soxr 每次产出的采样数不固定.
+    """
+    rng = np.random.default_rng(0)
+    sizes = frame_size + rng.integers(-8, 9, size=iterations)
+    return [
+        rng.integers(-32768, 32767, size=int(n), dtype=np.int16).astype(np.int16)
+        for n in sizes
+    ]
+
+
+def bench_input_deque(chunks, frame_size: int) -> float:
+    buffer = deque()
+    start = time.perf_counter()
+    for chunk in chunks:
+        buffer.extend(chunk.astype(np.int16))
+        if len(buffer) < frame_size:
+            continue
+        frame_data = []
+        for _ in range(frame_size):
+            frame_data.append(buffer.popleft())
+        np.array(frame_data, dtype=np.int16)
+    return time.perf_counter() - start
+
+
+def bench_input_ring(chunks, frame_size: int) -> float:
+    buffer = AudioRingBuffer(frame_size * 50)
+    start = time.perf_counter()
+    for chunk in chunks:
+        buffer.write(chunk)
+        buffer.read(frame_size)
+    return time.perf_counter() - start
+
+
+def bench_output_deque(chunks, frames: int) -> float:
+    buffer = deque()
+    outdata = np.zeros((frames, 1), dtype=np.int16)
+    start = time.perf_counter()
+    for chunk in chunks:
+        buffer.extend(chunk.astype(np.int16))
+        if len(buffer) >= frames:
+            frame_data = [buffer.popleft() for _ in range(frames)]
+            outdata[:] = np.array(frame_data, dtype=np.int16).reshape(-1, 1)
+        else:
+            outdata.fill(0)
+    return time.perf_counter() - start
+
+
+def bench_output_ring(chunks, frames: int) -> float:
+    buffer = AudioRingBuffer(frames * 50)
+    outdata = np.zeros((frames, 1), dtype=np.int16)
+    start = time.perf_counter()
+    for chunk in chunks:
+        buffer.write(chunk)
+        if buffer.read(frames, out=outdata.reshape(-1)) is None:
+            outdata.fill(0)
+    return time.perf_counter() - start
+
+
+def _report(name: str, old: float, new: float, iterations: int):
+    old_us = old / iterations * 1e6
+    new_us = new / iterations * 1e6
+    print(
+        f"{name:<28} deque: {old_us:8.1f} us/回调   "
+        f"ring: {new_us:8.1f} us/回调   加速: {old_us / max(new_us, 1e-9):6.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重采样缓冲区微基准")
+    parser.add_argument("--frame-ms", type=int, default=20, help="帧长度(毫秒)")
+    parser.add_argument("--iterations", type=int, default=2000, help="模拟回调次数")
+    parser.add_argument(
+        "--device-rate", type=int, default=48000, help="设备采样率(播放路径)"
+    )
+    args = parser.parse_args()
+
+    input_frame = int(16000 * args.frame_ms / 1000)
+    output_frame = int(args.device_rate * args.frame_ms / 1000)
+
+    print(f"帧长度: {args.frame_ms}ms, 回调次数: {args.iterations}\n")
+
+    chunks = _chunks(input_frame, args.iterations)
+    _report(
+        f"录音 16kHz ({input_frame} 采样)",
+        bench_input_deque(chunks, input_frame),
+        bench_input_ring(chunks, input_frame),
+        args.iterations,
+    )
+
+    chunks = _chunks(output_frame, args.iterations)
+    _report(
+        f"播放 {args.device_rate}Hz ({output_frame} 采样)",
+        bench_output_deque(chunks, output_frame),
+        bench_output_ring(chunks, output_frame),
+        args.iterations,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+音频链路基准 用虚拟声卡驱动 AudioCodec 的录音/播放回调，测量回调CPU耗时、端到端延迟和欠载率.
+
+录音编码后的数据直接回环到下行解码（录音 -> 编码 -> 解码 -> 抖动缓冲 -> 播放），
+输入为周期性的短音（或指定的 WAV 文件），在输出中检测短音起点计算端到端延迟。
+不需要声卡，可在无头 Linux 的 CI 中运行。
+默认不限速运行；抖动缓冲按墙钟判断网络抖动和语音段间隔，评估抖动缓冲行为时请用 --speed 1。
+
+用法:
+    python scripts/audio_pipeline_benchmark.py
+    python scripts/audio_pipeline_benchmark.py --speed 1 --duration 5
+    python scripts/audio_pipeline_benchmark.py --input-rate 16000 --output-rate 24000 --frame-ms 60
+    python scripts/audio_pipeline_benchmark.py --json > audio_bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.audio_codec import AudioCodec  # noqa: E402
+from src.audio_codecs.virtual_device import (  # noqa: E402
+    VirtualAudioBackend,
+    load_wav,
+)
+
+# 测试信号：每 BURST_PERIOD 秒一段 BURST_MS 毫秒的 1kHz 短音
+BURST_PERIOD = 1.0
+BURST_MS = 200
+BURST_AMPLITUDE = 8000
+# 检测窗口（毫秒）与门限（相对短音幅度）
+DETECT_WINDOW_MS = 1
+DETECT_THRESHOLD = 0.2
+
+
+def make_bursts(sample_rate: int, duration: float):
+    """
+    生成测试信号，返回 (信号, 各短音起点秒数).
+    """
+    signal = np.zeros(int(sample_rate * duration), dtype=np.int16)
+    burst_len = sample_rate * BURST_MS // 1000
+    t = np.arange(burst_len) / sample_rate
+    burst = (BURST_AMPLITUDE * np.sin(2 * np.pi * 1000 * t)).astype(np.int16)
+
+    onsets = []
+    start = 0.5
+    while start + BURST_MS / 1000 < duration - 0.5:
+        pos = int(start * sample_rate)
+        signal[pos : pos + burst_len] = burst
+        onsets.append(start)
+        start += BURST_PERIOD
+    return signal, onsets
+
+
+def detect_onsets(output: np.ndarray, sample_rate: int):
+    """
+    在输出中检测短音起点（秒）：窗口峰值越过门限且之前静音超过半个周期.
+    """
+    mono = np.abs(output[:, 0].astype(np.int32))
+    window = max(1, sample_rate * DETECT_WINDOW_MS // 1000)
+    count = len(mono) // window
+    if count == 0:
+        return []
+    peaks = mono[: count * window].reshape(count, window).max(axis=1)
+    active = np.flatnonzero(peaks > BURST_AMPLITUDE * DETECT_THRESHOLD)
+
+    onsets = []
+    min_gap = int(BURST_PERIOD / 2 * 1000 / DETECT_WINDOW_MS)
+    last = -min_gap
+    for index in active:
+        if index - last >= min_gap:
+            onsets.append(index * window / sample_rate)
+        last = index
+    return onsets
+
+
+def match_latencies(input_onsets, output_onsets):
+    """
+    每个输入短音匹配其后的第一个输出短音，返回延迟列表（毫秒）.
+    """
+    latencies = []
+    j = 0
+    for t_in in input_onsets:
+        while j < len(output_onsets) and output_onsets[j] < t_in:
+            j += 1
+        if j == len(output_onsets):
+            break
+        latency = output_onsets[j] - t_in
+        if latency < BURST_PERIOD / 2:
+            latencies.append(latency * 1000)
+            j += 1
+    return latencies
+
+
+async def run_benchmark(args) -> dict:
+    if args.input:
+        data, file_rate = load_wav(args.input)
+        signal, input_onsets = args.input, detect_onsets(data, file_rate)
+    else:
+        signal, input_onsets = make_bursts(args.input_rate, args.duration)
+
+    codec = None
+
+    def wait_decoder():
+        # 快速模式：播放前等解码线程处理完已提交的数据包，避免线程调度造成的假欠载
+        while codec and codec.get_decode_stats()["pending"]:
+            time.sleep(0.0001)
+
+    backend = VirtualAudioBackend(
+        input_source=signal,
+        input_rate=args.input_rate,
+        output_rate=args.output_rate,
+        supported_rates=[16000, 24000] if args.native else None,
+        speed=args.speed,
+        latency=args.device_latency_ms / 1000,
+        before_output=wait_decoder if args.speed == 0 else None,
+        paused=True,
+    )
+    codec = AudioCodec(backend)
+
+    wall_start = time.perf_counter()
+    await codec.initialize()
+    if args.frame_ms:
+        codec.set_frame_duration(args.frame_ms)
+    # 回环：录音编码结果直接送入下行解码
+    codec.set_encoded_audio_callback(codec.submit_audio)
+    # 初始化和设置完成后再开始驱动回调
+    backend.resume()
+
+    await asyncio.to_thread(backend.wait_input_exhausted)
+    # 再运行一段时间，让最后一段音频放完
+    tail_until = backend.now + args.tail
+    while backend.now < tail_until:
+        await asyncio.sleep(0.01)
+    wall = time.perf_counter() - wall_start
+
+    stream_stats = backend.get_stream_stats()
+    jitter = codec.get_jitter_stats()
+    plc = codec.get_plc_stats()
+    resampler = codec.get_resampler_info()
+    frame_ms = codec.frame_duration
+    # 设备支持时编解码器会直接以16k/24k打开流
+    input_rate = codec.device_input_sample_rate
+    output_rate = codec.device_output_sample_rate
+    await codec.close()
+
+    output_onsets = detect_onsets(backend.get_output(), output_rate)
+    latencies = match_latencies(input_onsets, output_onsets)
+    frames_out = max(1, jitter["frames_out"])
+
+    result = {
+        "config": {
+            "input_rate": input_rate,
+            "output_rate": output_rate,
+            "frame_ms": frame_ms,
+            "speed": args.speed,
+            "device_latency_ms": args.device_latency_ms,
+            "resampler": resampler,
+        },
+        "virtual_seconds": round(backend.now, 2),
+        "wall_seconds": round(wall, 2),
+        "callbacks": stream_stats,
+        "latency_ms": (
+            {
+                "bursts": len(input_onsets),
+                "detected": len(latencies),
+                "mean": round(float(np.mean(latencies)), 1),
+                "min": round(float(np.min(latencies)), 1),
+                "max": round(float(np.max(latencies)), 1),
+                # 声卡输出延迟不在回调中体现，单独加上
+                "with_device": round(
+                    float(np.mean(latencies)) + args.device_latency_ms, 1
+                ),
+            }
+            if latencies
+            else {"bursts": len(input_onsets), "detected": 0}
+        ),
+        "underruns": {
+            "count": jitter["underruns"],
+            "rate": round(jitter["underruns"] / frames_out, 4),
+            "plc_frames": plc["underrun_plc"],
+            "late_frames": jitter["late_frames"],
+            "dropped": jitter["dropped"],
+        },
+    }
+    return result
+
+
+def _print_report(result: dict):
+    config = result["config"]
+    print(
+        f"设备: 输入 {config['input_rate']}Hz, 输出 {config['output_rate']}Hz, "
+        f"帧长度 {config['frame_ms']}ms, 速度 {config['speed'] or '不限'}"
+    )
+    print(f"运行: 虚拟 {result['virtual_seconds']}s, 实际 {result['wall_seconds']}s\n")
+
+    for kind, stats in result["callbacks"].items():
+        label = "录音回调" if kind == "input" else "播放回调"
+        if "mean_ms" not in stats:
+            print(f"{label}: 无数据")
+            continue
+        print(
+            f"{label}: {stats['blocks']} 次, 平均 {stats['mean_ms']:.3f}ms, "
+            f"p95 {stats['p95_ms']:.3f}ms, p99 {stats['p99_ms']:.3f}ms, "
+            f"最大 {stats['max_ms']:.3f}ms, 负载 {stats['cpu_load']:.2%} "
+            f"(块 {stats['block_ms']}ms)"
+        )
+
+    latency = result["latency_ms"]
+    if latency.get("detected"):
+        print(
+            f"\n端到端延迟: 平均 {latency['mean']}ms (最小 {latency['min']}ms, "
+            f"最大 {latency['max']}ms), 含设备延迟 {latency['with_device']}ms, "
+            f"检测到 {latency['detected']}/{latency['bursts']} 段"
+        )
+    else:
+        print(f"\n端到端延迟: 未检测到短音 (共 {latency['bursts']} 段)")
+
+    underruns = result["underruns"]
+    print(
+        f"欠载: {underruns['count']} 次 (欠载率 {underruns['rate']:.2%}), "
+        f"PLC补帧 {underruns['plc_frames']}, 迟到 {underruns['late_frames']}, "
+        f"丢弃 {underruns['dropped']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="音频链路基准（虚拟声卡）")
+    parser.add_argument("--duration", type=float, default=10.0, help="输入时长(秒)")
+    parser.add_argument("--input", type=str, default=None, help="输入WAV文件")
+    parser.add_argument("--input-rate", type=int, default=48000, help="录音设备采样率")
+    parser.add_argument("--output-rate", type=int, default=48000, help="播放设备采样率")
+    parser.add_argument(
+        "--native",
+        action="store_true",
+        help="虚拟设备同时支持16k/24k（测试免重采样路径）",
+    )
+    parser.add_argument("--frame-ms", type=int, default=None, help="帧长度(毫秒)")
+    parser.add_argument(
+        "--speed", type=float, default=0, help="1为实时，0为不限速（默认）"
+    )
+    parser.add_argument(
+        "--device-latency-ms", type=float, default=0, help="模拟的声卡输出延迟"
+    )
+    parser.add_argument(
+        "--tail", type=float, default=1.0, help="输入结束后继续运行秒数"
+    )
+    parser.add_argument("--json", action="store_true", help="输出JSON结果")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        _print_report(result)
+
+
+if __name__ == "__main__":
+    main()
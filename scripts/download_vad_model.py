@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+下载 Silero VAD 模型 供 VAD_OPTIONS.BACKEND = "silero" 使用.
+
+默认保存到资源查找器找到的 models 目录（开发态为项目根目录下的 models），
+与 VAD_OPTIONS.MODEL 的默认值 models/silero_vad.onnx 对应。已存在时跳过，
+可用 --force 重新下载。运行 Silero 后端还需要安装 onnxruntime（输出语音概率）
+或 sherpa_onnx（只有0/1判定）。
+
+用法:
+    python scripts/download_vad_model.py
+    python scripts/download_vad_model.py --output /path/to/silero_vad.onnx
+    python scripts/download_vad_model.py --url https://mirror.example.com/silero_vad.onnx
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import requests
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils.resource_finder import resource_finder  # noqa: E402
+
+MODEL_URL = (
+    "https://github.com/k2-fsa/sherpa-onnx/releases/download/"
+    "asr-models/silero_vad.onnx"
+)
+MODEL_NAME = "silero_vad.onnx"
+CHUNK_SIZE = 64 * 1024
+
+
+def default_output() -> Path:
+    """
+    模型保存路径：已有的 models 目录，找不到时使用项目根目录下的 models.
+    """
+    models_dir = resource_finder.find_models_dir()
+    if models_dir is None:
+        models_dir = resource_finder.get_project_root() / "models"
+    return models_dir / MODEL_NAME
+
+
+def download(url: str, output: Path, timeout: float) -> int:
+    """
+    下载到临时文件后改名，避免中断时留下不完整的模型，返回字节数.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(output.name + ".part")
+    size = 0
+    try:
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            with open(partial, "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    partial.replace(output)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="下载 Silero VAD 模型")
+    parser.add_argument("--url", default=MODEL_URL, help="模型下载地址")
+    parser.add_argument("--output", type=Path, default=None, help="模型保存路径")
+    parser.add_argument("--timeout", type=float, default=30.0, help="网络超时(秒)")
+    parser.add_argument("--force", action="store_true", help="已存在时重新下载")
+    args = parser.parse_args()
+
+    output = args.output or default_output()
+    if output.exists() and not args.force:
+        print(f"模型已存在: {output}")
+        return
+
+    print(f"下载 {args.url}")
+    try:
+        size = download(args.url, output, args.timeout)
+    except (requests.RequestException, OSError) as e:
+        print(f"下载失败: {e}")
+        sys.exit(1)
+    print(f"已保存到 {output} ({size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
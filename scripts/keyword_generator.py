@@ -7,7 +7,8 @@
 1. 输入中文自动转换为带声调拼音
 2. 按字母分隔拼音（声母+韵母）
 3. 验证token是否在tokens.txt中
-4. 自动生成keywords.txt格式
+4. 自动生成keywords.txt格式（可单独设置每个词的加分和阈值）
+5. 运行中的程序会自动加载修改后的keywords.txt，无需重启
 """
 
 import sys
@@ -85,15 +86,18 @@ class KeywordGenerator:
         # 没有声母（零声母）
         return [pinyin]
 
-    def chinese_to_keyword_format(self, chinese_text: str) -> str:
+    def chinese_to_keyword_format(self, chinese_text: str, boost: float = None,
+                                  threshold: float = None) -> str:
         """
         将中文转换为keyword格式
 
         Args:
             chinese_text: 中文文本，如"小米小米"
+            boost: 该词的加分（越大越容易触发），None 使用全局 KEYWORDS_SCORE
+            threshold: 该词的触发阈值（越小越容易触发），None 使用全局 KEYWORDS_THRESHOLD
 
         Returns:
-            keyword格式，如"x iǎo m ǐ x iǎo m ǐ @小米小米"
+            keyword格式，如"x iǎo m ǐ x iǎo m ǐ :2.0 #0.3 @小米小米"
         """
         # 转换为带声调拼音
         pinyin_list = lazy_pinyin(chinese_text, style=Style.TONE)
@@ -113,6 +117,10 @@ class KeywordGenerator:
 
         # 拼接结果
         pinyin_str = " ".join(split_parts)
+        if boost is not None:
+            pinyin_str += f" :{boost:g}"
+        if threshold is not None:
+            pinyin_str += f" #{threshold:g}"
         keyword_line = f"{pinyin_str} @{chinese_text}"
 
         # 如果有缺失的token，给出警告
@@ -122,20 +130,23 @@ class KeywordGenerator:
 
         return keyword_line
 
-    def add_keyword(self, chinese_text: str, append: bool = True) -> bool:
+    def add_keyword(self, chinese_text: str, append: bool = True,
+                    boost: float = None, threshold: float = None) -> bool:
         """
         添加唤醒词到keywords.txt
 
         Args:
             chinese_text: 中文唤醒词
             append: 是否追加（True）或覆盖（False）
+            boost: 该词的加分
+            threshold: 该词的触发阈值
 
         Returns:
             是否成功
         """
         try:
             # 生成keyword格式
-            keyword_line = self.chinese_to_keyword_format(chinese_text)
+            keyword_line = self.chinese_to_keyword_format(chinese_text, boost, threshold)
 
             # 检查是否已存在
             if self.keywords_file.exists():
@@ -157,13 +168,16 @@ class KeywordGenerator:
             print(f"❌ 添加失败: {e}")
             return False
 
-    def batch_add_keywords(self, chinese_texts: list, overwrite: bool = False):
+    def batch_add_keywords(self, chinese_texts: list, overwrite: bool = False,
+                           boost: float = None, threshold: float = None):
         """
         批量添加唤醒词
 
         Args:
             chinese_texts: 中文列表
             overwrite: 是否覆盖原文件
+            boost: 每个词的加分
+            threshold: 每个词的触发阈值
         """
         if overwrite:
             print("⚠️  将覆盖现有keywords.txt")
@@ -174,7 +188,8 @@ class KeywordGenerator:
             if not text:
                 continue
 
-            if self.add_keyword(text, append=not overwrite):
+            if self.add_keyword(text, append=not overwrite, boost=boost,
+                                threshold=threshold):
                 success_count += 1
 
             # 第一个后都追加
@@ -228,6 +243,11 @@ def main():
 
   # 测试转换（不写入文件）
   python keyword_generator.py -t "小米小米"
+
+  # 单独设置加分和阈值（更难误触发）
+  python keyword_generator.py -a "贾维斯" --boost 1.5 --threshold 0.35
+
+运行中的程序会在几秒内自动加载修改后的keywords.txt，无需重启。
         """
     )
 
@@ -270,6 +290,18 @@ def main():
         help='覆盖模式（清空现有关键词）'
     )
 
+    parser.add_argument(
+        '--boost',
+        type=float,
+        help='该词的加分（越大越容易触发，默认使用全局 KEYWORDS_SCORE）'
+    )
+
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        help='该词的触发阈值（越小越容易触发，默认使用全局 KEYWORDS_THRESHOLD）'
+    )
+
     args = parser.parse_args()
 
     # 确定模型目录
@@ -294,17 +326,20 @@ def main():
     if args.test:
         # 测试模式
         print(f"\n🧪 测试转换:")
-        keyword_line = generator.chinese_to_keyword_format(args.test)
+        keyword_line = generator.chinese_to_keyword_format(
+            args.test, args.boost, args.threshold
+        )
         print(f"   输入: {args.test}")
         print(f"   输出: {keyword_line}")
 
     elif args.add:
         # 添加单个
-        generator.add_keyword(args.add)
+        generator.add_keyword(args.add, boost=args.boost, threshold=args.threshold)
 
     elif args.batch:
         # 批量添加
-        generator.batch_add_keywords(args.batch, overwrite=args.overwrite)
+        generator.batch_add_keywords(args.batch, overwrite=args.overwrite,
+                                     boost=args.boost, threshold=args.threshold)
 
     elif args.file:
         # 从文件导入
@@ -317,7 +352,8 @@ def main():
             keywords = [line.strip() for line in f if line.strip()]
 
         print(f"📥 从文件导入 {len(keywords)} 个关键词")
-        generator.batch_add_keywords(keywords, overwrite=args.overwrite)
+        generator.batch_add_keywords(keywords, overwrite=args.overwrite,
+                                     boost=args.boost, threshold=args.threshold)
 
     elif args.list:
         # 列出关键词
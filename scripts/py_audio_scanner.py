@@ -1,8 +1,36 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
 import numpy as np
 import sounddevice as sd
 
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.device_cache import AudioDeviceCache  # noqa: E402
+
+
+def _print_capabilities(cache: AudioDeviceCache, index: int, kind: str):
+    """
+    打印设备能力（首次探测后写入缓存，之后直接读取）.
+    """
+    caps = cache.get_capabilities(index, kind)
+    if not caps:
+        return
+    label = "输入" if kind == "input" else "输出"
+    rates = ", ".join(str(r) for r in caps["rates"]) or "无"
+    print(f"  - {label}支持采样率: {rates}")
+    print(f"  - {label}支持通道数: {caps['channels']}")
+    latency = caps["latency"]
+    if latency.get("low") is not None:
+        print(
+            f"  - {label}默认延迟: {latency['low'] * 1000:.1f}ms (低) / "
+            f"{latency['high'] * 1000:.1f}ms (高)"
+        )
+
 
 def detect_audio_devices():
     """
@@ -10,22 +38,33 @@ def detect_audio_devices():
     """
     print("\n===== 音频设备检测 (SoundDevice) =====\n")
 
+    # 独立进程没有活动的音频流，可以重新初始化PortAudio以发现新插入的设备
+    cache = AudioDeviceCache.get_instance()
+    cache.refresh(reinitialize=True)
+
     # 获取默认设备
-    default_input = sd.default.device[0] if sd.default.device else None
-    default_output = sd.default.device[1] if sd.default.device else None
+    default_input_info = cache.default_device("input")
+    default_output_info = cache.default_device("output")
+    default_input = default_input_info["index"] if default_input_info else None
+    default_output = default_output_info["index"] if default_output_info else None
 
     # 存储找到的设备
     input_devices = []
     output_devices = []
 
     # 列出所有设备
-    devices = sd.query_devices()
+    devices = cache.devices()
     for i, dev_info in enumerate(devices):
         # 打印设备信息
         print(f"设备 {i}: {dev_info['name']}")
+        print(f"  - HostAPI: {dev_info['hostapi_name']}")
         print(f"  - 输入通道: {dev_info['max_input_channels']}")
         print(f"  - 输出通道: {dev_info['max_output_channels']}")
         print(f"  - 默认采样率: {dev_info['default_samplerate']}")
+        if dev_info["max_input_channels"] > 0:
+            _print_capabilities(cache, i, "input")
+        if dev_info["max_output_channels"] > 0:
+            _print_capabilities(cache, i, "output")
 
         # 标记默认设备
         if i == default_input:
@@ -168,5 +207,6 @@ if __name__ == "__main__":
     try:
         mic, speaker = detect_audio_devices()
         print("\n检测完成！")
+        print(f"设备缓存: {AudioDeviceCache.get_instance().get_stats()}")
     except Exception as e:
         print(f"检测过程中出错: {e}")
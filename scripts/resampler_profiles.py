@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+重采样档位对比 输出各档位在常见设备采样率下的实测延迟和每次回调的CPU耗时，用于端到端延迟预算.
+
+用法:
+    python scripts/resampler_profiles.py
+    python scripts/resampler_profiles.py --rates 44100 48000 --frame-ms 60
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.resampler import (  # noqa: E402
+    RESAMPLER_PROFILES,
+    create_resampler,
+    measure_group_delay,
+)
+
+
+def bench_callback_us(in_rate: int, out_rate: int, profile: str, frame_ms: int):
+    """
+    模拟音频回调：每次送入一个回调大小的数据块，返回平均耗时(微秒).
+    """
+    resampler = create_resampler(in_rate, out_rate, 1, profile)
+    chunk = in_rate * frame_ms // 1000
+    rng = np.random.default_rng(0)
+    data = (rng.standard_normal(chunk) * 3000).astype(np.int16)
+    iterations = max(50, 2000 // frame_ms)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        resampler.resample_chunk(data, last=False)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重采样档位延迟/CPU对比")
+    parser.add_argument(
+        "--rates",
+        type=int,
+        nargs="+",
+        default=[44100, 48000],
+        help="设备采样率列表",
+    )
+    parser.add_argument("--frame-ms", type=int, default=20, help="回调帧长度(毫秒)")
+    args = parser.parse_args()
+
+    print(f"回调帧长度: {args.frame_ms}ms\n")
+    print(f"{'方向':<22}{'档位':<16}{'延迟(ms)':>10}{'耗时(us/回调)':>16}")
+    for rate in args.rates:
+        for in_rate, out_rate, label in (
+            (rate, 16000, f"录音 {rate}->16000"),
+            (24000, rate, f"播放 24000->{rate}"),
+        ):
+            for profile in RESAMPLER_PROFILES:
+                delay = measure_group_delay(in_rate, out_rate, profile, args.frame_ms)
+                cost = bench_callback_us(in_rate, out_rate, profile, args.frame_ms)
+                print(f"{label:<22}{profile:<16}{delay:>10.2f}{cost:>16.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+VAD基准 用录制的 WAV 文件对比各VAD后端的检测延迟、误触发和CPU开销.
+
+每个文件前面补一段静音（--lead-ms），按录音帧长度（--frame-ms）逐帧送入
+VADDetector，记录语音开始事件。语音起点默认按能量自动估计，也可以写成
+"文件.wav@1200" 指定起点毫秒数（相对文件开头），或 "文件.wav@none"
+表示文件中没有语音（如音乐、电视声），此时所有语音开始事件都计为误触发。
+Silero 后端需要提供 silero_vad.onnx 模型，并安装 onnxruntime（输出语音概率）
+或 sherpa_onnx（只有0/1判定）。
+
+用法:
+    python scripts/vad_benchmark.py speech.wav music.wav@none
+    python scripts/vad_benchmark.py speech.wav@850 --backends webrtc silero
+    python scripts/vad_benchmark.py *.wav --model models/silero_vad.onnx --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到Python路径 - 必须在导入src模块之前
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_codecs.resampler import create_resampler  # noqa: E402
+from src.audio_codecs.virtual_device import load_wav  # noqa: E402
+from src.audio_processing.vad_backends import (  # noqa: E402
+    BACKEND_SILERO,
+    BACKEND_WEBRTC,
+    SileroVADBackend,
+    WebRTCVADBackend,
+)
+from src.audio_processing.vad_detector import VADDetector  # noqa: E402
+from src.constants.constants import AudioConfig  # noqa: E402
+from src.utils.config_manager import ConfigManager  # noqa: E402
+
+SAMPLE_RATE = AudioConfig.INPUT_SAMPLE_RATE
+# 自动估计语音起点：10ms 窗口的 RMS 超过文件峰值 RMS 的比例
+ONSET_WINDOW_MS = 10
+ONSET_RELATIVE_DB = -30
+
+BACKEND_CLASSES = {
+    BACKEND_WEBRTC: WebRTCVADBackend,
+    BACKEND_SILERO: SileroVADBackend,
+}
+
+
+def parse_input(spec: str):
+    """
+    解析 "文件.wav[@起点毫秒|@none]"，返回 (路径, 起点毫秒或None, 是否含语音).
+    """
+    path, _, onset = spec.partition("@")
+    if not onset:
+        return Path(path), None, True
+    if onset.lower() == "none":
+        return Path(path), None, False
+    return Path(path), float(onset), True
+
+
+def load_mono_16k(path: Path) -> np.ndarray:
+    """
+    读取 WAV，下混为单声道并重采样到16kHz.
+    """
+    data, sample_rate = load_wav(path)
+    mono = data.mean(axis=1).astype(np.int16) if data.shape[1] > 1 else data[:, 0]
+    if sample_rate == SAMPLE_RATE:
+        return np.ascontiguousarray(mono)
+    resampler = create_resampler(sample_rate, SAMPLE_RATE, 1, "high_quality")
+    return resampler.resample_chunk(mono, last=True)
+
+
+def estimate_onset_ms(samples: np.ndarray) -> float:
+    """
+    按能量估计第一个语音起点（毫秒）.
+    """
+    window = SAMPLE_RATE * ONSET_WINDOW_MS // 1000
+    count = len(samples) // window
+    if count == 0:
+        return 0.0
+    frames = samples[: count * window].reshape(count, window).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    peak = float(rms.max())
+    if peak <= 0:
+        return 0.0
+    threshold = peak * 10 ** (ONSET_RELATIVE_DB / 20)
+    return float(np.argmax(rms >= threshold) * ONSET_WINDOW_MS)
+
+
+def run_file(backend_name: str, config: dict, samples, onset_ms, args) -> dict:
+    backend = BACKEND_CLASSES[backend_name](config, SAMPLE_RATE)
+    detector = VADDetector(None, backend=backend)
+    detector.interrupt_enabled = False
+
+    starts = []
+    probabilities = []
+    detector.on_speech_start = lambda probability: starts.append(
+        detector._frames * detector.frame_size * 1000 / SAMPLE_RATE
+    )
+    detector.on_probability = probabilities.append
+
+    chunk = SAMPLE_RATE * args.frame_ms // 1000
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for offset in range(0, len(samples) - chunk + 1, chunk):
+        detector.feed(samples[offset : offset + chunk])
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    audio_seconds = len(samples) / SAMPLE_RATE
+    if onset_ms is None:
+        false_starts, latency = len(starts), None
+    else:
+        false_starts = sum(1 for start in starts if start < onset_ms)
+        detected = [start for start in starts if start >= onset_ms]
+        latency = round(detected[0] - onset_ms, 1) if detected else None
+
+    stats = detector.get_stats()
+    return {
+        "backend": backend_name,
+        "frame_ms": round(detector.frame_duration, 1),
+        "latency_ms": latency,
+        "false_starts": false_starts,
+        "segments": stats["segments"],
+        "speech_ratio": stats["speech_ratio"],
+        "mean_probability": (
+            round(float(np.mean(probabilities)), 3) if probabilities else 0.0
+        ),
+        # 每10ms音频的处理耗时与占实时的比例
+        "wall_us_per_10ms": round(wall / audio_seconds * 1e4, 2),
+        "cpu_us_per_10ms": round(cpu / audio_seconds * 1e4, 2),
+        "cpu_load": round(cpu / audio_seconds, 5),
+        "avg_us_per_frame": stats["avg_us"],
+    }
+
+
+def run_benchmark(args) -> dict:
+    base_config = dict(ConfigManager.get_instance().get_config("VAD_OPTIONS", {}) or {})
+    if args.model:
+        base_config["MODEL"] = args.model
+    if args.threshold is not None:
+        base_config["THRESHOLD"] = args.threshold
+
+    lead = np.zeros(SAMPLE_RATE * args.lead_ms // 1000, dtype=np.int16)
+    files = []
+    for spec in args.inputs:
+        path, onset_ms, has_speech = parse_input(spec)
+        samples = load_mono_16k(path)
+        if has_speech and onset_ms is None:
+            onset_ms = estimate_onset_ms(samples)
+        files.append(
+            {
+                "file": str(path),
+                "duration_s": round(len(samples) / SAMPLE_RATE, 2),
+                "onset_ms": (round(onset_ms + args.lead_ms, 1) if has_speech else None),
+                "samples": np.concatenate((lead, samples)),
+                "results": [],
+            }
+        )
+
+    unavailable = {}
+    for backend_name in args.backends:
+        for item in files:
+            try:
+                item["results"].append(
+                    run_file(
+                        backend_name,
+                        base_config,
+                        item["samples"],
+                        item["onset_ms"],
+                        args,
+                    )
+                )
+            except Exception as e:
+                unavailable[backend_name] = str(e)
+                break
+
+    for item in files:
+        del item["samples"]
+    return {
+        "frame_ms": args.frame_ms,
+        "lead_ms": args.lead_ms,
+        "files": files,
+        "unavailable": unavailable,
+    }
+
+
+def _print_report(result: dict):
+    print(f"录音帧 {result['frame_ms']}ms, 前置静音 {result['lead_ms']}ms\n")
+    for item in result["files"]:
+        onset = (
+            f"语音起点 {item['onset_ms']}ms"
+            if item["onset_ms"] is not None
+            else "无语音"
+        )
+        print(f"{item['file']} ({item['duration_s']}s, {onset})")
+        for res in item["results"]:
+            latency = (
+                f"{res['latency_ms']}ms"
+                if res["latency_ms"] is not None
+                else "未检测到"
+            )
+            print(
+                f"  {res['backend']:<7} 检测延迟 {latency}, 误触发 {res['false_starts']}, "
+                f"语音帧 {res['speech_ratio']:.1%}, "
+                f"CPU 每10ms {res['cpu_us_per_10ms']}us (负载 {res['cpu_load']:.3%})"
+            )
+    for backend_name, error in result["unavailable"].items():
+        print(f"\n{backend_name} 不可用: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD后端基准")
+    parser.add_argument("inputs", nargs="+", help="WAV文件，可附加 @起点毫秒 或 @none")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=list(BACKEND_CLASSES),
+        default=list(BACKEND_CLASSES),
+        help="对比的VAD后端",
+    )
+    parser.add_argument("--frame-ms", type=int, default=20, help="录音帧长度(毫秒)")
+    parser.add_argument("--lead-ms", type=int, default=1000, help="前置静音(毫秒)")
+    parser.add_argument("--model", help="Silero VAD 模型路径")
+    parser.add_argument("--threshold", type=float, help="Silero VAD 概率阈值")
+    parser.add_argument("--json", action="store_true", help="输出JSON结果")
+    args = parser.parse_args()
+
+    if args.frame_ms <= 0 or args.frame_ms % 10:
+        parser.error(f"帧长度必须是10ms的整数倍: {args.frame_ms}")
+
+    try:
+        result = run_benchmark(args)
+    except (OSError, ValueError) as e:
+        print(f"无法运行: {e}")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        _print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -141,12 +141,14 @@ class Application:
                 return True
             if not self._connect_lock:
                 # 未初始化锁时，直接尝试一次
+                self._sync_frame_duration()
                 opened = await asyncio.wait_for(
                     self.protocol.open_audio_channel(), timeout=12.0
                 )
                 if not opened:
                     logger.error("协议连接失败")
                     return False
+                self._apply_server_audio_params()
                 logger.info("协议连接已建立，按Ctrl+C退出")
                 await self.plugins.notify_protocol_connected(self.protocol)
                 return True
@@ -154,12 +156,14 @@ class Application:
             async with self._connect_lock:
                 if self.is_audio_channel_opened():
                     return True
+                self._sync_frame_duration()
                 opened = await asyncio.wait_for(
                     self.protocol.open_audio_channel(), timeout=12.0
                 )
                 if not opened:
                     logger.error("协议连接失败")
                     return False
+                self._apply_server_audio_params()
                 logger.info("协议连接已建立，按Ctrl+C退出")
                 await self.plugins.notify_protocol_connected(self.protocol)
                 return True
@@ -167,6 +171,34 @@ class Application:
             logger.error("协议连接超时")
             return False
 
+    def _sync_frame_duration(self):
+        """
+        打开音频通道前，把编解码器当前的帧长度写入 hello 的音频参数.
+        """
+        audio_codec = getattr(self, "audio_codec", None)
+        if audio_codec and self.protocol:
+            self.protocol.frame_duration = audio_codec.frame_duration
+
+    def _apply_server_audio_params(self):
+        """
+        音频通道打开后，应用服务器返回的下行音频参数.
+        """
+        audio_codec = getattr(self, "audio_codec", None)
+        if audio_codec and self.protocol:
+            audio_codec.apply_server_audio_params(self.protocol.server_audio_params)
+
+    def set_audio_frame_duration(self, frame_duration: int) -> bool:
+        """切换录音帧长度（如 10ms 低延迟打断 / 60ms 低负载），无需重启音频流.
+
+        Opus 数据包自带帧长信息，服务端可直接解码；新的帧长度会在下次 hello 中声明。
+        """
+        audio_codec = getattr(self, "audio_codec", None)
+        if not audio_codec or not audio_codec.set_frame_duration(frame_duration):
+            return False
+        if self.protocol:
+            self.protocol.frame_duration = frame_duration
+        return True
+
     def _initialize_async_objects(self) -> None:
         logger.debug("初始化异步对象")
         self._shutdown_event = asyncio.Event()
@@ -230,6 +262,7 @@ class Application:
         self.protocol.on_network_error(self._on_network_error)
         self.protocol.on_incoming_json(self._on_incoming_json)
         self.protocol.on_incoming_audio(self._on_incoming_audio)
+        self.protocol.on_audio_loss(self._on_audio_loss)
         self.protocol.on_audio_channel_opened(self._on_audio_channel_opened)
         self.protocol.on_audio_channel_closed(self._on_audio_channel_closed)
 
@@ -291,9 +324,23 @@ class Application:
         #     self._shutdown_event.set()
 
     def _on_incoming_audio(self, data: bytes):
-        logger.debug(f"收到二进制消息，长度: {len(data)}")
-        # 转发给插件
-        self.spawn(self.plugins.notify_incoming_audio(data), "plugin:on_audio")
+        # 直接交给解码线程排队（不为每个数据包创建任务，也不在事件循环上解码）
+        audio_codec = getattr(self, "audio_codec", None)
+        if audio_codec:
+            audio_codec.submit_audio(data)
+        # 仅在有插件监听原始音频时转发
+        if self.plugins.has_incoming_audio_listeners():
+            self.spawn(self.plugins.notify_incoming_audio(data), "plugin:on_audio")
+
+    def _on_audio_loss(self, lost_frames: int):
+        # 只有 MQTT/UDP 按序号检测丢包并调用此回调（FEC/PLC）；WebSocket 基于
+        # TCP、数据包不带序号，不会调用，其晚到/缺帧只由抖动缓冲欠载时的
+        # PLC 补帧处理（AudioCodec._next_playback_frame）。两者的差异是有意为之
+        logger.debug(f"检测到下行丢包: {lost_frames} 帧")
+        # 丢包标记与数据包进入同一解码队列，保证隐藏帧与后续音频的先后顺序
+        audio_codec = getattr(self, "audio_codec", None)
+        if audio_codec:
+            audio_codec.conceal_lost_frames(lost_frames)
 
     def _on_incoming_json(self, json_data):
         try:
@@ -318,35 +365,46 @@ class Application:
                             "state:tts_start_speaking",
                         )
                 elif state == "stop":
-                    if self.keep_listening:
-                        # 继续对话：根据当前模式重启监听
-                        async def _restart_listening():
-                            try:
-                                # REALTIME 且已在 LISTENING 时无需重复发送
-                                if not (
-                                    self.listening_mode == ListeningMode.REALTIME
-                                    and self.device_state == DeviceState.LISTENING
-                                ):
-                                    await self.protocol.send_start_listening(
-                                        self.listening_mode
-                                    )
-                            except Exception:
-                                pass
-                            self.keep_listening and await self.set_device_state(
-                                DeviceState.LISTENING
-                            )
-
-                        self.spawn(_restart_listening(), "state:tts_stop_restart")
-                    else:
-                        self.spawn(
-                            self.set_device_state(DeviceState.IDLE),
-                            "state:tts_stop_idle",
-                        )
+                    self.spawn(self._on_tts_stop(), "state:tts_stop")
             # 转发给插件
             self.spawn(self.plugins.notify_incoming_json(json_data), "plugin:on_json")
         except Exception:
             logger.info("收到JSON消息")
 
+    async def _on_tts_stop(self):
+        """
+        TTS 结束：等已收到的音频真正从扬声器放完再切换状态.
+
+        被打断时由中止流程切换状态，这里直接返回；等待超时（输出设备卡住、
+        尾音过长）时按正常结束处理，保持连续对话。
+        """
+        audio_codec = getattr(self, "audio_codec", None)
+        if audio_codec:
+            try:
+                completed = await audio_codec.wait_for_audio_complete()
+            except Exception as e:
+                logger.debug(f"等待播放完成失败: {e}")
+                completed = False
+            if not completed:
+                if self.aborted or self.device_state != DeviceState.SPEAKING:
+                    return
+                logger.warning("未等到播放完成，按TTS结束继续")
+
+        if self.keep_listening:
+            # 继续对话：根据当前模式重启监听
+            try:
+                # REALTIME 且已在 LISTENING 时无需重复发送
+                if not (
+                    self.listening_mode == ListeningMode.REALTIME
+                    and self.device_state == DeviceState.LISTENING
+                ):
+                    await self.protocol.send_start_listening(self.listening_mode)
+            except Exception:
+                pass
+            self.keep_listening and await self.set_device_state(DeviceState.LISTENING)
+        else:
+            await self.set_device_state(DeviceState.IDLE)
+
     async def _on_audio_channel_opened(self):
         logger.info("协议通道已打开")
         # 通道打开后进入 LISTENING（：简化为直读直写）
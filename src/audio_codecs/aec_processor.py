@@ -1,68 +1,185 @@
+import ctypes
 import platform
-from collections import deque
+import time
 from typing import Any, Dict, Optional
 
 import numpy as np
-import sounddevice as sd
 
+from src.audio_codecs.reference_aligner import DelayEstimator, ReferenceAligner
+from src.audio_codecs.resampler import create_resampler, describe_resampler
+from src.audio_codecs.ring_buffer import AudioRingBuffer
 from src.constants.constants import AudioConfig
+from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# AEC 模式
+# loopback：进程内播放参考（播放回调交给声卡的PCM）+ WebRTC APM
+AEC_MODE_LOOPBACK = "loopback"
+# blackhole：macOS 通过 BlackHole 虚拟设备回采播放信号 + WebRTC APM
+AEC_MODE_BLACKHOLE = "blackhole"
+# system：使用系统级回声消除，不做处理
+AEC_MODE_SYSTEM = "system"
+AEC_MODES = (AEC_MODE_LOOPBACK, AEC_MODE_BLACKHOLE, AEC_MODE_SYSTEM)
+
+# 延迟估计的平滑系数
+DELAY_SMOOTHING = 0.05
+
+_SHORT_PTR = ctypes.POINTER(ctypes.c_short)
+
+
+def _short_ptr(array: np.ndarray):
+    """
+    numpy int16 连续缓冲区的 short* 指针（不复制数据）.
+    """
+    return array.ctypes.data_as(_SHORT_PTR)
+
+
+def _as_int16_buffer(audio: np.ndarray) -> np.ndarray:
+    """
+    保证为一维连续的 int16 数组，已满足时原样返回.
+    """
+    audio = audio.reshape(-1)
+    if audio.dtype != np.int16 or not audio.flags.c_contiguous:
+        audio = np.ascontiguousarray(audio, dtype=np.int16)
+    return audio
+
 
 class AECProcessor:
     """
     音频回声消除处理器 专门用于处理参考信号（扬声器输出）和麦克风输入的AEC.
     """
 
-    def __init__(self):
+    def __init__(self, mode: Optional[str] = None):
         # 平台信息
         self._platform = platform.system().lower()
         self._is_macos = self._platform == "darwin"
         self._is_linux = self._platform == "linux"
         self._is_windows = self._platform == "windows"
 
-        # WebRTC APM 实例（仅 macOS 使用）
+        # AEC 模式："auto" 时 macOS 用 BlackHole，Linux 用进程内播放参考
+        if mode is None:
+            mode = ConfigManager.get_instance().get_config("AEC_OPTIONS.MODE", "auto")
+        self._mode = self._resolve_mode(mode)
+
+        # WebRTC APM 实例（loopback / blackhole 模式使用）
         self.apm = None
         self.apm_config = None
         self.capture_config = None
         self.render_config = None
 
-        # 参考信号流（仅 macOS 使用）
+        # 参考信号流（仅 blackhole 模式使用）
         self.reference_stream = None
         self.reference_device_id = None
         self.reference_sample_rate = None
 
         # 缓冲区
-        self._reference_buffer = deque()
         self._webrtc_frame_size = 160  # WebRTC标准：16kHz, 10ms = 160 samples
+        # 保持约500ms的参考数据，写满时自动丢弃最旧数据
+        self._reference_buffer = AudioRingBuffer(self._webrtc_frame_size * 50)
         self._system_frame_size = AudioConfig.INPUT_FRAME_SIZE  # 系统配置的帧大小
 
+        # 进程内参考（loopback 模式）：播放采样率 -> 16kHz 的重采样器
+        self._playback_rate = None
+        self._reference_resampler = None
+        self._reference_resampler_delay_ms = 0.0
+        self._reference_frame = np.zeros(self._webrtc_frame_size, dtype=np.int16)
+
+        # APM 调用使用的预分配缓冲区：blackhole 模式配对取出的参考帧、
+        # 参考处理结果（不使用）、采集处理结果
+        self._paired_reference_frame = np.zeros(self._webrtc_frame_size, dtype=np.int16)
+        self._render_output = np.zeros(self._webrtc_frame_size, dtype=np.int16)
+        self._render_output_ptr = _short_ptr(self._render_output)
+        self._capture_output = np.zeros(AudioConfig.INPUT_FRAME_SIZE, dtype=np.int16)
+        # 处理耗时统计
+        self._processed_frames = 0
+        self._process_time = 0.0
+        self._max_process_time = 0.0
+        # 延迟估计：播放设备延迟 + 录音设备延迟（秒），由音频回调持续更新
+        self._render_latency = 0.0
+        self._capture_latency = 0.0
+        # 最新送入APM的参考采样的播放时刻、待处理录音帧末尾的采集时刻（流时钟，秒）
+        self._render_end_time = None
+        self._capture_end_time = None
+        self._estimated_delay_ms = 0.0
+        self._base_delay_ms = 0
+        self._applied_delay_ms = None
+        self._reference_stats = {"fed": 0, "rendered": 0}
+
+        # 独立声卡参考（blackhole 模式）：漂移补偿对齐 + 互相关延迟估计
+        alignment = (
+            ConfigManager.get_instance().get_config("AEC_OPTIONS.ALIGNMENT", {}) or {}
+        )
+        self._min_delay_ms = alignment.get("MIN_DELAY_MS", 5)
+        self._reference_aligner = ReferenceAligner(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            target_ms=alignment.get("TARGET_MS", 20),
+            max_drift_ppm=alignment.get("MAX_DRIFT_PPM", 1000),
+        )
+        self._delay_estimator = DelayEstimator(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            max_delay_ms=alignment.get("MAX_DELAY_MS", 250),
+        )
+
         # 状态标志
         self._is_initialized = False
         self._is_closing = False
 
+    def _resolve_mode(self, mode: str) -> str:
+        mode = str(mode or "auto").lower()
+        if mode == "auto":
+            if self._is_macos:
+                return AEC_MODE_BLACKHOLE
+            if self._is_linux:
+                return AEC_MODE_LOOPBACK
+            return AEC_MODE_SYSTEM
+        if mode not in AEC_MODES:
+            logger.warning(f"未知的AEC模式: {mode}，使用系统级回声消除")
+            return AEC_MODE_SYSTEM
+        if mode == AEC_MODE_BLACKHOLE and not self._is_macos:
+            logger.warning("BlackHole 参考仅支持 macOS，改用进程内播放参考")
+            return AEC_MODE_LOOPBACK
+        return mode
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def uses_playback_reference(self) -> bool:
+        """
+        是否需要播放回调提供参考信号（进程内参考）.
+        """
+        return self._mode == AEC_MODE_LOOPBACK and self.apm is not None
+
+    @property
+    def processes_capture(self) -> bool:
+        """
+        是否需要对录音做回声消除（系统级AEC时不处理）.
+        """
+        return self._is_initialized and self.apm is not None
+
     async def initialize(self):
         """
         初始化AEC处理器.
         """
         try:
-            if self._is_windows or self._is_linux:
-                # Windows 和 Linux 平台使用系统级AEC，无需额外处理
+            if self._mode == AEC_MODE_SYSTEM:
+                # 使用系统级AEC（Windows 等），无需额外处理
                 logger.info(
                     f"{self._platform.capitalize()} 平台使用系统级回声消除，AEC处理器已启用"
                 )
                 self._is_initialized = True
                 return
-            elif self._is_macos:
+            elif self._mode == AEC_MODE_BLACKHOLE:
                 # macOS 平台使用 WebRTC + BlackHole
                 await self._initialize_apm()
                 await self._initialize_reference_capture()
             else:
-                logger.warning(f"当前平台 {self._platform} 暂不支持AEC功能")
-                self._is_initialized = True
-                return
+                # 进程内播放参考：参考信号由 AudioCodec 播放回调通过 feed_reference 提供
+                await self._initialize_apm()
+                logger.info("AEC使用进程内播放参考信号")
 
             self._is_initialized = True
             logger.info("AEC处理器初始化完成")
@@ -74,14 +191,10 @@ class AECProcessor:
 
     async def _initialize_apm(self):
         """
-        初始化WebRTC音频处理模块（仅macOS）
+        初始化WebRTC音频处理模块（macOS / Linux）
         """
-        if not self._is_macos:
-            logger.warning("非macOS平台调用了_initialize_apm，这不应该发生")
-            return
-
         try:
-            # 延迟导入，仅在macOS需要时加载本地库
+            # 延迟导入，仅在需要时加载本地库
             from libs.webrtc_apm import WebRTCAudioProcessing, create_default_config
 
             self.apm = WebRTCAudioProcessing()
@@ -94,7 +207,8 @@ class AECProcessor:
             self.apm_config.echo.mobile_mode = False
             self.apm_config.echo.enforce_high_pass_filtering = True
 
-            # 启用噪声抑制
+            # 噪声抑制：默认启用；录音预处理的降噪级实际运行时由 AudioCodec
+            # 通过 set_noise_suppression 关闭，避免重复处理
             self.apm_config.noise_suppress.enabled = True
             self.apm_config.noise_suppress.noise_level = 2  # HIGH
 
@@ -114,15 +228,54 @@ class AECProcessor:
             self.capture_config = self.apm.create_stream_config(sample_rate, channels)
             self.render_config = self.apm.create_stream_config(sample_rate, channels)
 
-            # 设置流延迟
-            self.apm.set_stream_delay_ms(40)  # 50ms延迟
+            # 设置流延迟（进程内参考模式下按实测延迟持续更新）
+            self.apm.set_stream_delay_ms(40)
+            self._applied_delay_ms = 40
 
             logger.info("WebRTC APM初始化完成")
 
         except Exception as e:
             logger.error(f"WebRTC APM初始化失败: {e}")
+            self._release_apm()
             raise
 
+    def set_noise_suppression(self, enabled: bool) -> bool:
+        """
+        运行时开关 AEC 自带的噪声抑制（APM 的 ApplyConfig 可在处理中调用）.
+        """
+        if self.apm is None or self.apm_config is None:
+            return False
+        enabled = bool(enabled)
+        if self.apm_config.noise_suppress.enabled == enabled:
+            return True
+        self.apm_config.noise_suppress.enabled = enabled
+        result = self.apm.apply_config(self.apm_config)
+        if result != 0:
+            logger.warning(f"切换AEC噪声抑制失败，错误码: {result}")
+            return False
+        logger.info(f"AEC噪声抑制: {'启用' if enabled else '禁用'}")
+        return True
+
+    def _release_apm(self):
+        """
+        释放 APM 实例及其流配置.
+        """
+        apm = self.apm
+        if apm is None:
+            return
+        try:
+            if self.capture_config:
+                apm.destroy_stream_config(self.capture_config)
+            if self.render_config:
+                apm.destroy_stream_config(self.render_config)
+            apm.close()
+        except Exception as e:
+            logger.warning(f"清理APM配置失败: {e}")
+        finally:
+            self.capture_config = None
+            self.render_config = None
+            self.apm = None
+
     async def _initialize_reference_capture(self):
         """
         初始化参考信号捕获（仅macOS）
@@ -139,6 +292,14 @@ class AECProcessor:
 
             self.reference_device_id = reference_device["id"]
             self.reference_sample_rate = int(reference_device["default_samplerate"])
+            if self.reference_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
+                self._reference_resampler = create_resampler(
+                    self.reference_sample_rate,
+                    AudioConfig.INPUT_SAMPLE_RATE,
+                    AudioConfig.CHANNELS,
+                )
+            self._reference_aligner.reset()
+            self._delay_estimator.reset()
 
             # 创建参考信号输入流（固定使用10ms帧，匹配WebRTC标准）
             webrtc_frame_duration = 0.01  # 10ms，WebRTC标准帧长度
@@ -146,6 +307,9 @@ class AECProcessor:
                 self.reference_sample_rate * webrtc_frame_duration
             )
 
+            # 延迟导入：仅 macOS 参考信号捕获需要 PortAudio
+            import sounddevice as sd
+
             self.reference_stream = sd.InputStream(
                 device=self.reference_device_id,
                 samplerate=self.reference_sample_rate,
@@ -172,6 +336,8 @@ class AECProcessor:
         查找BlackHole 2ch虚拟设备.
         """
         try:
+            import sounddevice as sd
+
             devices = sd.query_devices()
             for i, device in enumerate(devices):
                 device_name = device["name"].lower()
@@ -213,26 +379,17 @@ class AECProcessor:
             return
 
         try:
-            audio_data = indata.copy().flatten()
+            audio_data = indata.reshape(-1)
 
-            # 重采样到16kHz（如果需要）
-            if self.reference_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
-                # 简单的降采样处理（实际应用中应使用更好的重采样器）
-                ratio = AudioConfig.INPUT_SAMPLE_RATE / self.reference_sample_rate
-                target_length = int(len(audio_data) * ratio)
-                audio_data = np.interp(
-                    np.linspace(0, len(audio_data) - 1, target_length),
-                    np.arange(len(audio_data)),
-                    audio_data,
-                ).astype(np.int16)
-
-            # 添加到参考缓冲区
-            self._reference_buffer.extend(audio_data)
-
-            # 保持缓冲区大小合理
-            max_buffer_size = self._webrtc_frame_size * 20  # 保持约200ms的数据
-            while len(self._reference_buffer) > max_buffer_size:
-                self._reference_buffer.popleft()
+            # 重采样到16kHz（如果需要），重采样器跨回调保留状态
+            if self._reference_resampler is not None:
+                audio_data = self._reference_resampler.resample_chunk(
+                    audio_data, last=False
+                )
+
+            # 写入对齐缓冲（有界，漂移补偿在录音线程读取时进行）
+            if len(audio_data):
+                self._reference_aligner.write(audio_data)
 
         except Exception as e:
             logger.error(f"参考信号回调错误: {e}")
@@ -243,11 +400,131 @@ class AECProcessor:
         """
         logger.info("参考信号流已结束")
 
-    def process_audio(self, capture_audio: np.ndarray) -> np.ndarray:
+    # -----------------------
+    # 进程内播放参考（loopback 模式）
+    # -----------------------
+    def attach_playback(self, sample_rate: int):
+        """
+        设置播放设备采样率（播放流创建/重建后调用），参考信号重采样到16kHz.
+        """
+        sample_rate = int(sample_rate)
+        if sample_rate == self._playback_rate:
+            return
+        self._playback_rate = sample_rate
+        self._reference_buffer.clear()
+        if sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
+            self._reference_resampler = create_resampler(
+                sample_rate, AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.CHANNELS
+            )
+            self._reference_resampler_delay_ms = describe_resampler(
+                sample_rate, AudioConfig.INPUT_SAMPLE_RATE
+            )["group_delay_ms"]
+        else:
+            self._reference_resampler = None
+            self._reference_resampler_delay_ms = 0.0
+        logger.info(f"AEC播放参考: {sample_rate}Hz -> 16kHz")
+
+    def feed_reference(
+        self, pcm: np.ndarray, latency: float, current_time: Optional[float] = None
+    ):
+        """写入播放参考（播放回调中调用）：即将交给声卡的PCM、输出延迟（秒）和回调时刻.
+
+        参考在播放线程中直接按10ms帧送入APM（render stream），与录音线程的
+        capture stream 并行；静音块也需写入，使参考信号与播放时间轴连续。
+        """
+        if self._is_closing or self._playback_rate is None or self.apm is None:
+            return
+        try:
+            samples = pcm.reshape(-1)
+            if self._reference_resampler is not None:
+                samples = self._reference_resampler.resample_chunk(samples, last=False)
+            if len(samples):
+                self._reference_buffer.write(samples)
+                self._reference_stats["fed"] += len(samples)
+            self._render_latency = latency
+
+            frame_size = self._webrtc_frame_size
+            while len(self._reference_buffer) >= frame_size:
+                reference = self._reference_buffer.read(
+                    frame_size, out=self._reference_frame
+                )
+                self._process_render_frame(reference)
+                self._reference_stats["rendered"] += frame_size
+
+            if current_time:
+                # 已送入APM的最后一个参考采样的实际播放时刻：本块末尾的播放时刻，
+                # 扣除未凑满10ms而留在缓冲中的采样和参考重采样延迟
+                self._render_end_time = (
+                    current_time
+                    + latency
+                    + len(pcm) / self._playback_rate
+                    - len(self._reference_buffer) / AudioConfig.INPUT_SAMPLE_RATE
+                    - self._reference_resampler_delay_ms / 1000
+                )
+        except Exception as e:
+            logger.error(f"写入AEC参考信号失败: {e}")
+
+    def set_capture_latency(self, latency: float):
+        """
+        更新录音路径延迟（秒，录音回调中调用）：设备输入延迟 + 输入重采样延迟.
+        """
+        self._capture_latency = latency
+
+    def set_capture_time(self, end_time: Optional[float]):
+        """
+        下一个待处理录音帧最后一个采样的采集时刻（与播放流同一时钟，None 表示未知）.
+        """
+        self._capture_end_time = end_time
+
+    def _update_delay_estimate(self) -> int:
+        """估计参考送入APM到对应回声送入APM的延迟（毫秒）.
+
+        APM 按送入的采样计数对齐两路信号，延迟 = 最新参考采样的播放时刻 -
+        本帧末尾采样的采集时刻；声卡不提供时间戳时退化为 播放设备延迟 +
+        录音设备延迟 - 参考重采样延迟。扬声器到麦克风的声学延迟由 APM
+        内部的延迟估计器跟踪。
+        """
+        if self._render_end_time and self._capture_end_time:
+            measured = (self._render_end_time - self._capture_end_time) * 1000
+        else:
+            measured = (
+                self._render_latency + self._capture_latency
+            ) * 1000 - self._reference_resampler_delay_ms
+        if self._estimated_delay_ms <= 0:
+            self._estimated_delay_ms = measured
+        else:
+            self._estimated_delay_ms += DELAY_SMOOTHING * (
+                measured - self._estimated_delay_ms
+            )
+        return max(0, int(round(self._estimated_delay_ms)))
+
+    def _chunk_delay_ms(self, index: int, num_chunks: int) -> int:
+        """
+        大帧中第 index 个10ms块的延迟：整帧凑齐后才处理，越靠前的块等待越久.
+        """
+        return self._base_delay_ms + (num_chunks - 1 - index) * 10
+
+    def get_delay_estimate(self) -> Dict[str, Any]:
+        return {
+            "estimated_delay_ms": round(self._estimated_delay_ms, 1),
+            "applied_delay_ms": self._applied_delay_ms,
+            "render_latency_ms": round(self._render_latency * 1000, 1),
+            "capture_latency_ms": round(self._capture_latency * 1000, 1),
+            "reference_resampler_delay_ms": self._reference_resampler_delay_ms,
+        }
+
+    def process_audio(
+        self, capture_audio: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """处理音频帧，应用AEC 支持10ms/20ms/40ms/60ms等不同帧长度，通过分割处理实现.
 
+        各10ms块以numpy缓冲区指针直接传给APM，结果写入输出缓冲区对应位置，
+        不逐采样构造ctypes数组，也不拼接。
+
         Args:
             capture_audio: 麦克风采集的音频数据 (16kHz, int16)
+            out: 输出缓冲区，可传入 capture_audio 本身原地处理；
+                为 None 时写入预分配缓冲区（返回值在下一次调用前有效）
 
         Returns:
             处理后的音频数据
@@ -255,15 +532,16 @@ class AECProcessor:
         if not self._is_initialized:
             return capture_audio
 
-        # Windows 和 Linux 平台直接返回原始音频（系统级处理）
-        if self._is_windows or self._is_linux:
-            return capture_audio
-
-        # macOS 平台使用 WebRTC AEC 处理
-        if not self._is_macos or self.apm is None:
+        # 系统级AEC或APM不可用时直接返回原始音频
+        if self._mode == AEC_MODE_SYSTEM or self.apm is None:
             return capture_audio
 
         try:
+            if self._mode == AEC_MODE_LOOPBACK:
+                # 参考已在播放线程送入，这里按估计的延迟处理录音
+                self._base_delay_ms = self._update_delay_estimate()
+                self._applied_delay_ms = self._base_delay_ms
+
             # 检查输入帧大小是否为WebRTC帧大小的整数倍
             if len(capture_audio) % self._webrtc_frame_size != 0:
                 logger.warning(
@@ -271,123 +549,184 @@ class AECProcessor:
                 )
                 return capture_audio
 
+            start = time.perf_counter()
+            capture_audio = _as_int16_buffer(capture_audio)
+            if out is None:
+                out = self._output_buffer(len(capture_audio))
+
             # 计算需要分割的块数
             num_chunks = len(capture_audio) // self._webrtc_frame_size
 
             if num_chunks == 1:
                 # 10ms帧，直接处理
-                return self._process_single_aec_frame(capture_audio)
+                result = self._process_single_aec_frame(capture_audio, out)
             else:
                 # 20ms/40ms/60ms帧，分割处理
-                return self._process_chunked_aec_frames(capture_audio, num_chunks)
+                result = self._process_chunked_aec_frames(
+                    capture_audio, num_chunks, out
+                )
+
+            elapsed = time.perf_counter() - start
+            self._processed_frames += 1
+            self._process_time += elapsed
+            if elapsed > self._max_process_time:
+                self._max_process_time = elapsed
+            return result
 
         except Exception as e:
             logger.error(f"AEC处理失败: {e}")
             return capture_audio
 
-    def _process_single_aec_frame(self, capture_audio: np.ndarray) -> np.ndarray:
+    def _output_buffer(self, frames: int) -> np.ndarray:
         """
-        处理单个10ms WebRTC帧（仅macOS）
+        预分配的输出缓冲区（按需扩容）.
         """
-        if not self._is_macos:
-            return capture_audio
-
-        try:
-            # 仅在macOS导入ctypes
-            import ctypes
-
-            # 获取参考信号
-            reference_audio = self._get_reference_frame(self._webrtc_frame_size)
+        if frames > len(self._capture_output):
+            self._capture_output = np.zeros(frames, dtype=np.int16)
+        return self._capture_output[:frames]
 
-            # 创建ctypes缓冲区
-            capture_buffer = (ctypes.c_short * self._webrtc_frame_size)(*capture_audio)
-            reference_buffer = (ctypes.c_short * self._webrtc_frame_size)(
-                *reference_audio
-            )
-
-            processed_capture = (ctypes.c_short * self._webrtc_frame_size)()
-            processed_reference = (ctypes.c_short * self._webrtc_frame_size)()
+    def _process_single_aec_frame(
+        self, capture_audio: np.ndarray, out: np.ndarray
+    ) -> np.ndarray:
+        """
+        处理单个10ms WebRTC帧：blackhole 模式下每帧配对取一帧参考，loopback 模式下参考已预先送入
+        """
+        if self._mode == AEC_MODE_BLACKHOLE:
+            # 首先处理参考信号（render stream），并用配对的参考/录音更新延迟估计
+            reference = self._get_reference_frame()
+            self._process_render_frame(reference)
+            if self._delay_estimator.add(reference, capture_audio):
+                self._apply_delay_estimate()
+        return self._process_capture_chunk(capture_audio, out)
+
+    def _process_render_frame(self, reference_audio: np.ndarray):
+        """
+        将一帧10ms参考信号送入APM（render stream），直接传递numpy缓冲区指针
+        """
+        render_result = self.apm.process_reverse_stream(
+            _short_ptr(reference_audio),
+            self.render_config,
+            self.render_config,
+            self._render_output_ptr,
+        )
 
-            # 首先处理参考信号（render stream）
-            render_result = self.apm.process_reverse_stream(
-                reference_buffer,
-                self.render_config,
-                self.render_config,
-                processed_reference,
-            )
+        if render_result != 0:
+            logger.warning(f"参考信号处理失败，错误码: {render_result}")
 
-            if render_result != 0:
-                logger.warning(f"参考信号处理失败，错误码: {render_result}")
+    def _process_capture_chunk(
+        self, capture_audio: np.ndarray, out: np.ndarray
+    ) -> np.ndarray:
+        """
+        处理一帧10ms采集信号（capture stream），结果写入 out（可与 capture_audio 为同一缓冲区）
+        """
+        try:
+            if self._applied_delay_ms is not None:
+                # APM 要求每次 ProcessStream 前设置流延迟
+                self.apm.set_stream_delay_ms(self._applied_delay_ms)
 
-            # 然后处理采集信号（capture stream）
+            # 处理采集信号（capture stream），APM 允许输入输出指向同一内存
             capture_result = self.apm.process_stream(
-                capture_buffer,
+                _short_ptr(capture_audio),
                 self.capture_config,
                 self.capture_config,
-                processed_capture,
+                _short_ptr(out),
             )
 
             if capture_result != 0:
                 logger.warning(f"采集信号处理失败，错误码: {capture_result}")
-                return capture_audio
-
-            # 转换回numpy数组
-            return np.array(processed_capture, dtype=np.int16)
+                if out is not capture_audio:
+                    out[:] = capture_audio
 
         except Exception as e:
             logger.error(f"AEC帧处理失败: {e}")
-            return capture_audio
+            if out is not capture_audio:
+                out[:] = capture_audio
+        return out
 
     def _process_chunked_aec_frames(
-        self, capture_audio: np.ndarray, num_chunks: int
+        self, capture_audio: np.ndarray, num_chunks: int, out: np.ndarray
     ) -> np.ndarray:
         """
-        分割处理大帧（20ms/40ms/60ms等）
+        分割处理大帧（20ms/40ms/60ms等），各10ms块直接写入输出缓冲区对应位置
         """
-        processed_chunks = []
-
+        frame_size = self._webrtc_frame_size
         for i in range(num_chunks):
-            # 提取当前10ms块
-            start_idx = i * self._webrtc_frame_size
-            end_idx = (i + 1) * self._webrtc_frame_size
-            chunk = capture_audio[start_idx:end_idx]
+            start_idx = i * frame_size
+            end_idx = start_idx + frame_size
 
-            # 处理这个10ms块
-            processed_chunk = self._process_single_aec_frame(chunk)
-            processed_chunks.append(processed_chunk)
+            if self._mode == AEC_MODE_LOOPBACK:
+                self._applied_delay_ms = self._chunk_delay_ms(i, num_chunks)
 
-        # 将所有处理后的块重新组合
-        return np.concatenate(processed_chunks)
+            self._process_single_aec_frame(
+                capture_audio[start_idx:end_idx], out[start_idx:end_idx]
+            )
+        return out
 
-    def _get_reference_frame(self, frame_size: int) -> np.ndarray:
+    def _get_reference_frame(self) -> np.ndarray:
         """
-        获取指定大小的参考信号帧.
+        获取一帧10ms对齐后的参考信号（blackhole 模式），不足时补静音.
+        """
+        return self._reference_aligner.read(
+            self._webrtc_frame_size, self._paired_reference_frame
+        )
+
+    def _apply_delay_estimate(self):
+        """互相关得到新的延迟估计后更新 APM 流延迟（blackhole 模式）.
+
+        估计值小于 MIN_DELAY_MS 说明参考缓冲过深、参考晚于回声送入，
+        APM 无法消除，此时降低对齐缓冲的目标水位并重新估计。
         """
-        # 如果没有参考信号或缓冲区不足，返回静音
-        if len(self._reference_buffer) < frame_size:
-            return np.zeros(frame_size, dtype=np.int16)
+        delay_ms = self._delay_estimator.delay_ms
+        if delay_ms >= self._min_delay_ms:
+            self._applied_delay_ms = int(round(delay_ms))
+            logger.debug(f"AEC参考延迟: {self._applied_delay_ms}ms")
+            return
 
-        # 从缓冲区提取一帧
-        frame_data = []
-        for _ in range(frame_size):
-            frame_data.append(self._reference_buffer.popleft())
+        aligner = self._reference_aligner
+        target = aligner.target_ms - (self._min_delay_ms - delay_ms)
+        if target < 0:
+            logger.warning(
+                f"AEC参考信号晚于回声 {-delay_ms:.1f}ms，已无法通过缩小缓冲补偿"
+            )
+            target = 0.0
+        aligner.set_target_ms(target)
+        self._delay_estimator.reset()
+        logger.info(f"AEC参考晚于回声，参考缓冲目标降至 {target:.1f}ms")
 
-        return np.array(frame_data, dtype=np.int16)
+    def get_alignment_stats(self) -> Dict[str, Any]:
+        """
+        独立声卡参考的对齐统计：缓冲水位、时钟漂移、互相关延迟.
+        """
+        return {
+            **self._reference_aligner.get_stats(),
+            "delay": self._delay_estimator.get_stats(),
+        }
 
     def is_reference_available(self) -> bool:
         """
         检查参考信号是否可用.
         """
-        if self._is_windows or self._is_linux:
-            # Windows 和 Linux 使用系统级AEC，总是可用
+        if self._mode == AEC_MODE_SYSTEM:
+            # 系统级AEC，总是可用
             return self._is_initialized
 
-        # macOS 需要检查参考信号流
-        return (
-            self.reference_stream is not None
-            and self.reference_stream.active
-            and len(self._reference_buffer) >= self._webrtc_frame_size
-        )
+        if self._mode == AEC_MODE_LOOPBACK:
+            # 进程内参考：播放流已接入即可用
+            return self.apm is not None and self._playback_rate is not None
+
+        # BlackHole 需要检查参考信号流
+        return self.reference_stream is not None and self.reference_stream.active
+
+    def get_processing_stats(self) -> Dict[str, Any]:
+        """
+        录音帧AEC处理耗时统计.
+        """
+        frames = self._processed_frames
+        return {
+            "frames": frames,
+            "avg_us": (round(self._process_time / frames * 1e6, 2) if frames else 0.0),
+            "max_us": round(self._max_process_time * 1e6, 2),
+        }
 
     def get_status(self) -> Dict[str, Any]:
         """
@@ -396,35 +735,43 @@ class AECProcessor:
         status = {
             "initialized": self._is_initialized,
             "platform": self._platform,
+            # 实际运行的模式（auto 已按平台解析）
+            "mode": self._mode,
             "reference_available": self.is_reference_available(),
         }
 
-        if self._is_windows:
-            status.update(
-                {"aec_type": "system_level", "description": "Windows 系统底层回声消除"}
-            )
-        elif self._is_linux:
+        if self._mode == AEC_MODE_LOOPBACK:
             status.update(
                 {
-                    "aec_type": "system_level",
-                    "description": "Linux 系统级回声消除（PulseAudio）",
+                    "aec_type": "webrtc_loopback",
+                    "description": "WebRTC + 进程内播放参考",
+                    "reference_buffer_size": len(self._reference_buffer),
+                    "reference": dict(self._reference_stats),
+                    "delay": self.get_delay_estimate(),
+                    "processing": self.get_processing_stats(),
+                    "webrtc_apm_active": self.apm is not None,
                 }
             )
-        elif self._is_macos:
+        elif self._mode == AEC_MODE_BLACKHOLE:
             status.update(
                 {
                     "aec_type": "webrtc_blackhole",
                     "description": "WebRTC + BlackHole 参考信号",
                     "reference_device_id": self.reference_device_id,
-                    "reference_buffer_size": len(self._reference_buffer),
+                    "alignment": self.get_alignment_stats(),
+                    "applied_delay_ms": self._applied_delay_ms,
+                    "processing": self.get_processing_stats(),
                     "webrtc_apm_active": self.apm is not None,
                 }
             )
         else:
             status.update(
                 {
-                    "aec_type": "unsupported",
-                    "description": f"平台 {self._platform} 暂不支持AEC",
+                    "aec_type": "system_level",
+                    "description": (
+                        f"{self._platform.capitalize()} 系统级回声消除"
+                        "（由系统或声卡驱动处理，本程序不处理录音）"
+                    ),
                 }
             )
 
@@ -441,8 +788,8 @@ class AECProcessor:
         logger.info("开始关闭AEC处理器...")
 
         try:
-            # 仅在 macOS 平台清理 WebRTC 相关资源
-            if self._is_macos:
+            # 清理 WebRTC 相关资源
+            if self._mode != AEC_MODE_SYSTEM:
                 # 停止参考信号流
                 if self.reference_stream:
                     try:
@@ -454,21 +801,16 @@ class AECProcessor:
                         self.reference_stream = None
 
                 # 清理WebRTC APM
-                if self.apm:
-                    try:
-                        if self.capture_config:
-                            self.apm.destroy_stream_config(self.capture_config)
-                        if self.render_config:
-                            self.apm.destroy_stream_config(self.render_config)
-                    except Exception as e:
-                        logger.warning(f"清理APM配置失败: {e}")
-                    finally:
-                        self.capture_config = None
-                        self.render_config = None
-                        self.apm = None
+                self._release_apm()
 
             # 清理缓冲区
             self._reference_buffer.clear()
+            self._reference_aligner.reset()
+            self._delay_estimator.reset()
+            self._reference_resampler = None
+            self._playback_rate = None
+            self._render_end_time = None
+            self._capture_end_time = None
 
             self._is_initialized = False
             logger.info("AEC处理器已关闭")
@@ -0,0 +1,154 @@
+import os
+from typing import Any, Dict, List, Optional
+
+
+class AudioBackend:
+    """音频后端接口：设备枚举、能力检查和创建音频流.
+
+    AudioCodec 和设备能力缓存只通过该接口访问音频硬件，流对象需提供
+    start()/stop()/close()/active/latency，回调签名与 sounddevice 一致：
+    ``callback(data, frames, time_info, status)``。
+    """
+
+    name = "base"
+    # 虚拟设备：不读写配置中的设备索引/采样率
+    virtual = False
+
+    def query_devices(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def query_hostapis(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def default_device_index(self, kind: str) -> int:
+        """
+        系统默认设备索引（kind: 'input' 或 'output'），没有时返回 -1.
+        """
+        raise NotImplementedError
+
+    def check_settings(
+        self,
+        kind: str,
+        device: Optional[int],
+        samplerate: Optional[float],
+        channels: int,
+        dtype: Any = "int16",
+    ):
+        """
+        检查设备能否以指定参数打开，不支持时抛出异常.
+        """
+        raise NotImplementedError
+
+    def input_stream(self, **kwargs):
+        raise NotImplementedError
+
+    def output_stream(self, **kwargs):
+        raise NotImplementedError
+
+    def prepare(self, channels: int, dtype: Any):
+        """
+        打开流之前的全局设置（可选）.
+        """
+
+    def reinitialize(self):
+        """
+        重新扫描设备（可选，会中断已打开的流）.
+        """
+
+    def get_device_cache(self):
+        """
+        该后端的设备能力缓存.
+        """
+        from src.audio_codecs.device_cache import AudioDeviceCache
+
+        return AudioDeviceCache(backend=self, persist=False)
+
+
+class SoundDeviceBackend(AudioBackend):
+    """
+    基于 sounddevice (PortAudio) 的真实声卡后端.
+    """
+
+    name = "sounddevice"
+
+    def __init__(self):
+        # 延迟导入：没有 PortAudio 的环境（如无头CI）导入会失败，只在使用真实声卡时加载
+        import sounddevice as sd
+
+        self._sd = sd
+
+    def query_devices(self) -> List[Dict[str, Any]]:
+        return [dict(d) for d in self._sd.query_devices()]
+
+    def query_hostapis(self) -> List[Dict[str, Any]]:
+        return [dict(h) for h in self._sd.query_hostapis()]
+
+    def default_device_index(self, kind: str) -> int:
+        pos = 0 if kind == "input" else 1
+        try:
+            index = self._sd.default.device[pos]
+        except Exception:
+            index = None
+        if isinstance(index, int) and index >= 0:
+            return index
+
+        try:
+            hostapi = self._sd.query_hostapis(self._sd.default.hostapi)
+            return hostapi.get(f"default_{kind}_device", -1)
+        except Exception:
+            return -1
+
+    def check_settings(
+        self,
+        kind: str,
+        device: Optional[int],
+        samplerate: Optional[float],
+        channels: int,
+        dtype: Any = "int16",
+    ):
+        check = (
+            self._sd.check_input_settings
+            if kind == "input"
+            else self._sd.check_output_settings
+        )
+        check(device=device, samplerate=samplerate, channels=channels, dtype=dtype)
+
+    def input_stream(self, **kwargs):
+        return self._sd.InputStream(**kwargs)
+
+    def output_stream(self, **kwargs):
+        return self._sd.OutputStream(**kwargs)
+
+    def prepare(self, channels: int, dtype: Any):
+        # 不强行改全局默认采样率，让每个流自己带 device / samplerate
+        self._sd.default.samplerate = None
+        self._sd.default.channels = channels
+        self._sd.default.dtype = dtype
+
+    def reinitialize(self):
+        # PortAudio 只在初始化时扫描设备
+        self._sd._terminate()
+        self._sd._initialize()
+
+    def get_device_cache(self):
+        from src.audio_codecs.device_cache import AudioDeviceCache
+
+        return AudioDeviceCache.get_instance()
+
+
+def create_audio_backend(name: Optional[str] = None, **kwargs) -> AudioBackend:
+    """创建音频后端.
+
+    name 为空时读取环境变量 XIAOZHI_AUDIO_BACKEND，默认 sounddevice；
+    virtual 为文件/NumPy 驱动的虚拟设备（无声卡环境测试用），参数见 VirtualAudioBackend。
+    """
+    name = (name or os.getenv("XIAOZHI_AUDIO_BACKEND") or "sounddevice").lower()
+    if name == "sounddevice":
+        return SoundDeviceBackend()
+    if name == "virtual":
+        from src.audio_codecs.virtual_device import VirtualAudioBackend
+
+        if "input_source" not in kwargs and os.getenv("XIAOZHI_VIRTUAL_AUDIO_INPUT"):
+            kwargs["input_source"] = os.getenv("XIAOZHI_VIRTUAL_AUDIO_INPUT")
+        return VirtualAudioBackend(**kwargs)
+    raise ValueError(f"未知的音频后端: {name}，可选: sounddevice, virtual")
@@ -1,16 +1,36 @@
 import asyncio
 import gc
+import threading
 import time
 from collections import deque
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 import opuslib
-import sounddevice as sd
-import soxr
 
 from src.audio_codecs.aec_processor import AECProcessor
-from src.constants.constants import AudioConfig
+from src.audio_codecs.audio_backend import AudioBackend, SoundDeviceBackend
+from src.audio_codecs.capture_preprocessor import (
+    STAGE_NOISE_SUPPRESSION,
+    CapturePreprocessor,
+)
+from src.audio_codecs.downmix import MAX_CAPTURE_CHANNELS, create_downmixer
+from src.audio_codecs.frame_channel import FrameChannel
+from src.audio_codecs.frame_duration import (
+    MAX_FRAME_DURATION,
+    SUPPORTED_FRAME_DURATIONS,
+    choose_frame_duration,
+    is_supported_frame_duration,
+)
+from src.audio_codecs.frame_pool import AudioFramePool, PooledFrame
+from src.audio_codecs.jitter_buffer import AdaptiveJitterBuffer
+from src.audio_codecs.opus_decode_worker import OpusDecodeWorker
+from src.audio_codecs.output_mixer import MixerSource, OutputMixer
+from src.audio_codecs.playback_clock import PlaybackClock
+from src.audio_codecs.resampler import create_resampler, describe_resampler
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.audio_processing.vad_backends import WebRTCVADBackend
+from src.constants.constants import AudioConfig, is_official_server
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
@@ -25,10 +45,18 @@ class AudioCodec:
     2. 播放：接收 -> Opus解码24kHz -> 播放队列 -> 扬声器
     """
 
-    def __init__(self):
+    # 下行解码缓冲的最大帧长（Opus 单包最长120ms）
+    MAX_DECODE_FRAME_SIZE = AudioConfig.OUTPUT_SAMPLE_RATE * 120 // 1000
+    # 等待播放完成的超时 = 当时待播放的时长 + 该余量（秒），覆盖设备延迟和调度抖动
+    PLAYBACK_WAIT_MARGIN = 3.0
+
+    def __init__(self, backend: Optional[AudioBackend] = None):
         # 获取配置管理器
         self.config = ConfigManager.get_instance()
 
+        # 音频后端：默认真实声卡(sounddevice)，测试/基准可传入虚拟设备
+        self._backend = backend or SoundDeviceBackend()
+
         # Opus编解码器：录音16kHz编码，播放24kHz解码
         self.opus_encoder = None
         self.opus_decoder = None
@@ -38,33 +66,236 @@ class AudioCodec:
         self.device_output_sample_rate = None
         self.mic_device_id = None  # 麦克风设备ID（固定索引，一经写入配置不再覆盖）
         self.speaker_device_id = None  # 扬声器设备ID（固定索引）
+        # 设备能力缓存：避免反复枚举设备和探测采样率
+        self._device_cache = self._backend.get_device_cache()
 
         # 重采样器：录音重采样到16kHz，播放重采样到设备采样率
         self.input_resampler = None  # 设备采样率 -> 16kHz
         self.output_resampler = None  # 24kHz -> 设备采样率(播放用)
+        # 重采样档位与实测延迟（用于端到端延迟预算）
+        self._resampler_info = {}
 
-        # 重采样缓冲区
-        self._resample_input_buffer = deque()
-        self._resample_output_buffer = deque()
+        # 重采样缓冲区（预分配环形缓冲，在 _create_resamplers 中按设备采样率创建）
+        self._resample_input_buffer: Optional[AudioRingBuffer] = None
+        self._resample_output_buffer: Optional[AudioRingBuffer] = None
 
         self._device_input_frame_size = None
         self._is_closing = False
 
+        # 录音通道数（多麦克风阵列时 >1）与下混器（多通道 -> 单声道，位于重采样之前）
+        self._capture_channels = AudioConfig.CHANNELS
+        self._downmixer = None
+
+        # 帧长度（运行时参数）：录音按此长度分帧编码，可在不重建音频流的情况下切换
+        self._frame_duration = AudioConfig.FRAME_DURATION
+        self._input_frame_size = AudioConfig.INPUT_FRAME_SIZE
+        # 下行帧长度由收到的数据包决定（用于丢包隐藏的帧长）
+        self._output_frame_size = AudioConfig.OUTPUT_FRAME_SIZE
+
         # 音频流对象
         self.input_stream = None  # 录音流
         self.output_stream = None  # 播放流
 
-        # 队列：唤醒词检测和播放缓冲
-        self._wakeword_buffer = asyncio.Queue(maxsize=100)
-        self._output_buffer = asyncio.Queue(maxsize=500)
+        # 录音帧池：录音回调在预分配的帧上处理，编码器与唤醒词检测共享同一帧
+        # 按最长帧分配，切换帧长度时无需重建
+        self._capture_pool = AudioFramePool(
+            AudioConfig.INPUT_SAMPLE_RATE * MAX_FRAME_DURATION // 1000, count=128
+        )
+        self._captured_frames = 0
+
+        # 帧通道：唤醒词检测和播放缓冲（跨音频线程与事件循环，满时丢弃最旧帧）
+        # 唤醒词通道中是池化帧，被丢弃时归还帧池
+        self._wakeword_buffer = FrameChannel(
+            100, name="wake_word", on_drop=PooledFrame.release
+        )
+        self._output_buffer = FrameChannel(500, name="playback")
+        # 录音旁路订阅（VAD 等）：与唤醒词通道共享同一帧，录音回调只读快照
+        self._capture_taps: Dict[str, FrameChannel] = {}
+        self._capture_tap_snapshot = ()
+        self._capture_tap_lock = threading.Lock()
+
+        # 抖动缓冲：位于解码与播放之间，吸收网络抖动
+        self._jitter_buffer = self._create_jitter_buffer()
+
+        # 丢包隐藏：解码器会在事件循环和播放回调中使用，需加锁
+        self._decoder_lock = threading.Lock()
+        self._pending_lost_frames = 0
+        self._underrun_plc_frames = 0
+        self._max_concealment_ms = 60
+        self._plc_stats = {"lost": 0, "plc": 0, "fec": 0, "underrun_plc": 0}
+
+        # 下行解码线程：网络数据包在此排队，批量解码后直接写入抖动缓冲
+        self._decode_worker = OpusDecodeWorker(self._decode_batch, capacity=100)
+
+        # 播放位置：已写入/已交给声卡的采样数（24kHz）与设备输出延迟
+        self._playback_clock = PlaybackClock(AudioConfig.OUTPUT_SAMPLE_RATE)
+        self._output_latency = 0.0
+
+        # 播放混音器：TTS 与音乐/提示音在24kHz下混音后共用一个输出流和重采样器
+        self._mixer = self._create_mixer()
+        # 分帧缓冲中各段数据的 [采样数, 是否含TTS]，用于只按TTS推进播放位置
+        self._output_segments = deque()
+        self._pending_tts_output = 0
+        # 播放回调与事件循环中的清空操作共同修改分帧缓冲/分段记录，需加锁
+        self._output_lock = threading.Lock()
 
         # 实时编码回调（直接发送，不走队列）
         self._encoded_audio_callback = None
+        # 录音帧的语音判定（上行静音抑制用），在编码前计算，编码回调中读取
+        self._capture_vad: Optional[WebRTCVADBackend] = None
+        self._capture_voice = True
 
         # AEC处理器
         self.aec_processor = AECProcessor()
         self._aec_enabled = False
 
+        # 录音预处理（高通/降噪/瞬态抑制/自动增益），与AEC相互独立
+        self._preprocessor = CapturePreprocessor(
+            self.config.get_config("AUDIO_OPTIONS.PREPROCESS", {}) or {}
+        )
+        # 录音路径中输入重采样器的延迟（秒），计入AEC延迟估计
+        self._input_resampler_delay = 0.0
+        # 当前录音块末尾采样的采集时刻（流时钟），用于逐帧计算AEC延迟
+        self._aec_block_end_time = None
+
+    def _create_mixer(self) -> OutputMixer:
+        """
+        按配置创建播放混音器.
+        """
+        mixer_config = self.config.get_config("AUDIO_OPTIONS.MIXER", {}) or {}
+        return OutputMixer(
+            AudioConfig.OUTPUT_SAMPLE_RATE,
+            duck_gain=mixer_config.get("DUCK_GAIN", 0.2),
+            attack_ms=mixer_config.get("DUCK_ATTACK_MS", 50),
+            release_ms=mixer_config.get("DUCK_RELEASE_MS", 400),
+            hold_ms=mixer_config.get("DUCK_HOLD_MS", 300),
+            primary_gain=mixer_config.get("TTS_GAIN", 1.0),
+        )
+
+    def _create_jitter_buffer(self) -> AdaptiveJitterBuffer:
+        """
+        按配置创建播放抖动缓冲（禁用时目标延迟为0，收到即播）.
+        """
+        jb_config = self.config.get_config("AUDIO_OPTIONS.JITTER_BUFFER", {}) or {}
+        if not jb_config.get("ENABLED", True):
+            return AdaptiveJitterBuffer(
+                self._output_buffer,
+                AudioConfig.OUTPUT_SAMPLE_RATE,
+                AudioConfig.FRAME_DURATION,
+                target_delay_ms=0,
+                min_delay_ms=0,
+                max_delay_ms=0,
+                adaptive=False,
+            )
+
+        return AdaptiveJitterBuffer(
+            self._output_buffer,
+            AudioConfig.OUTPUT_SAMPLE_RATE,
+            AudioConfig.FRAME_DURATION,
+            target_delay_ms=jb_config.get("TARGET_DELAY_MS", 60),
+            min_delay_ms=jb_config.get("MIN_DELAY_MS", 20),
+            max_delay_ms=jb_config.get("MAX_DELAY_MS", 300),
+            adaptive=jb_config.get("ADAPTIVE", True),
+        )
+
+    @property
+    def frame_duration(self) -> int:
+        """
+        当前录音编码帧长度（毫秒）.
+        """
+        return self._frame_duration
+
+    def set_frame_duration(self, frame_duration: int) -> bool:
+        """切换录音编码帧长度，无需重建音频流.
+
+        录音回调按新的帧长度从缓冲中切帧；Opus 数据包自带帧长信息，
+        对端解码不受影响。音频流的 blocksize 保持不变，下次重建流时才会跟随。
+        """
+        if not is_supported_frame_duration(frame_duration):
+            logger.warning(
+                f"不支持的帧长度: {frame_duration}ms，"
+                f"可选: {SUPPORTED_FRAME_DURATIONS}"
+            )
+            return False
+        if frame_duration == self._frame_duration:
+            return True
+
+        # 先改帧长再改帧大小：录音回调总是读取 _input_frame_size
+        self._frame_duration = frame_duration
+        self._input_frame_size = AudioConfig.INPUT_SAMPLE_RATE * frame_duration // 1000
+        logger.info(f"录音帧长度切换为 {frame_duration}ms")
+        return True
+
+    def apply_server_audio_params(self, audio_params: dict):
+        """
+        应用服务器 hello 中的下行音频参数（帧长度用于丢包隐藏和抖动缓冲的初始估计）.
+        """
+        frame_duration = (audio_params or {}).get("frame_duration")
+        if not isinstance(frame_duration, int) or frame_duration <= 0:
+            return
+        self._output_frame_size = (
+            AudioConfig.OUTPUT_SAMPLE_RATE * frame_duration // 1000
+        )
+        self._jitter_buffer.set_frame_duration(frame_duration)
+        logger.info(f"下行帧长度: {frame_duration}ms")
+
+    def _concealment_frames(self) -> int:
+        """
+        最大隐藏时长对应的帧数（按当前下行帧长度）.
+        """
+        frame_ms = self._output_frame_size * 1000 // AudioConfig.OUTPUT_SAMPLE_RATE
+        return max(1, int(self._max_concealment_ms // max(frame_ms, 1)))
+
+    async def _select_frame_duration(self) -> int:
+        """按配置确定初始帧长度.
+
+        AUDIO_OPTIONS.FRAME_DURATION 为整数时固定使用；为 "auto"（需显式开启）时，
+        官方服务器按实测 CPU 余量选择，其他服务器保持默认帧长以兼容；
+        未设置时使用默认帧长。
+        """
+        setting = self.config.get_config("AUDIO_OPTIONS.FRAME_DURATION", None)
+        if isinstance(setting, int) and is_supported_frame_duration(setting):
+            return setting
+        if setting != "auto":
+            return AudioConfig.FRAME_DURATION
+
+        ota_url = self.config.get_config("SYSTEM_OPTIONS.NETWORK.OTA_VERSION_URL")
+        if not is_official_server(ota_url):
+            return AudioConfig.FRAME_DURATION
+
+        try:
+            # 测量包含短暂的阻塞采样，放到线程池避免卡住事件循环
+            return await asyncio.get_running_loop().run_in_executor(
+                None, choose_frame_duration
+            )
+        except Exception as e:
+            logger.warning(f"测量CPU余量失败，使用默认帧长度: {e}")
+            return AudioConfig.FRAME_DURATION
+
+    def _configure_opus(self):
+        """
+        按配置设置编码器带内FEC/预期丢包率，以及解码侧最大隐藏时长.
+        """
+        opus_config = self.config.get_config("AUDIO_OPTIONS.OPUS", {}) or {}
+
+        self._max_concealment_ms = opus_config.get("MAX_CONCEALMENT_MS", 60)
+
+        if not opus_config.get("INBAND_FEC", False):
+            return
+        try:
+            # opuslib 的 inband_fec 属性 setter 未传参，直接走 ctl 接口
+            state = self.opus_encoder.encoder_state
+            opuslib.api.encoder.encoder_ctl(state, opuslib.api.ctl.set_inband_fec, 1)
+            packet_loss_perc = int(opus_config.get("PACKET_LOSS_PERC", 10))
+            opuslib.api.encoder.encoder_ctl(
+                state,
+                opuslib.api.ctl.set_packet_loss_perc,
+                min(max(packet_loss_perc, 0), 100),
+            )
+            logger.info(f"Opus带内FEC已启用，预期丢包率: {packet_loss_perc}%")
+        except Exception as e:
+            logger.warning(f"设置Opus带内FEC失败: {e}")
+
     # -----------------------
     # 自动选择设备的辅助方法
     # -----------------------
@@ -75,8 +306,8 @@ class AudioCodec:
         """
         assert kind in ("input", "output")
         try:
-            devices = sd.query_devices()
-            hostapis = sd.query_hostapis()
+            devices = self._device_cache.devices()
+            hostapis = self._device_cache.hostapis()
         except Exception as e:
             logger.warning(f"枚举设备失败：{e}")
             return None
@@ -104,8 +335,8 @@ class AudioCodec:
 
         # 2) 退而求其次：根据系统默认（kind）返回的名字匹配 + 优先 WASAPI
         try:
-            default_info = sd.query_devices(kind=kind)  # 不会触发 -1
-            default_name = default_info.get("name")
+            default_info = self._device_cache.default_device(kind)  # 不会触发 -1
+            default_name = default_info.get("name") if default_info else None
         except Exception:
             default_name = None
 
@@ -160,17 +391,16 @@ class AudioCodec:
             await self._select_audio_devices()
 
             # 安全获取输入/输出默认信息（避免 -1）
-            if self.mic_device_id is not None and self.mic_device_id >= 0:
-                input_device_info = sd.query_devices(self.mic_device_id)
-            else:
-                input_device_info = sd.query_devices(kind="input")
-
-            if self.speaker_device_id is not None and self.speaker_device_id >= 0:
-                output_device_info = sd.query_devices(self.speaker_device_id)
-            else:
-                output_device_info = sd.query_devices(kind="output")
+            input_device_info = self._device_cache.get_device(
+                self.mic_device_id
+            ) or self._device_cache.default_device("input")
+            output_device_info = self._device_cache.get_device(
+                self.speaker_device_id
+            ) or self._device_cache.default_device("output")
+            if input_device_info is None or output_device_info is None:
+                raise RuntimeError("未找到可用的音频输入/输出设备")
             # 从配置或设备获取采样率
-            audio_config = self.config.get_config("AUDIO_DEVICES", {}) or {}
+            audio_config = self._get_audio_devices_config()
             configured_input_rate = audio_config.get("input_sample_rate")
             configured_output_rate = audio_config.get("output_sample_rate")
 
@@ -185,7 +415,36 @@ class AudioCodec:
                 else int(output_device_info["default_samplerate"])
             )
 
-            frame_duration_sec = AudioConfig.FRAME_DURATION / 1000
+            self._capture_channels = self._select_capture_channels()
+
+            # 设备能直接以编解码采样率打开时，跳过重采样；配置中指定了采样率时
+            # 以配置为准
+            resampler_config = (
+                self.config.get_config("AUDIO_OPTIONS.RESAMPLER", {}) or {}
+            )
+            if resampler_config.get("PREFER_NATIVE_RATE", True):
+                if configured_input_rate is None:
+                    self.device_input_sample_rate = self._prefer_native_rate(
+                        True, self.device_input_sample_rate
+                    )
+                if configured_output_rate is None:
+                    self.device_output_sample_rate = self._prefer_native_rate(
+                        False, self.device_output_sample_rate
+                    )
+
+            self._downmixer = create_downmixer(
+                self._capture_channels,
+                self.device_input_sample_rate,
+                self.config.get_config("AUDIO_OPTIONS.CAPTURE", {}) or {},
+            )
+            if self._downmixer:
+                logger.info(
+                    f"多通道录音: {self._capture_channels} 通道, "
+                    f"下混模式: {self._downmixer.mode}"
+                )
+
+            self.set_frame_duration(await self._select_frame_duration())
+            frame_duration_sec = self._frame_duration / 1000
             self._device_input_frame_size = int(
                 self.device_input_sample_rate * frame_duration_sec
             )
@@ -197,9 +456,7 @@ class AudioCodec:
             await self._create_resamplers()
 
             # 不强行改全局默认，让每个流自己带 device / samplerate
-            sd.default.samplerate = None
-            sd.default.channels = AudioConfig.CHANNELS
-            sd.default.dtype = np.int16
+            self._backend.prepare(AudioConfig.CHANNELS, np.int16)
 
             await self._create_streams()
 
@@ -212,15 +469,24 @@ class AudioCodec:
             self.opus_decoder = opuslib.Decoder(
                 AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS
             )
+            self._configure_opus()
+            self._decode_worker.start()
+
+            # 初始化录音预处理（不可用时录音原样编码），AEC 据此决定是否自带降噪
+            self._preprocessor.initialize()
 
             # 初始化AEC处理器
             try:
                 await self.aec_processor.initialize()
+                if self.aec_processor.uses_playback_reference:
+                    # 进程内参考：播放回调把交给声卡的PCM作为AEC参考信号
+                    self.aec_processor.attach_playback(self.device_output_sample_rate)
                 self._aec_enabled = True
                 logger.info("AEC处理器启用")
             except Exception as e:
                 logger.warning(f"AEC处理器初始化失败，将使用原始音频: {e}")
                 self._aec_enabled = False
+            self._sync_aec_noise_suppression()
 
             logger.info("音频初始化完成")
         except Exception as e:
@@ -232,37 +498,147 @@ class AudioCodec:
         """
         创建重采样器 输入：设备采样率 -> 16kHz（用于编码） 输出：24kHz -> 设备采样率（播放用）
         """
+        # 分帧缓冲：录音按当前帧长度切帧，播放按设备块大小取数，
+        # 不需要重采样时也使用（帧长度与设备块大小可以不同）
+        # 约1秒的16kHz数据，远大于单次回调的产出量
+        self._resample_input_buffer = AudioRingBuffer(
+            AudioConfig.INPUT_SAMPLE_RATE * AudioConfig.CHANNELS
+        )
+        # 约1秒的设备采样率数据
+        self._resample_output_buffer = AudioRingBuffer(
+            self.device_output_sample_rate * AudioConfig.CHANNELS
+        )
+
+        resampler_config = self.config.get_config("AUDIO_OPTIONS.RESAMPLER", {}) or {}
+        input_profile = resampler_config.get("INPUT_PROFILE")
+        output_profile = resampler_config.get("OUTPUT_PROFILE")
+
         # 输入重采样器：设备采样率 -> 16kHz（用于编码）
         if self.device_input_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
-            self.input_resampler = soxr.ResampleStream(
+            self.input_resampler = create_resampler(
                 self.device_input_sample_rate,
                 AudioConfig.INPUT_SAMPLE_RATE,
                 AudioConfig.CHANNELS,
-                dtype="int16",
-                quality="QQ",
+                input_profile,
             )
             logger.info(f"输入重采样: {self.device_input_sample_rate}Hz -> 16kHz")
 
         # 输出重采样器：24kHz -> 设备采样率
         if self.device_output_sample_rate != AudioConfig.OUTPUT_SAMPLE_RATE:
-            self.output_resampler = soxr.ResampleStream(
+            self.output_resampler = create_resampler(
                 AudioConfig.OUTPUT_SAMPLE_RATE,
                 self.device_output_sample_rate,
                 AudioConfig.CHANNELS,
-                dtype="int16",
-                quality="QQ",
+                output_profile,
             )
             logger.info(
                 f"输出重采样: {AudioConfig.OUTPUT_SAMPLE_RATE}Hz -> {self.device_output_sample_rate}Hz"
             )
 
+        self._resampler_info = {
+            "input": describe_resampler(
+                self.device_input_sample_rate,
+                AudioConfig.INPUT_SAMPLE_RATE,
+                input_profile,
+            ),
+            "output": describe_resampler(
+                AudioConfig.OUTPUT_SAMPLE_RATE,
+                self.device_output_sample_rate,
+                output_profile,
+            ),
+        }
+        self._input_resampler_delay = (
+            self._resampler_info["input"]["group_delay_ms"] / 1000
+        )
+        for direction, info in self._resampler_info.items():
+            if not info["bypassed"]:
+                logger.info(
+                    f"{direction}重采样档位: {info['profile']}, "
+                    f"延迟: {info['group_delay_ms']}ms"
+                )
+
+    def _select_capture_channels(self) -> int:
+        """
+        按配置选择录音通道数（"auto" 为设备全部通道），不超过设备支持的通道数.
+        """
+        requested = (
+            self.config.get_config("AUDIO_OPTIONS.CAPTURE.CHANNELS", 1)
+            or AudioConfig.CHANNELS
+        )
+        caps = self._device_cache.get_capabilities(self.mic_device_id, "input")
+        max_channels = caps.get("max_channels") or AudioConfig.CHANNELS
+        if requested == "auto":
+            requested = max_channels
+
+        try:
+            channels = min(int(requested), max_channels, MAX_CAPTURE_CHANNELS)
+        except (TypeError, ValueError):
+            logger.warning(f"录音通道数配置无效: {requested}，使用单声道")
+            return AudioConfig.CHANNELS
+
+        if channels != requested:
+            logger.warning(
+                f"录音通道数 {requested} 超出设备/上限，使用 {channels} 通道"
+            )
+        return max(AudioConfig.CHANNELS, channels)
+
+    def _prefer_native_rate(self, is_input: bool, device_rate: int) -> int:
+        """
+        设备支持编解码采样率时返回该采样率（并记录改动），否则返回设备采样率.
+        """
+        native_rate = (
+            AudioConfig.INPUT_SAMPLE_RATE
+            if is_input
+            else AudioConfig.OUTPUT_SAMPLE_RATE
+        )
+        if device_rate == native_rate or not self._supports_native_rate(
+            is_input, native_rate
+        ):
+            return device_rate
+        logger.info(
+            f"{'输入' if is_input else '输出'}设备支持 {native_rate}Hz，"
+            f"以该采样率打开以跳过重采样（设备默认 {device_rate}Hz）"
+        )
+        return native_rate
+
+    def _supports_native_rate(self, is_input: bool, sample_rate: int) -> bool:
+        """
+        检查设备能否直接以指定采样率打开（能则无需重采样），结果来自设备能力缓存.
+        """
+        try:
+            return self._device_cache.supports(
+                self.mic_device_id if is_input else self.speaker_device_id,
+                "input" if is_input else "output",
+                sample_rate,
+                self._capture_channels if is_input else AudioConfig.CHANNELS,
+            )
+        except Exception:
+            return False
+
+    def get_device_capabilities(self) -> dict:
+        """
+        获取当前输入/输出设备的能力（支持的采样率、通道数、默认延迟）.
+        """
+        return {
+            "input": self._device_cache.get_capabilities(self.mic_device_id, "input"),
+            "output": self._device_cache.get_capabilities(
+                self.speaker_device_id, "output"
+            ),
+        }
+
+    def get_resampler_info(self) -> dict:
+        """
+        获取两个方向的重采样档位、是否直通及实测延迟（毫秒）.
+        """
+        return dict(self._resampler_info)
+
     async def _select_audio_devices(self):
         """显示并选择音频设备.
 
         优先使用配置文件中的设备，如果没有则自动选择并保存到配置（只在首次写入，之后不覆盖）。
         """
         try:
-            audio_config = self.config.get_config("AUDIO_DEVICES", {}) or {}
+            audio_config = self._get_audio_devices_config()
 
             # 是否已有明确配置（决定是否写回）
             had_cfg_input = "input_device_id" in audio_config
@@ -271,7 +647,7 @@ class AudioCodec:
             input_device_id = audio_config.get("input_device_id")
             output_device_id = audio_config.get("output_device_id")
 
-            devices = sd.query_devices()
+            devices = self._device_cache.devices()
 
             # --- 验证配置中的输入设备 ---
             if input_device_id is not None:
@@ -359,7 +735,7 @@ class AudioCodec:
             need_write = (not had_cfg_input and picked_input is not None) or (
                 not had_cfg_output and picked_output is not None
             )
-            if need_write:
+            if need_write and not self._backend.virtual:
                 await self._save_default_audio_config(
                     input_device_id=picked_input if not had_cfg_input else None,
                     output_device_id=picked_output if not had_cfg_output else None,
@@ -377,6 +753,14 @@ class AudioCodec:
                 else None
             )
 
+    def _get_audio_devices_config(self) -> dict:
+        """
+        配置中的音频设备（虚拟设备不使用配置中的设备索引和采样率）.
+        """
+        if self._backend.virtual:
+            return {}
+        return self.config.get_config("AUDIO_DEVICES", {}) or {}
+
     async def _save_default_audio_config(
         self, input_device_id: Optional[int], output_device_id: Optional[int]
     ):
@@ -384,7 +768,7 @@ class AudioCodec:
         保存默认音频设备配置到配置文件（仅针对传入的非空设备；不会覆盖已有字段）。
         """
         try:
-            devices = sd.query_devices()
+            devices = self._device_cache.devices()
             audio_config_patch = {}
 
             # 保存输入设备配置
@@ -429,10 +813,10 @@ class AudioCodec:
         """
         try:
             # 麦克风输入流
-            self.input_stream = sd.InputStream(
+            self.input_stream = self._backend.input_stream(
                 device=self.mic_device_id,  # None=系统默认；或固定索引
                 samplerate=self.device_input_sample_rate,
-                channels=AudioConfig.CHANNELS,
+                channels=self._capture_channels,
                 dtype=np.int16,
                 blocksize=self._device_input_frame_size,
                 callback=self._input_callback,
@@ -444,15 +828,17 @@ class AudioCodec:
             if self.device_output_sample_rate == AudioConfig.OUTPUT_SAMPLE_RATE:
                 # 设备支持24kHz，直接使用
                 output_sample_rate = AudioConfig.OUTPUT_SAMPLE_RATE
-                device_output_frame_size = AudioConfig.OUTPUT_FRAME_SIZE
+                device_output_frame_size = (
+                    AudioConfig.OUTPUT_SAMPLE_RATE * self._frame_duration // 1000
+                )
             else:
                 # 设备不支持24kHz，使用设备默认采样率并启用重采样
                 output_sample_rate = self.device_output_sample_rate
                 device_output_frame_size = int(
-                    self.device_output_sample_rate * (AudioConfig.FRAME_DURATION / 1000)
+                    self.device_output_sample_rate * (self._frame_duration / 1000)
                 )
 
-            self.output_stream = sd.OutputStream(
+            self.output_stream = self._backend.output_stream(
                 device=self.speaker_device_id,  # None=系统默认；或固定索引
                 samplerate=output_sample_rate,
                 channels=AudioConfig.CHANNELS,
@@ -462,6 +848,7 @@ class AudioCodec:
                 finished_callback=self._output_finished_callback,
                 latency="low",
             )
+            self._output_latency = self._stream_latency(self.output_stream)
 
             self.input_stream.start()
             self.output_stream.start()
@@ -483,81 +870,115 @@ class AudioCodec:
             return
 
         try:
-            audio_data = indata.copy().flatten()
+            aec = self.aec_processor
+            if not (
+                self._aec_enabled and aec is not None and aec.uses_playback_reference
+            ):
+                aec = None
+            else:
+                self._update_aec_capture_latency(aec, time_info, frames)
+
+            if self._downmixer is not None:
+                # 多通道麦克风阵列：先下混为单声道，再重采样/分帧
+                samples = self._downmixer.process(indata)
+            else:
+                samples = indata.reshape(-1)
+            frame_size = self._input_frame_size
 
-            # 重采样到16kHz（如果设备不是16kHz）
             if self.input_resampler is not None:
-                audio_data = self._process_input_resampling(audio_data)
-                if audio_data is None:
-                    return
-
-            # 应用AEC处理（仅 macOS 需要）
-            if (
-                self._aec_enabled
-                and len(audio_data) == AudioConfig.INPUT_FRAME_SIZE
-                and self.aec_processor._is_macos
-            ):
+                # 重采样到16kHz后进入分帧缓冲
+                self._process_input_resampling(samples)
+            elif len(samples) == frame_size and not self._resample_input_buffer:
+                # 设备块大小恰好等于一帧：直接复制进帧缓冲，不经过分帧缓冲
+                frame = self._capture_pool.acquire(frame_size)
+                # PortAudio 的缓冲只在回调内有效，这里是整个录音路径唯一一次复制
+                np.copyto(frame.pcm, samples)
+                if aec is not None:
+                    self._update_aec_capture_time(aec, 0)
+                self._process_capture_frame(frame)
+                return
+            else:
+                # 帧长度与设备块大小不同（运行时切换过帧长度）
+                self._resample_input_buffer.write(samples)
+
+            # 按当前帧长度切帧，一次回调可能产出0帧、1帧或多帧
+            while len(self._resample_input_buffer) >= frame_size:
+                frame = self._capture_pool.acquire(frame_size)
+                self._resample_input_buffer.read(frame_size, out=frame.pcm)
+                if aec is not None:
+                    self._update_aec_capture_time(aec, len(self._resample_input_buffer))
+                self._process_capture_frame(frame)
+
+        except Exception as e:
+            logger.error(f"输入回调错误: {e}")
+
+    def _process_capture_frame(self, frame: PooledFrame):
+        """处理一帧16kHz录音（在录音回调中调用）：AEC -> 预处理 -> 编码发送 + 唤醒词检测.
+
+        所有处理都在帧池缓冲上完成，处理结束后释放本回调持有的引用。
+        """
+        try:
+            pcm = frame.pcm
+            frame.timestamp = time.monotonic()
+
+            # 应用AEC处理（系统级AEC时不处理）
+            if self._aec_enabled and self.aec_processor.processes_capture:
                 try:
-                    audio_data = self.aec_processor.process_audio(audio_data)
+                    # 原地处理帧池缓冲，不产生新数组
+                    self.aec_processor.process_audio(pcm, out=pcm)
                 except Exception as e:
                     logger.warning(f"AEC处理失败，使用原始音频: {e}")
 
+            # 录音预处理：降噪/自动增益等，在编码之前原地处理
+            if self._preprocessor.active:
+                try:
+                    self._preprocessor.process(pcm)
+                except Exception as e:
+                    logger.warning(f"录音预处理失败: {e}")
+
+            # 语音判定：帧内任一10ms块为语音即视为语音帧
+            vad = self._capture_vad
+            if vad is not None:
+                try:
+                    self._capture_voice = bool(
+                        vad.process(pcm.reshape(-1, vad.frame_size)).any()
+                    )
+                except Exception:
+                    self._capture_voice = True
+
             # 实时编码并发送（不走队列，减少延迟）
-            if (
-                self._encoded_audio_callback
-                and len(audio_data) == AudioConfig.INPUT_FRAME_SIZE
-            ):
+            if self._encoded_audio_callback:
                 try:
-                    pcm_data = audio_data.astype(np.int16).tobytes()
-                    encoded_data = self.opus_encoder.encode(
-                        pcm_data, AudioConfig.INPUT_FRAME_SIZE
+                    # 编码器直接读取帧缓冲指针，不经过 tobytes()
+                    encoded_data = opuslib.api.encoder.encode(
+                        self.opus_encoder.encoder_state,
+                        frame.pointer,
+                        frame.length,
+                        frame.nbytes,
                     )
                     if encoded_data:
                         self._encoded_audio_callback(encoded_data)
                 except Exception as e:
                     logger.warning(f"实时录音编码失败: {e}")
 
-            # 同时提供给唤醒词检测（走队列）
-            self._put_audio_data_safe(self._wakeword_buffer, audio_data.copy())
-
-        except Exception as e:
-            logger.error(f"输入回调错误: {e}")
+            # 同时提供给唤醒词检测：共享同一帧（增加引用计数），不复制
+            self._wakeword_buffer.put_nowait(frame.retain())
+            for tap in self._capture_tap_snapshot:
+                tap.put_nowait(frame.retain())
+            self._captured_frames += 1
+        finally:
+            frame.release()
 
     def _process_input_resampling(self, audio_data):
         """
-        输入重采样到16kHz.
+        输入重采样到16kHz，写入分帧缓冲.
         """
         try:
             resampled_data = self.input_resampler.resample_chunk(audio_data, last=False)
             if len(resampled_data) > 0:
-                self._resample_input_buffer.extend(resampled_data.astype(np.int16))
-
-            expected_frame_size = AudioConfig.INPUT_FRAME_SIZE
-            if len(self._resample_input_buffer) < expected_frame_size:
-                return None
-
-            frame_data = []
-            for _ in range(expected_frame_size):
-                frame_data.append(self._resample_input_buffer.popleft())
-
-            return np.array(frame_data, dtype=np.int16)
-
+                self._resample_input_buffer.write(resampled_data)
         except Exception as e:
             logger.error(f"输入重采样失败: {e}")
-            return None
-
-    def _put_audio_data_safe(self, queue, audio_data):
-        """
-        安全入队，队列满时丢弃最旧数据.
-        """
-        try:
-            queue.put_nowait(audio_data)
-        except asyncio.QueueFull:
-            try:
-                queue.get_nowait()
-                queue.put_nowait(audio_data)
-            except asyncio.QueueEmpty:
-                queue.put_nowait(audio_data)
 
     def _output_callback(self, outdata: np.ndarray, frames: int, time_info, status):
         """
@@ -567,76 +988,232 @@ class AudioCodec:
             if "underflow" not in str(status).lower():
                 logger.warning(f"输出流状态: {status}")
 
+        played = 0
         try:
-            if self.output_resampler is not None:
-                # 需要重采样：24kHz -> 设备采样率
-                self._output_callback_with_resample(outdata, frames)
-            else:
-                # 直接播放：24kHz
-                self._output_callback_direct(outdata, frames)
+            with self._output_lock:
+                if self.output_resampler is not None:
+                    # 需要重采样：24kHz -> 设备采样率
+                    played = self._output_callback_with_resample(outdata, frames)
+                else:
+                    # 直接播放：24kHz
+                    played = self._output_callback_direct(outdata, frames)
 
         except Exception as e:
             logger.error(f"输出回调错误: {e}")
             outdata.fill(0)
 
-    def _output_callback_direct(self, outdata: np.ndarray, frames: int):
+        self._update_playback_clock(played, time_info)
+
+        # 进程内AEC参考：交给声卡的PCM（含静音块，保持时间轴连续）
+        aec = self.aec_processor
+        if self._aec_enabled and aec is not None and aec.uses_playback_reference:
+            try:
+                current_time = time_info.currentTime
+            except Exception:
+                current_time = None
+            aec.feed_reference(outdata, self._playback_clock.latency, current_time)
+
+    def _update_aec_capture_latency(self, aec: AECProcessor, time_info, frames: int):
+        """录音路径延迟：设备输入延迟 + 输入重采样延迟.
+
+        同时记录本块最后一个采样（经输入重采样后）的采集时刻，用于逐帧计算延迟。
+        """
+        try:
+            adc_time = time_info.inputBufferAdcTime
+            latency = time_info.currentTime - adc_time
+        except Exception:
+            adc_time, latency = 0.0, 0.0
+        if latency <= 0:
+            latency = self._stream_latency(self.input_stream)
+        self._aec_block_end_time = (
+            adc_time
+            + frames / self.device_input_sample_rate
+            - self._input_resampler_delay
+            if adc_time
+            else None
+        )
+        aec.set_capture_latency(latency + self._input_resampler_delay)
+
+    def _update_aec_capture_time(self, aec: AECProcessor, pending: int):
+        """
+        即将处理的录音帧末尾的采集时刻：本块末尾减去仍留在分帧缓冲中的采样.
+        """
+        end_time = self._aec_block_end_time
+        if end_time is not None:
+            end_time -= pending / AudioConfig.INPUT_SAMPLE_RATE
+        aec.set_capture_time(end_time)
+
+    def _update_playback_clock(self, played: int, time_info):
         """
-        直接播放24kHz数据（设备支持24kHz时）
+        记录本块交给声卡的真实音频采样数（换算到24kHz）和设备输出延迟.
         """
+        latency = self._output_latency
         try:
-            # 从播放队列获取音频数据
-            audio_data = self._output_buffer.get_nowait()
+            dac_latency = time_info.outputBufferDacTime - time_info.currentTime
+            if dac_latency > 0:
+                latency = dac_latency
+        except Exception:
+            pass
 
-            if len(audio_data) >= frames * AudioConfig.CHANNELS:
-                output_frames = audio_data[: frames * AudioConfig.CHANNELS]
-                outdata[:] = output_frames.reshape(-1, AudioConfig.CHANNELS)
-            else:
-                out_len = len(audio_data) // AudioConfig.CHANNELS
-                if out_len > 0:
-                    outdata[:out_len] = audio_data[
-                        : out_len * AudioConfig.CHANNELS
-                    ].reshape(-1, AudioConfig.CHANNELS)
-                if out_len < frames:
-                    outdata[out_len:] = 0
+        if played:
+            samples = played / AudioConfig.CHANNELS
+            if self.device_output_sample_rate != AudioConfig.OUTPUT_SAMPLE_RATE:
+                samples *= (
+                    AudioConfig.OUTPUT_SAMPLE_RATE / self.device_output_sample_rate
+                )
+            self._playback_clock.on_played(samples, latency)
 
-        except asyncio.QueueEmpty:
-            # 无数据时输出静音
-            outdata.fill(0)
+        # TTS 已全部放完：剩余未计入的只有被丢弃的帧和重采样器尾部
+        if self._output_buffer.empty() and self._pending_tts_output <= 0:
+            self._playback_clock.on_idle(latency)
 
-    def _output_callback_with_resample(self, outdata: np.ndarray, frames: int):
+    @staticmethod
+    def _stream_latency(stream) -> float:
+        try:
+            return float(stream.latency)
+        except Exception:
+            return 0.0
+
+    def _output_callback_direct(self, outdata: np.ndarray, frames: int) -> int:
         """
-        重采样播放（24kHz -> 设备采样率）
+        直接播放24kHz数据（设备支持24kHz时），返回写入的真实音频采样数.
         """
-        try:
-            # 持续处理24kHz数据进行重采样
-            while len(self._resample_output_buffer) < frames * AudioConfig.CHANNELS:
-                try:
-                    audio_data = self._output_buffer.get_nowait()
-                    # 24kHz -> 设备采样率重采样
-                    resampled_data = self.output_resampler.resample_chunk(
-                        audio_data, last=False
-                    )
-                    if len(resampled_data) > 0:
-                        self._resample_output_buffer.extend(
-                            resampled_data.astype(np.int16)
-                        )
-                except asyncio.QueueEmpty:
-                    break
+        need = frames * AudioConfig.CHANNELS
 
-            need = frames * AudioConfig.CHANNELS
-            if len(self._resample_output_buffer) >= need:
-                frame_data = [
-                    self._resample_output_buffer.popleft() for _ in range(need)
-                ]
-                output_array = np.array(frame_data, dtype=np.int16)
-                outdata[:] = output_array.reshape(-1, AudioConfig.CHANNELS)
-            else:
-                # 数据不足时输出静音
+        # 帧长度与设备块大小一致时直接写入 outdata
+        if not self._resample_output_buffer:
+            audio_data, has_tts = self._next_output_frame()
+            if audio_data is None:
+                # 缺帧时已尝试丢包隐藏，仍无数据则输出静音
                 outdata.fill(0)
+                return 0
+            if len(audio_data) == need:
+                outdata[:] = audio_data.reshape(-1, AudioConfig.CHANNELS)
+                return need if has_tts else 0
+            # 帧长度与设备块大小不同（下行帧长度变化），改走分帧缓冲
+            self._write_output_segment(audio_data, has_tts)
 
+        return self._fill_from_output_buffer(outdata, need, resample=False)
+
+    def _output_callback_with_resample(self, outdata: np.ndarray, frames: int) -> int:
+        """
+        重采样播放（24kHz -> 设备采样率），返回写入的真实音频采样数.
+        """
+        try:
+            return self._fill_from_output_buffer(
+                outdata, frames * AudioConfig.CHANNELS, resample=True
+            )
         except Exception as e:
             logger.warning(f"重采样输出失败: {e}")
             outdata.fill(0)
+            return 0
+
+    def _fill_from_output_buffer(
+        self, outdata: np.ndarray, need: int, resample: bool
+    ) -> int:
+        """
+        从抖动缓冲取帧（按需重采样）写入分帧缓冲，凑够设备块大小后输出.
+        """
+        while len(self._resample_output_buffer) < need:
+            audio_data, has_tts = self._next_output_frame()
+            if audio_data is None:
+                break
+            if resample:
+                # 24kHz -> 设备采样率重采样
+                audio_data = self.output_resampler.resample_chunk(
+                    audio_data, last=False
+                )
+            if len(audio_data) > 0:
+                self._write_output_segment(audio_data, has_tts)
+
+        # 直接读入 outdata 的底层内存，避免中间数组
+        out = outdata.reshape(-1)
+        available = min(len(self._resample_output_buffer), need)
+        if available < need:
+            # 数据不足（一段语音的结尾）：放出剩余数据，其余补静音
+            out[available:] = 0
+        if available:
+            self._resample_output_buffer.read(available, out=out)
+        return self._consume_output_segments(available)
+
+    def _next_output_frame(self) -> Tuple[Optional[np.ndarray], bool]:
+        """
+        取下一帧TTS并与其他音源混音，返回 (混音结果, 是否含TTS).
+        """
+        audio_data = self._next_playback_frame()
+        mixed = self._mixer.mix(
+            audio_data, AudioConfig.OUTPUT_SAMPLE_RATE * self._frame_duration // 1000
+        )
+        return mixed, audio_data is not None
+
+    def _write_output_segment(self, audio_data: np.ndarray, has_tts: bool):
+        """
+        写入分帧缓冲，并记录该段是否含TTS.
+        """
+        self._resample_output_buffer.write(audio_data)
+        self._output_segments.append([len(audio_data), has_tts])
+        if has_tts:
+            self._pending_tts_output += len(audio_data)
+
+    def _consume_output_segments(self, count: int) -> int:
+        """
+        从分帧缓冲读出 count 个采样后，返回其中的TTS采样数（只有音乐时不推进播放位置）.
+        """
+        played = 0
+        segments = self._output_segments
+        while count > 0 and segments:
+            segment = segments[0]
+            take = min(count, segment[0])
+            if segment[1]:
+                played += take
+            segment[0] -= take
+            count -= take
+            if segment[0] == 0:
+                segments.popleft()
+        self._pending_tts_output -= played
+        return played
+
+    def _clear_output_segments(self) -> int:
+        """
+        清空分帧缓冲与分段记录（事件循环线程调用，与播放回调互斥）.
+        """
+        with self._output_lock:
+            cleared = self._resample_output_buffer.clear()
+            self._output_segments.clear()
+            self._pending_tts_output = 0
+        return cleared
+
+    def _next_playback_frame(self) -> Optional[np.ndarray]:
+        """从抖动缓冲取下一帧（播放回调中调用）.
+
+        语音段中途缺帧（网络晚到/丢包）时，用解码器PLC补出有限帧数的隐藏音频，
+        超出上限后输出静音。
+        """
+        audio_data = self._jitter_buffer.pop()
+        if audio_data is not None:
+            self._underrun_plc_frames = 0
+            return audio_data
+
+        if (
+            self._underrun_plc_frames >= self._concealment_frames()
+            or not self._jitter_buffer.is_starved()
+        ):
+            return None
+
+        # 播放线程不阻塞等待解码锁，拿不到就输出静音
+        if not self._decoder_lock.acquire(blocking=False):
+            return None
+        try:
+            audio_data = self._decode_frame(b"")
+        except Exception:
+            return None
+        finally:
+            self._decoder_lock.release()
+
+        self._underrun_plc_frames += 1
+        self._plc_stats["underrun_plc"] += 1
+        self._playback_clock.add_written(len(audio_data) // AudioConfig.CHANNELS)
+        return audio_data
 
     def _input_finished_callback(self):
         """
@@ -669,10 +1246,15 @@ class AudioCodec:
                     self.input_stream.stop()
                     self.input_stream.close()
 
-                self.input_stream = sd.InputStream(
+                self._device_input_frame_size = int(
+                    self.device_input_sample_rate * self._frame_duration / 1000
+                )
+                if self._downmixer:
+                    self._downmixer.reset()
+                self.input_stream = self._backend.input_stream(
                     device=self.mic_device_id,  # <- 修复：带上设备索引，避免回落到可能不稳定的默认端点
                     samplerate=self.device_input_sample_rate,
-                    channels=AudioConfig.CHANNELS,
+                    channels=self._capture_channels,
                     dtype=np.int16,
                     blocksize=self._device_input_frame_size,
                     callback=self._input_callback,
@@ -691,16 +1273,17 @@ class AudioCodec:
                 if self.device_output_sample_rate == AudioConfig.OUTPUT_SAMPLE_RATE:
                     # 设备支持24kHz，直接使用
                     output_sample_rate = AudioConfig.OUTPUT_SAMPLE_RATE
-                    device_output_frame_size = AudioConfig.OUTPUT_FRAME_SIZE
+                    device_output_frame_size = (
+                        AudioConfig.OUTPUT_SAMPLE_RATE * self._frame_duration // 1000
+                    )
                 else:
                     # 设备不支持24kHz，使用设备默认采样率并启用重采样
                     output_sample_rate = self.device_output_sample_rate
                     device_output_frame_size = int(
-                        self.device_output_sample_rate
-                        * (AudioConfig.FRAME_DURATION / 1000)
+                        self.device_output_sample_rate * (self._frame_duration / 1000)
                     )
 
-                self.output_stream = sd.OutputStream(
+                self.output_stream = self._backend.output_stream(
                     device=self.speaker_device_id,  # 指定扬声器设备ID
                     samplerate=output_sample_rate,
                     channels=AudioConfig.CHANNELS,
@@ -710,12 +1293,21 @@ class AudioCodec:
                     finished_callback=self._output_finished_callback,
                     latency="low",
                 )
+                self._output_latency = self._stream_latency(self.output_stream)
                 self.output_stream.start()
                 logger.info("输出流重新初始化成功")
                 return None
         except Exception as e:
             stream_type = "输入" if is_input else "输出"
             logger.error(f"{stream_type}流重建失败: {e}")
+            # 设备可能已被拔出或被占用：丢弃其能力缓存，下次使用时重新探测
+            # （另一个流仍在运行，不能重新初始化 PortAudio 重新扫描设备）
+            try:
+                self._device_cache.invalidate_device(
+                    self.mic_device_id if is_input else self.speaker_device_id
+                )
+            except Exception as refresh_error:
+                logger.warning(f"刷新音频设备缓存失败: {refresh_error}")
             if is_input:
                 return False
             else:
@@ -725,24 +1317,179 @@ class AudioCodec:
         """
         获取唤醒词音频数据.
         """
+        frame = self.get_capture_frame_nowait()
+        if frame is None:
+            return None
         try:
-            if self._wakeword_buffer.empty():
-                return None
-
-            audio_data = self._wakeword_buffer.get_nowait()
+            return frame.pcm.tobytes()
+        finally:
+            frame.release()
 
-            if hasattr(audio_data, "tobytes"):
-                return audio_data.tobytes()
-            elif hasattr(audio_data, "astype"):
-                return audio_data.astype("int16").tobytes()
-            else:
-                return audio_data
+    async def wait_raw_audio_for_detection(self) -> bytes:
+        """
+        等待下一帧唤醒词音频数据（由录音回调唤醒，无需轮询）.
+        """
+        frame = await self.wait_capture_frame()
+        try:
+            return frame.pcm.tobytes()
+        finally:
+            frame.release()
 
+    def get_capture_frame_nowait(self) -> Optional[PooledFrame]:
+        """
+        取一帧唤醒词音频（池化帧，不复制），无数据返回 None；用完必须 release().
+        """
+        try:
+            return self._wakeword_buffer.get_nowait()
         except asyncio.QueueEmpty:
             return None
-        except Exception as e:
-            logger.error(f"获取唤醒词音频数据失败: {e}")
-            return None
+
+    async def wait_capture_frame(self) -> PooledFrame:
+        """
+        等待下一帧唤醒词音频（池化帧，不复制）；用完必须 release().
+        """
+        return await self._wakeword_buffer.get()
+
+    def get_capture_frame_blocking(
+        self, timeout: Optional[float] = None
+    ) -> Optional[PooledFrame]:
+        """
+        在工作线程中阻塞等待下一帧唤醒词音频，超时返回 None；用完必须 release().
+        """
+        return self._wakeword_buffer.get_blocking(timeout)
+
+    def wake_capture_consumer(self):
+        """
+        唤醒正在等待唤醒词音频的消费者（停止检测时让工作线程及时退出）.
+        """
+        self._wakeword_buffer.wake()
+
+    def add_capture_tap(self, name: str, capacity: int = 50) -> FrameChannel:
+        """订阅处理后（AEC/预处理之后）的16kHz录音帧，同名订阅会被替换.
+
+        返回的帧通道中是帧池中的共享帧，消费者取出后需调用 ``release()`` 归还；
+        可 ``await channel.get()`` 或在线程中 ``get_blocking()``，无需轮询。
+        """
+        channel = FrameChannel(capacity, name=name, on_drop=PooledFrame.release)
+        with self._capture_tap_lock:
+            old = self._capture_taps.get(name)
+            self._capture_taps[name] = channel
+            self._capture_tap_snapshot = tuple(self._capture_taps.values())
+        if old is not None:
+            # 录音回调可能仍持有旧快照并向旧通道写入，关闭后写入的帧会直接归还
+            old.close()
+        return channel
+
+    def remove_capture_tap(self, name: str) -> bool:
+        """
+        取消录音订阅，归还通道中未取走的帧.
+        """
+        with self._capture_tap_lock:
+            channel = self._capture_taps.pop(name, None)
+            self._capture_tap_snapshot = tuple(self._capture_taps.values())
+        if channel is None:
+            return False
+        # 录音回调可能仍持有旧快照并向该通道写入，关闭后写入的帧会直接归还
+        channel.close()
+        return True
+
+    def get_capture_stats(self) -> dict:
+        """
+        获取录音路径统计：帧数与帧池分配情况（runtime_allocations 应保持为0）.
+        """
+        return {
+            "frames": self._captured_frames,
+            "channels": self._capture_channels,
+            "pool": self._capture_pool.get_stats(),
+            "downmix": self._downmixer.get_stats() if self._downmixer else None,
+        }
+
+    def get_buffer_stats(self) -> dict:
+        """
+        获取帧通道统计信息（深度、丢弃数等）.
+        """
+        return {
+            "wake_word": self._wakeword_buffer.get_stats(),
+            "capture_taps": {
+                name: tap.get_stats() for name, tap in self._capture_taps.items()
+            },
+            "playback": self._output_buffer.get_stats(),
+            "jitter_buffer": self._jitter_buffer.get_stats(),
+            "decode": self._decode_worker.get_stats(),
+            "playback_clock": self._playback_clock.get_stats(),
+            "mixer": self._mixer.get_stats(),
+        }
+
+    @property
+    def mixer(self) -> OutputMixer:
+        return self._mixer
+
+    def add_output_source(
+        self,
+        name: str,
+        gain: float = 1.0,
+        duckable: bool = False,
+        capacity_ms: int = 2000,
+        one_shot: bool = False,
+    ) -> MixerSource:
+        """添加播放音源（音乐、提示音等），与TTS混音后经同一输出流播放.
+
+        生产者向返回的音源写入24kHz单声道int16数据；duckable 的音源在TTS播放时
+        自动降低音量。同名音源会被替换。
+        """
+        return self._mixer.add_source(
+            name,
+            gain=gain,
+            duckable=duckable,
+            capacity_ms=capacity_ms,
+            one_shot=one_shot,
+        )
+
+    def remove_output_source(self, name: str) -> bool:
+        return self._mixer.remove_source(name)
+
+    def set_output_gain(self, name: str, gain: float) -> bool:
+        """
+        设置音源增益（"tts" 为语音播放）.
+        """
+        return self._mixer.set_gain(name, gain)
+
+    def play_sound(
+        self,
+        audio: np.ndarray,
+        sample_rate: int = AudioConfig.OUTPUT_SAMPLE_RATE,
+        name: str = "notification",
+        gain: float = 1.0,
+    ) -> MixerSource:
+        """
+        播放一段提示音（单声道int16），放完后自动移除.
+        """
+        audio = np.asarray(audio, dtype=np.int16).reshape(-1)
+        if sample_rate != AudioConfig.OUTPUT_SAMPLE_RATE:
+            resampler = create_resampler(
+                sample_rate, AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS
+            )
+            audio = resampler.resample_chunk(audio, last=True)
+
+        duration_ms = len(audio) * 1000 // AudioConfig.OUTPUT_SAMPLE_RATE
+        source = self.add_output_source(
+            name, gain=gain, capacity_ms=duration_ms + 1, one_shot=True
+        )
+        source.write(audio)
+        source.finish()
+        return source
+
+    def get_mixer_stats(self) -> dict:
+        """
+        获取混音统计（各音源缓冲、闪避状态、混音耗时）.
+        """
+        return self._mixer.get_stats()
+
+    def get_jitter_stats(self) -> dict:
+        """
+        获取播放抖动缓冲统计（深度、目标延迟、欠载次数、迟到帧数）.
+        """
+        return self._jitter_buffer.get_stats()
 
     def set_encoded_audio_callback(self, callback):
         """
@@ -794,47 +1541,232 @@ class AudioCodec:
         logger.info(f"AEC状态: {'启用' if self._aec_enabled else '禁用'}")
         return self._aec_enabled
 
+    def enable_capture_vad(self, enabled: bool, config: Optional[dict] = None):
+        """开关录音帧的语音判定（WebRTC VAD + 能量阈值，10ms 块）.
+
+        判定在录音回调中、编码之前完成，编码回调中通过 capture_voice_active
+        读取当前帧的结果；关闭时恒为 True。
+        """
+        if enabled:
+            vad_config = dict(config or {})
+            vad_config["FRAME_MS"] = 10
+            self._capture_vad = WebRTCVADBackend(
+                vad_config, AudioConfig.INPUT_SAMPLE_RATE
+            )
+        else:
+            self._capture_vad = None
+        self._capture_voice = True
+
+    @property
+    def capture_voice_active(self) -> bool:
+        """
+        最近一帧录音是否含语音（在编码回调中读取即为当前帧的判定）.
+        """
+        return self._capture_voice
+
+    @property
+    def preprocessor(self) -> CapturePreprocessor:
+        return self._preprocessor
+
+    def set_preprocess_stage(self, name: str, enabled: bool) -> bool:
+        """
+        运行时开关录音预处理的某一级（high_pass / noise_suppression / transient_suppression / agc）.
+        """
+        changed = self._preprocessor.set_stage_enabled(name, enabled)
+        self._sync_aec_noise_suppression()
+        return changed
+
+    def set_preprocess_enabled(self, enabled: bool):
+        """
+        运行时开关整个录音预处理流水线.
+        """
+        self._preprocessor.set_enabled(enabled)
+        self._sync_aec_noise_suppression()
+
+    def _sync_aec_noise_suppression(self):
+        """
+        预处理的降噪级实际运行时关闭 AEC 自带的降噪，否则由 AEC 降噪（不重复也不缺失）.
+        """
+        aec = self.aec_processor
+        if aec is None or aec.apm is None:
+            return
+        aec.set_noise_suppression(
+            not self._preprocessor.is_stage_active(STAGE_NOISE_SUPPRESSION)
+        )
+
+    def get_preprocess_stats(self) -> dict:
+        """
+        获取录音预处理统计（各级开关与CPU耗时）.
+        """
+        return self._preprocessor.get_stats()
+
+    def submit_audio(self, opus_data: bytes):
+        """
+        提交网络接收的Opus数据包（任意线程，不阻塞），由解码线程解码后写入播放缓冲.
+        """
+        self._decode_worker.submit(opus_data)
+
     async def write_audio(self, opus_data: bytes):
         """
-        解码音频并播放 网络接收的Opus数据 -> 解码24kHz -> 播放队列.
+        解码音频并播放 网络接收的Opus数据 -> 解码线程 -> 播放队列.
+        """
+        self.submit_audio(opus_data)
+
+    def _decode_batch(self, batch):
+        """
+        解码线程批量处理：补出丢失帧、解码并写入抖动缓冲.
+        """
+        with self._decoder_lock:
+            epoch = self._decode_worker.epoch
+            for arrival, item, item_epoch in batch:
+                if callable(item):
+                    # 标记：之前的数据包都已写入播放缓冲（清空后同样需要调用）
+                    item()
+                    continue
+                if item_epoch != epoch:
+                    # 提交后播放队列已被清空（打断），丢弃旧音频
+                    continue
+                if isinstance(item, int):
+                    self._pending_lost_frames += item
+                    continue
+
+                try:
+                    # 先补出丢失的帧：最后一帧用本包的带内FEC恢复，其余用PLC
+                    lost = self._pending_lost_frames
+                    if lost:
+                        self._pending_lost_frames = 0
+                        self._conceal_before(item, lost, arrival)
+
+                    # Opus解码为24kHz PCM数据（帧长度由数据包本身决定）
+                    audio_array = self._decode_frame(item, self.MAX_DECODE_FRAME_SIZE)
+                except opuslib.OpusError as e:
+                    logger.warning(f"Opus解码失败，丢弃此帧: {e}")
+                    continue
+
+                if len(audio_array) == 0:
+                    logger.warning("解码音频长度异常: 0")
+                    continue
+
+                # 记录下行帧长度，丢包隐藏按此长度生成
+                self._output_frame_size = len(audio_array) // AudioConfig.CHANNELS
+
+                # 放入抖动缓冲，由播放回调按目标延迟取用
+                self._queue_playback(audio_array, arrival)
+
+    def _queue_playback(self, audio_array: np.ndarray, arrival: float):
+        """
+        写入抖动缓冲并推进播放链路的写入位置.
+        """
+        self._jitter_buffer.push(audio_array, arrival)
+        self._playback_clock.add_written(len(audio_array) // AudioConfig.CHANNELS)
+
+    def _decode_frame(
+        self,
+        opus_data: bytes,
+        frame_size: Optional[int] = None,
+        decode_fec: bool = False,
+    ) -> np.ndarray:
+        """解码一帧；调用方需持有解码锁.
+
+        空数据表示丢包，由解码器PLC生成隐藏音频。PLC/FEC 的 frame_size 必须是
+        要补出的帧长度，默认使用最近一次下行帧长度。
+        """
+        if frame_size is None:
+            frame_size = self._output_frame_size
+        pcm_data = self.opus_decoder.decode(
+            opus_data, frame_size, decode_fec=decode_fec
+        )
+        return np.frombuffer(pcm_data, dtype=np.int16)
+
+    def _conceal_before(self, opus_data: bytes, lost: int, arrival: float):
+        """
+        在 opus_data 之前补出 lost 帧隐藏音频；调用方需持有解码锁.
         """
+        conceal = min(lost, self._concealment_frames())
+        for _ in range(conceal - 1):
+            self._queue_playback(self._decode_frame(b""), arrival)
+            self._plc_stats["plc"] += 1
+
         try:
-            # Opus解码为24kHz PCM数据
-            pcm_data = self.opus_decoder.decode(
-                opus_data, AudioConfig.OUTPUT_FRAME_SIZE
-            )
+            # 紧邻本包的那一帧可由本包携带的带内FEC恢复（发送端未开FEC时等同PLC）
+            frame = self._decode_frame(opus_data, decode_fec=True)
+            self._plc_stats["fec"] += 1
+        except opuslib.OpusError:
+            frame = self._decode_frame(b"")
+            self._plc_stats["plc"] += 1
+        self._queue_playback(frame, arrival)
+
+    def conceal_lost_frames(self, lost_frames: int):
+        """
+        通知下行丢包（由协议根据序列号检测），在下一包解码前补出隐藏帧.
+        """
+        if lost_frames <= 0:
+            return
+        self._plc_stats["lost"] += lost_frames
+        self._decode_worker.submit_loss(lost_frames)
 
-            audio_array = np.frombuffer(pcm_data, dtype=np.int16)
+    def get_plc_stats(self) -> dict:
+        """
+        获取丢包隐藏统计（丢包帧数、PLC/FEC恢复帧数、缺帧时的PLC帧数）.
+        """
+        return dict(self._plc_stats)
 
-            expected_length = AudioConfig.OUTPUT_FRAME_SIZE * AudioConfig.CHANNELS
-            if len(audio_array) != expected_length:
-                logger.warning(
-                    f"解码音频长度异常: {len(audio_array)}, 期望: {expected_length}"
-                )
-                return
+    def get_decode_stats(self) -> dict:
+        """
+        获取解码线程统计（队列深度、批大小、批处理耗时）.
+        """
+        return self._decode_worker.get_stats()
 
-            # 放入播放队列
-            self._put_audio_data_safe(self._output_buffer, audio_array)
+    def get_playback_position(self) -> dict:
+        """
+        获取播放位置（已写入/已交给声卡的24kHz采样数、待播放时长、设备延迟）.
+        """
+        return self._playback_clock.get_stats()
 
-        except opuslib.OpusError as e:
-            logger.warning(f"Opus解码失败，丢弃此帧: {e}")
-        except Exception as e:
-            logger.warning(f"音频写入失败，丢弃此帧: {e}")
+    async def wait_played(self, position: int, timeout: Optional[float] = None) -> bool:
+        """
+        等待第 position 个采样（24kHz）从扬声器放出，被打断或超时返回 False.
+        """
+        return await self._playback_clock.wait_played(position, timeout)
 
-    async def wait_for_audio_complete(self, timeout=10.0):
+    def pending_playback_ms(self) -> float:
         """
-        等待播放完成.
+        已收到但尚未放出的音频时长：待解码的数据包 + 已写入播放链路未播放的部分.
         """
-        start = time.time()
+        sample_rate = AudioConfig.OUTPUT_SAMPLE_RATE
+        frame_ms = self._output_frame_size * 1000 / sample_rate
+        written_ms = self._playback_clock.pending_samples() * 1000 / sample_rate
+        return self._decode_worker.pending() * frame_ms + written_ms
 
-        while not self._output_buffer.empty() and time.time() - start < timeout:
-            await asyncio.sleep(0.05)
+    async def wait_for_audio_complete(self, timeout: Optional[float] = None) -> bool:
+        """等待已收到的音频全部从扬声器放出.
 
-        await asyncio.sleep(0.3)
+        在解码队列中插入标记：之前的数据包解码完成时取当时的写入位置作为目标，
+        播放位置越过目标并经过设备延迟后返回 True；被打断或超时返回 False。
+        timeout 默认按当前待播放时长加 PLAYBACK_WAIT_MARGIN 计算。
+        """
+        if timeout is None:
+            timeout = self.pending_playback_ms() / 1000 + self.PLAYBACK_WAIT_MARGIN
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
 
-        if not self._output_buffer.empty():
-            output_remaining = self._output_buffer.qsize()
-            logger.warning(f"音频播放超时，剩余队列 - 输出: {output_remaining} 帧")
+        def _mark():
+            self._playback_clock.add_waiter(None, loop, future)
+
+        if self._decode_worker.is_running():
+            self._decode_worker.submit_marker(_mark)
+        else:
+            _mark()
+
+        completed = await self._playback_clock.wait_future(future, timeout)
+        if future.cancelled():
+            # 超时（被打断时 future 结果为 False，不是取消）
+            logger.warning(
+                f"音频播放超时({timeout:.1f}s)，剩余 - "
+                f"待解码: {self._decode_worker.pending()} 包, "
+                f"待播放: {self._playback_clock.get_stats()['pending_ms']}ms"
+            )
+        return completed
 
     async def clear_audio_queue(self):
         """
@@ -842,26 +1774,24 @@ class AudioCodec:
         """
         cleared_count = 0
 
-        queues_to_clear = [
-            self._wakeword_buffer,
-            self._output_buffer,
-        ]
-
-        for queue in queues_to_clear:
-            while not queue.empty():
-                try:
-                    queue.get_nowait()
-                    cleared_count += 1
-                except asyncio.QueueEmpty:
-                    break
+        cleared_count += self._wakeword_buffer.clear()
+        for tap in self._capture_tap_snapshot:
+            cleared_count += tap.clear()
+        # 先使解码代数加一，再在解码锁内清空抖动缓冲：解码线程在清空前取走的
+        # 数据包要么已写入（随后被清掉），要么因代数过期被丢弃
+        cleared_count += self._decode_worker.clear()
+        with self._decoder_lock:
+            self._pending_lost_frames = 0
+            cleared_count += self._jitter_buffer.reset()
 
         if self._resample_input_buffer:
-            cleared_count += len(self._resample_input_buffer)
-            self._resample_input_buffer.clear()
+            cleared_count += self._resample_input_buffer.clear()
 
         if self._resample_output_buffer:
-            cleared_count += len(self._resample_output_buffer)
-            self._resample_output_buffer.clear()
+            cleared_count += self._clear_output_segments()
+
+        # 打断播放：唤醒等待播放完成的协程
+        self._playback_clock.flush()
 
         if cleared_count > 0:
             logger.info(f"清空音频队列，丢弃 {cleared_count} 帧音频数据")
@@ -973,6 +1903,12 @@ class AudioCodec:
             # 2. 等待回调完全停止（给正在执行的回调一点时间完成）
             await asyncio.sleep(0.05)
 
+            # 关闭混音音源，唤醒阻塞写入的生产者（音乐解码线程）
+            self._mixer.close()
+
+            # 停止解码线程（之后不再写入播放缓冲）
+            self._decode_worker.stop()
+
             # 3. 清空回调引用（打破闭包引用链）
             self._encoded_audio_callback = None
 
@@ -1012,11 +1948,14 @@ class AudioCodec:
                 finally:
                     self.aec_processor = None
 
-            # 10. 释放编解码器
+            # 10. 释放录音预处理
+            self._preprocessor.close()
+
+            # 11. 释放编解码器
             self.opus_encoder = None
             self.opus_decoder = None
 
-            # 11. 最后一次 GC，确保所有对象被回收
+            # 12. 最后一次 GC，确保所有对象被回收
             gc.collect()
 
             logger.info("音频资源已完全释放")
@@ -0,0 +1,267 @@
+import ctypes
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.constants.constants import AudioConfig
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 预处理各级（按 WebRTC APM 内部的处理顺序排列）
+STAGE_HIGH_PASS = "high_pass"
+STAGE_NOISE_SUPPRESSION = "noise_suppression"
+STAGE_TRANSIENT_SUPPRESSION = "transient_suppression"
+STAGE_AGC = "agc"
+STAGES = (
+    STAGE_HIGH_PASS,
+    STAGE_NOISE_SUPPRESSION,
+    STAGE_TRANSIENT_SUPPRESSION,
+    STAGE_AGC,
+)
+
+# 各级的配置项名称与默认开关
+_STAGE_CONFIG = {
+    STAGE_HIGH_PASS: ("HIGH_PASS", True),
+    STAGE_NOISE_SUPPRESSION: ("NOISE_SUPPRESSION", True),
+    STAGE_TRANSIENT_SUPPRESSION: ("TRANSIENT_SUPPRESSION", False),
+    STAGE_AGC: ("AGC", False),
+}
+
+NS_LEVELS = {"low": 0, "moderate": 1, "high": 2, "very_high": 3}
+
+_SHORT_PTR = ctypes.POINTER(ctypes.c_short)
+
+
+class _PreprocessStage:
+    """
+    单个预处理级：只启用一个子模块的 WebRTC APM 实例，可单独开关并统计耗时.
+    """
+
+    def __init__(self, name: str, apm, stream_config, enabled: bool = True):
+        self.name = name
+        self.apm = apm
+        self.stream_config = stream_config
+        self.enabled = enabled
+
+        self.frames = 0
+        self.errors = 0
+        self.process_time = 0.0
+        self.max_process_time = 0.0
+
+    def process(self, pointer) -> bool:
+        """
+        原地处理一个10ms块（APM 允许输入输出指向同一内存）.
+        """
+        start = time.perf_counter()
+        result = self.apm.process_stream(
+            pointer, self.stream_config, self.stream_config, pointer
+        )
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        self.process_time += elapsed
+        if elapsed > self.max_process_time:
+            self.max_process_time = elapsed
+        if result != 0:
+            self.errors += 1
+            return False
+        return True
+
+    def close(self):
+        try:
+            self.apm.destroy_stream_config(self.stream_config)
+            self.apm.close()
+        except Exception as e:
+            logger.warning(f"清理预处理级 {self.name} 失败: {e}")
+        self.apm = None
+        self.stream_config = None
+
+    def get_stats(self, chunk_seconds: float) -> Dict[str, Any]:
+        frames = self.frames
+        return {
+            "enabled": self.enabled,
+            "frames": frames,
+            "errors": self.errors,
+            "avg_us": round(self.process_time / frames * 1e6, 2) if frames else 0.0,
+            "max_us": round(self.max_process_time * 1e6, 2),
+            # 占实时的比例（处理耗时 / 音频时长）
+            "cpu_load": (
+                round(self.process_time / (frames * chunk_seconds), 5)
+                if frames
+                else 0.0
+            ),
+        }
+
+
+class CapturePreprocessor:
+    """录音预处理流水线：高通滤波 -> 降噪 -> 瞬态抑制 -> 自动增益.
+
+    在录音回调中、AEC 之后、Opus 编码之前原地处理16kHz帧，与 AEC 相互独立，
+    各平台都可使用（需要 libs/webrtc_apm 中的本平台库）。每一级是一个只启用
+    对应子模块的 WebRTC APM 实例，可以在运行时单独开关，并分别统计CPU耗时；
+    库加载失败时整个流水线不可用，录音原样通过。默认关闭，需在
+    AUDIO_OPTIONS.PREPROCESS.ENABLED 中显式开启。
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self._config = config or {}
+        self._enabled = bool(self._config.get("ENABLED", False))
+        self._frame_size = AudioConfig.INPUT_SAMPLE_RATE // 100
+        self._stages: List[_PreprocessStage] = []
+        self._available = False
+
+        self._frames = 0
+        self._process_time = 0.0
+
+    @property
+    def active(self) -> bool:
+        """
+        是否需要处理（已初始化、总开关打开且至少有一级启用）.
+        """
+        return (
+            self._available
+            and self._enabled
+            and any(stage.enabled for stage in self._stages)
+        )
+
+    def is_stage_active(self, name: str) -> bool:
+        """
+        某一级当前是否实际在处理录音（流水线可用、总开关与该级都已启用）.
+        """
+        return self.active and any(
+            stage.name == name and stage.enabled for stage in self._stages
+        )
+
+    def initialize(self) -> bool:
+        """
+        为配置中启用的各级创建 APM 实例，返回流水线是否可用.
+        """
+        if not self._enabled:
+            logger.info("录音预处理已禁用")
+            return False
+
+        wanted = [name for name in STAGES if self._config.get(*_STAGE_CONFIG[name])]
+        if not wanted:
+            logger.info("录音预处理未启用任何处理级")
+            return False
+
+        apm = None
+        try:
+            # 延迟导入，仅在需要时加载本地库
+            from libs.webrtc_apm import WebRTCAudioProcessing, create_default_config
+
+            for name in wanted:
+                apm = WebRTCAudioProcessing()
+                config = create_default_config()
+                self._configure_stage(name, config)
+                result = apm.apply_config(config)
+                if result != 0:
+                    raise RuntimeError(f"{name} 配置失败，错误码: {result}")
+                stream_config = apm.create_stream_config(
+                    AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.CHANNELS
+                )
+                self._stages.append(_PreprocessStage(name, apm, stream_config))
+                apm = None
+        except Exception as e:
+            logger.warning(f"录音预处理不可用，使用原始音频: {e}")
+            # 释放创建到一半、尚未加入流水线的实例
+            if apm is not None:
+                apm.close()
+            self.close()
+            return False
+
+        self._available = True
+        logger.info(f"录音预处理已启用: {' -> '.join(wanted)}")
+        return True
+
+    def _configure_stage(self, name: str, config):
+        """
+        在默认配置（全部关闭）上只打开本级对应的子模块.
+        """
+        if name == STAGE_HIGH_PASS:
+            config.high_pass.enabled = True
+            config.high_pass.apply_in_full_band = True
+        elif name == STAGE_NOISE_SUPPRESSION:
+            level = str(self._config.get("NS_LEVEL", "high")).lower()
+            if level not in NS_LEVELS:
+                logger.warning(f"未知的降噪级别: {level}，使用 high")
+                level = "high"
+            config.noise_suppress.enabled = True
+            config.noise_suppress.noise_level = NS_LEVELS[level]
+        elif name == STAGE_TRANSIENT_SUPPRESSION:
+            config.transient_suppress.enabled = True
+        elif name == STAGE_AGC:
+            # 自适应数字增益：不控制系统麦克风音量，只在数字域调整
+            from libs.webrtc_apm import GainController1Mode
+
+            agc = config.gain_control1
+            agc.enabled = True
+            agc.controller_mode = GainController1Mode.ADAPTIVE_DIGITAL
+            agc.target_level_dbfs = int(self._config.get("AGC_TARGET_DBFS", 3))
+            agc.compression_gain_db = int(self._config.get("AGC_COMPRESSION_DB", 9))
+            agc.enable_limiter = True
+            agc.analog_controller.enabled = False
+
+    def process(self, pcm: np.ndarray) -> np.ndarray:
+        """
+        原地处理一帧16kHz int16 录音（长度为10ms的整数倍），返回同一缓冲区.
+        """
+        if not self.active:
+            return pcm
+        if len(pcm) % self._frame_size or not pcm.flags.c_contiguous:
+            return pcm
+
+        start = time.perf_counter()
+        stages = [stage for stage in self._stages if stage.enabled]
+        frame_size = self._frame_size
+        for offset in range(0, len(pcm), frame_size):
+            pointer = pcm[offset : offset + frame_size].ctypes.data_as(_SHORT_PTR)
+            for stage in stages:
+                stage.process(pointer)
+        self._frames += 1
+        self._process_time += time.perf_counter() - start
+        return pcm
+
+    def set_enabled(self, enabled: bool):
+        """
+        总开关（运行时切换，不释放各级实例）.
+        """
+        self._enabled = bool(enabled)
+
+    def set_stage_enabled(self, name: str, enabled: bool) -> bool:
+        """
+        运行时开关某一级，该级未创建（配置中未启用或不可用）时返回 False.
+        """
+        for stage in self._stages:
+            if stage.name == name:
+                stage.enabled = bool(enabled)
+                logger.info(f"录音预处理 {name}: {'启用' if enabled else '禁用'}")
+                return True
+        return False
+
+    def stage_names(self) -> List[str]:
+        return [stage.name for stage in self._stages]
+
+    def close(self):
+        for stage in self._stages:
+            stage.close()
+        self._stages = []
+        self._available = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取预处理统计：各级耗时和整体耗时.
+        """
+        chunk_seconds = self._frame_size / AudioConfig.INPUT_SAMPLE_RATE
+        frames = self._frames
+        return {
+            "available": self._available,
+            "enabled": self._enabled,
+            "active": self.active,
+            "frames": frames,
+            "avg_us": (round(self._process_time / frames * 1e6, 2) if frames else 0.0),
+            "stages": {
+                stage.name: stage.get_stats(chunk_seconds) for stage in self._stages
+            },
+        }
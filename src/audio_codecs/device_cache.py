@@ -0,0 +1,411 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.logging_config import get_logger
+from src.utils.resource_finder import get_user_cache_dir
+
+logger = get_logger(__name__)
+
+# 探测的常用采样率
+PROBE_SAMPLE_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000)
+
+CACHE_FILE_NAME = "audio_devices.json"
+CACHE_VERSION = 1
+
+# 探测失败（设备有通道但没有任何可用采样率）的结果只在内存中保留该时长（秒），
+# 不写入缓存文件，设备被占用或暂时不可用时稍后会重新探测
+FAILED_PROBE_TTL = 30.0
+
+
+def device_key(hostapi_name: str, device_name: str) -> str:
+    """
+    设备缓存键：HostAPI名 + 设备名（设备索引在热插拔后会变化，不能作为键）.
+    """
+    return f"{hostapi_name}::{device_name}"
+
+
+class AudioDeviceCache:
+    """音频设备能力缓存（进程内单例）.
+
+    - 设备/HostAPI 列表在进程内只枚举一次（某些 Linux ALSA 环境下每次需数百毫秒），
+      之后的查询都读快照；``refresh()`` 重新读取列表。PortAudio 只在初始化时
+      扫描设备，不重新初始化时读到的仍是启动时的设备，看不到新插入的设备
+    - 每个设备的能力（支持的采样率、通道数、默认延迟）按需探测，
+      以 "HostAPI::设备名" 为键持久化到用户缓存目录，下次启动直接复用
+    - 热插拔失效：重新枚举时，新出现/消失的设备以及参数（通道数、默认采样率）
+      变化的设备，其探测结果会被丢弃并在下次使用时重新探测
+    - 探测失败的结果不持久化，FAILED_PROBE_TTL 后重新探测
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        backend=None,
+        cache_path: Optional[Path] = None,
+        persist: bool = True,
+    ):
+        if backend is None:
+            from src.audio_codecs.audio_backend import SoundDeviceBackend
+
+            backend = SoundDeviceBackend()
+        self._backend = backend
+        self._lock = threading.RLock()
+        self._cache_path = cache_path
+        # 不持久化时（虚拟设备）只在内存中缓存
+        self._persist = persist
+        self._devices: Optional[List[Dict[str, Any]]] = None
+        self._hostapis: List[Dict[str, Any]] = []
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._dirty = False
+
+        # 统计
+        self._enumerations = 0
+        self._enumerate_time = 0.0
+        self._probes = 0
+        self._probe_time = 0.0
+        self._invalidated = 0
+        self._failed_probes = 0
+
+    @classmethod
+    def get_instance(cls) -> "AudioDeviceCache":
+        """
+        获取真实声卡（sounddevice 后端）的设备缓存单例.
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    # -----------------------
+    # 设备枚举
+    # -----------------------
+    def devices(self) -> List[Dict[str, Any]]:
+        """
+        设备列表快照（按 PortAudio 索引排列，每项附带 index/hostapi_name/key）.
+        """
+        with self._lock:
+            if self._devices is None:
+                self._enumerate()
+            return self._devices
+
+    def hostapis(self) -> List[Dict[str, Any]]:
+        """
+        HostAPI 列表快照.
+        """
+        with self._lock:
+            if self._devices is None:
+                self._enumerate()
+            return self._hostapis
+
+    def get_device(self, index: Optional[int]) -> Optional[Dict[str, Any]]:
+        """
+        按索引获取设备信息，索引无效时返回 None.
+        """
+        devices = self.devices()
+        if isinstance(index, int) and 0 <= index < len(devices):
+            return devices[index]
+        return None
+
+    def default_device(self, kind: str) -> Optional[Dict[str, Any]]:
+        """
+        系统默认设备（等价于 sd.query_devices(kind=kind)，但不重复枚举）.
+        """
+        assert kind in ("input", "output")
+        try:
+            index = self._backend.default_device_index(kind)
+        except Exception:
+            return None
+        return self.get_device(index)
+
+    def find_device(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        按 "HostAPI::设备名" 查找当前设备（索引可能与上次不同）.
+        """
+        for device in self.devices():
+            if device["key"] == key:
+                return device
+        return None
+
+    def refresh(self, reinitialize: bool = False) -> bool:
+        """重新枚举设备，返回设备列表是否发生变化（热插拔）.
+
+        PortAudio 只在初始化时扫描设备，只有 ``reinitialize=True``（先重新初始化
+        PortAudio）才能发现插入/拔出的设备；这会中断所有已打开的音频流，
+        只应在没有活动流时使用（如独立的扫描脚本）。不重新初始化时只是
+        刷新缓存：重新读取同一份设备列表并检查设备参数是否变化。
+        """
+        with self._lock:
+            old_keys = {d["key"] for d in self._devices} if self._devices else None
+
+            if reinitialize:
+                try:
+                    self._backend.reinitialize()
+                except Exception as e:
+                    logger.warning(f"重新初始化PortAudio失败: {e}")
+
+            self._enumerate()
+            if old_keys is None:
+                return False
+
+            new_keys = {d["key"] for d in self._devices}
+            changed = old_keys ^ new_keys
+            for key in changed:
+                self._invalidate(key)
+
+            if changed:
+                logger.info(
+                    f"检测到音频设备变化: 新增 {len(new_keys - old_keys)} 个, "
+                    f"移除 {len(old_keys - new_keys)} 个"
+                )
+                self._save()
+            return bool(changed)
+
+    def _enumerate(self):
+        start = time.perf_counter()
+        raw_devices = self._backend.query_devices()
+        self._hostapis = [dict(h) for h in self._backend.query_hostapis()]
+        self._enumerate_time += time.perf_counter() - start
+        self._enumerations += 1
+
+        devices = []
+        for i, raw in enumerate(raw_devices):
+            info = dict(raw)
+            hostapi_index = info.get("hostapi", 0)
+            hostapi_name = (
+                self._hostapis[hostapi_index].get("name", "")
+                if 0 <= hostapi_index < len(self._hostapis)
+                else ""
+            )
+            info["index"] = i
+            info["hostapi_name"] = hostapi_name
+            info["key"] = device_key(hostapi_name, info.get("name", ""))
+            devices.append(info)
+        self._devices = devices
+
+        # 参数变化的设备（驱动更新、外接设备换了配置）丢弃旧探测结果
+        for info in devices:
+            entry = self._entries.get(info["key"])
+            if entry and entry.get("signature") != self._signature(info):
+                self._invalidate(info["key"])
+        if self._dirty:
+            self._save()
+
+    @staticmethod
+    def _signature(info: Dict[str, Any]) -> List[Any]:
+        return [
+            info.get("max_input_channels", 0),
+            info.get("max_output_channels", 0),
+            info.get("default_samplerate", 0),
+        ]
+
+    def _invalidate(self, key: str):
+        if self._entries.pop(key, None) is not None:
+            self._invalidated += 1
+            self._dirty = True
+
+    def invalidate_device(self, index: Optional[int]):
+        """
+        丢弃某个设备的探测结果（如打开失败后），下次使用时重新探测.
+        """
+        device = self.get_device(index)
+        if device is None:
+            return
+        with self._lock:
+            self._invalidate(device["key"])
+            if self._dirty:
+                self._save()
+
+    # -----------------------
+    # 能力探测
+    # -----------------------
+    def get_capabilities(self, index: Optional[int], kind: str) -> Dict[str, Any]:
+        """获取设备在某一方向上的能力，首次使用时探测并持久化.
+
+        返回 {"rates": [...], "channels": [...], "max_channels": n,
+        "latency": {"low": 秒, "high": 秒}}，设备无效时返回空字典。
+        """
+        assert kind in ("input", "output")
+        device = (
+            self.get_device(index)
+            if isinstance(index, int) and index >= 0
+            else self.default_device(kind)
+        )
+        if device is None:
+            return {}
+
+        with self._lock:
+            entry = self._entries.get(device["key"])
+            if entry is None:
+                entry = {
+                    "hostapi": device["hostapi_name"],
+                    "name": device.get("name", ""),
+                    "signature": self._signature(device),
+                }
+                self._entries[device["key"]] = entry
+
+            caps = entry.get(kind)
+            if caps is not None and self._probe_failed(caps):
+                # 旧版本缓存文件中可能留有失败结果（没有探测时间），同样重新探测
+                probed_at = caps.get("probed_at")
+                if (
+                    probed_at is None
+                    or time.monotonic() - probed_at >= FAILED_PROBE_TTL
+                ):
+                    caps = None
+            if caps is None:
+                caps = self._probe(device, kind)
+                entry[kind] = caps
+                if self._probe_failed(caps):
+                    # 探测失败的结果不写入缓存文件
+                    return caps
+                self._dirty = True
+                self._save()
+            return caps
+
+    def supports(
+        self,
+        index: Optional[int],
+        kind: str,
+        sample_rate: int,
+        channels: int = 1,
+    ) -> bool:
+        """
+        设备能否以指定采样率和通道数打开（常用采样率读缓存，其他采样率直接检查）.
+        """
+        caps = self.get_capabilities(index, kind)
+        if not caps or channels > caps.get("max_channels", 0):
+            return False
+        if sample_rate in PROBE_SAMPLE_RATES:
+            return sample_rate in caps.get("rates", [])
+        return self._check(index, kind, sample_rate, channels)
+
+    @staticmethod
+    def _probe_failed(caps: Dict[str, Any]) -> bool:
+        return caps.get("max_channels", 0) > 0 and not caps.get("rates")
+
+    def _probe(self, device: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        index = device["index"]
+        max_channels = int(device.get(f"max_{kind}_channels", 0))
+
+        rates = []
+        channels = []
+        if max_channels > 0:
+            rates = [
+                rate for rate in PROBE_SAMPLE_RATES if self._check(index, kind, rate, 1)
+            ]
+            default_rate = int(device.get("default_samplerate", 0)) or None
+            channels = [
+                count
+                for count in sorted({1, min(2, max_channels), max_channels})
+                if self._check(index, kind, default_rate, count)
+            ]
+
+        self._probe_time += time.perf_counter() - start
+        self._probes += 1
+        logger.debug(
+            f"探测音频设备 [{index}] {device.get('name')} ({kind}): "
+            f"采样率 {rates}, 通道 {channels}"
+        )
+        caps = {
+            "rates": rates,
+            "channels": channels,
+            "max_channels": max_channels,
+            "latency": {
+                "low": device.get(f"default_low_{kind}_latency"),
+                "high": device.get(f"default_high_{kind}_latency"),
+            },
+        }
+        if self._probe_failed(caps):
+            # 设备有通道却没有可用采样率：多半被占用或暂时不可用
+            self._failed_probes += 1
+            caps["probed_at"] = time.monotonic()
+        return caps
+
+    def _check(
+        self, index: Optional[int], kind: str, sample_rate: Optional[int], channels: int
+    ) -> bool:
+        try:
+            self._backend.check_settings(kind, index, sample_rate, channels, "int16")
+            return True
+        except Exception:
+            return False
+
+    # -----------------------
+    # 持久化
+    # -----------------------
+    def _get_cache_path(self) -> Path:
+        if self._cache_path is None:
+            self._cache_path = get_user_cache_dir() / CACHE_FILE_NAME
+        return self._cache_path
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self._persist:
+            return {}
+        try:
+            path = self._get_cache_path()
+            if not path.exists():
+                return {}
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return data.get("devices", {})
+        except Exception as e:
+            logger.warning(f"读取音频设备缓存失败: {e}")
+            return {}
+
+    def _save(self):
+        if not self._persist:
+            self._dirty = False
+            return
+        try:
+            path = self._get_cache_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"version": CACHE_VERSION, "devices": self._persistable_entries()}
+            path.write_text(
+                json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"保存音频设备缓存失败: {e}")
+
+    def _persistable_entries(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: {
+                field: value
+                for field, value in entry.items()
+                if not (isinstance(value, dict) and self._probe_failed(value))
+            }
+            for key, entry in self._entries.items()
+        }
+
+    def clear(self):
+        """
+        清空缓存（包括持久化文件），下次使用时重新枚举和探测.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._devices = None
+            self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息.
+        """
+        return {
+            "path": str(self._cache_path) if self._cache_path else None,
+            "devices": len(self._devices) if self._devices else 0,
+            "cached_entries": len(self._entries),
+            "enumerations": self._enumerations,
+            "enumerate_ms": round(self._enumerate_time * 1000, 2),
+            "probes": self._probes,
+            "probe_ms": round(self._probe_time * 1000, 2),
+            "invalidated": self._invalidated,
+            "failed_probes": self._failed_probes,
+        }
@@ -0,0 +1,183 @@
+import math
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 下混模式
+DOWNMIX_MODES = ("select", "average", "beamform")
+DEFAULT_DOWNMIX_MODE = "average"
+
+# 声速（米/秒）
+SPEED_OF_SOUND = 343.0
+# 多通道录音最多使用的通道数
+MAX_CAPTURE_CHANNELS = 8
+
+
+class Downmixer:
+    """多通道录音下混为单声道（在录音回调中、重采样之前调用）.
+
+    - select：取指定通道
+    - average：各通道求平均
+    - beamform：线阵延迟求和波束形成，按麦克风间距和目标方向对齐各通道后求平均，
+      目标方向的语音同相叠加，其他方向的噪声/回声部分抵消
+
+    所有模式都按整块向量化处理，输出写入预分配缓冲区（返回的数组在下一次
+    process() 前有效），每块开销与 采样数 x 通道数 成正比，没有逐采样的 Python 循环。
+    """
+
+    def __init__(
+        self,
+        channels: int,
+        mode: str = DEFAULT_DOWNMIX_MODE,
+        sample_rate: int = 16000,
+        select_channel: int = 0,
+        mic_spacing_m: float = 0.05,
+        steer_angle_deg: float = 0.0,
+        block_size: int = 0,
+    ):
+        if channels < 1:
+            raise ValueError(f"通道数无效: {channels}")
+        if mode not in DOWNMIX_MODES:
+            logger.warning(
+                f"未知的下混模式: {mode}，使用 {DEFAULT_DOWNMIX_MODE}，"
+                f"可选: {', '.join(DOWNMIX_MODES)}"
+            )
+            mode = DEFAULT_DOWNMIX_MODE
+
+        self.channels = int(channels)
+        self.mode = mode
+        self.select_channel = min(max(0, int(select_channel)), self.channels - 1)
+        self.delays = self._steering_delays(
+            self.channels, sample_rate, mic_spacing_m, steer_angle_deg
+        )
+        self._max_delay = int(self.delays.max())
+
+        self._out = np.zeros(0, dtype=np.int16)
+        self._acc = np.zeros(0, dtype=np.int32)
+        # 波束形成的各通道历史（跨回调保留最近 max_delay 个采样）
+        self._history = np.zeros((self._max_delay, self.channels), dtype=np.int16)
+        self._window = np.zeros((0, self.channels), dtype=np.int16)
+        self._ensure_capacity(block_size)
+
+        # 统计
+        self._calls = 0
+        self._process_time = 0.0
+        self._max_process_time = 0.0
+
+    @staticmethod
+    def _steering_delays(
+        channels: int, sample_rate: int, spacing_m: float, angle_deg: float
+    ) -> np.ndarray:
+        """计算线阵各通道的对齐延迟（整数采样）.
+
+        目标方向（相对阵列法线的角度）的声波到达第 i 个麦克风比第 0 个晚
+        i * 间距 * sin(角度) / 声速，先到达的通道延迟得多，使各通道对齐。
+        """
+        tau = (
+            np.arange(channels)
+            * spacing_m
+            * math.sin(math.radians(angle_deg))
+            / SPEED_OF_SOUND
+            * sample_rate
+        )
+        delays = np.round(tau.max() - tau).astype(np.int64)
+        return delays - delays.min()
+
+    def _ensure_capacity(self, frames: int):
+        if frames <= len(self._out):
+            return
+        self._out = np.zeros(frames, dtype=np.int16)
+        self._acc = np.zeros(frames, dtype=np.int32)
+        self._window = np.zeros((self._max_delay + frames, self.channels), np.int16)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        下混一块 [采样, 通道] 的 int16 数据，返回单声道视图.
+        """
+        start = time.perf_counter()
+        frames = len(block)
+        self._ensure_capacity(frames)
+        out = self._out[:frames]
+        acc = self._acc[:frames]
+
+        if self.channels == 1:
+            np.copyto(out, block.reshape(-1))
+        elif self.mode == "select":
+            np.copyto(out, block[:, self.select_channel])
+        elif self.mode == "average" or self._max_delay == 0:
+            np.sum(block, axis=1, dtype=np.int32, out=acc)
+            np.floor_divide(acc, self.channels, out=acc)
+            np.copyto(out, acc, casting="unsafe")
+        else:
+            self._delay_and_sum(block, acc)
+            np.copyto(out, acc, casting="unsafe")
+
+        elapsed = time.perf_counter() - start
+        self._calls += 1
+        self._process_time += elapsed
+        if elapsed > self._max_process_time:
+            self._max_process_time = elapsed
+        return out
+
+    def _delay_and_sum(self, block: np.ndarray, acc: np.ndarray):
+        frames = len(block)
+        max_delay = self._max_delay
+        window = self._window[: max_delay + frames]
+
+        # 窗口 = 上一块末尾的 max_delay 个采样 + 本块
+        window[:max_delay] = self._history
+        window[max_delay:] = block
+
+        acc.fill(0)
+        for channel, delay in enumerate(self.delays):
+            start = max_delay - delay
+            acc += window[start : start + frames, channel]
+        np.floor_divide(acc, self.channels, out=acc)
+
+        self._history[:] = window[frames : frames + max_delay]
+
+    def reset(self):
+        """
+        清空波束形成的历史采样.
+        """
+        self._history.fill(0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取下混统计信息.
+        """
+        calls = self._calls
+        return {
+            "channels": self.channels,
+            "mode": self.mode,
+            "select_channel": self.select_channel,
+            "delays": self.delays.tolist(),
+            "calls": calls,
+            "avg_us": round(self._process_time / calls * 1e6, 2) if calls else 0.0,
+            "max_us": round(self._max_process_time * 1e6, 2),
+        }
+
+
+def create_downmixer(
+    channels: int, sample_rate: int, config: Optional[Dict[str, Any]] = None
+) -> Optional[Downmixer]:
+    """
+    按 AUDIO_OPTIONS.CAPTURE 配置创建下混器，单声道录音不需要下混时返回 None.
+    """
+    if channels <= 1:
+        return None
+    config = config or {}
+    return Downmixer(
+        channels,
+        mode=config.get("DOWNMIX", DEFAULT_DOWNMIX_MODE),
+        sample_rate=sample_rate,
+        select_channel=config.get("SELECT_CHANNEL", 0),
+        mic_spacing_m=config.get("MIC_SPACING_M", 0.05),
+        steer_angle_deg=config.get("STEER_ANGLE_DEG", 0.0),
+        block_size=sample_rate // 10,
+    )
@@ -0,0 +1,259 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class FrameChannel:
+    """音频线程与 asyncio 之间的单生产者/单消费者帧通道.
+
+    - 有界容量，写满时丢弃最旧的帧，并统计丢弃数
+    - put_nowait / get_nowait 基于 deque 的原子 append/popleft，不加锁，
+      可以在 PortAudio 回调线程中安全调用
+    - asyncio 消费者通过 ``await get()`` 等待，新数据到达时由生产者
+      经 call_soon_threadsafe 唤醒，无需轮询
+    - 线程消费者可通过 ``get_blocking(timeout)`` 阻塞等待
+    - 生产者可通过 ``put_blocking(frame, timeout)`` 在写满时等待消费者腾出空间
+    - 帧被丢弃（写满/清空/通道已关闭）时调用 on_drop，便于池化帧归还帧池
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        name: str = "frames",
+        on_drop: Optional[Callable[[Any], None]] = None,
+    ):
+        if capacity <= 0:
+            raise ValueError(f"帧通道容量必须大于0: {capacity}")
+
+        self.name = name
+        self._capacity = int(capacity)
+        self._frames = deque(maxlen=self._capacity)
+        self._on_drop = on_drop
+        self._closed = False
+
+        # asyncio 消费者等待的 future 及其所属事件循环
+        self._waiter: Optional[asyncio.Future] = None
+        self._waiter_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup_pending = False
+
+        # 线程消费者
+        self._thread_event = threading.Event()
+        self._thread_waiting = False
+
+        # 等待空间的生产者
+        self._space_event = threading.Event()
+        self._producer_waiting = False
+
+        # 统计
+        self._put_count = 0
+        self._get_count = 0
+        self._dropped_count = 0
+        self._blocked_count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def qsize(self) -> int:
+        return len(self._frames)
+
+    def empty(self) -> bool:
+        return not self._frames
+
+    def full(self) -> bool:
+        return len(self._frames) >= self._capacity
+
+    # -----------------------
+    # 生产者（任意线程）
+    # -----------------------
+    def put_nowait(self, frame: Any) -> bool:
+        """写入一帧，返回是否因通道已满丢弃了最旧的帧.
+
+        deque(maxlen) 在满时 append 会原子地丢弃最左侧元素。通道已关闭时
+        直接丢弃该帧。
+        """
+        if self._closed:
+            if self._on_drop is not None:
+                self._on_drop(frame)
+            self._dropped_count += 1
+            return True
+
+        dropped = len(self._frames) >= self._capacity
+        if dropped and self._on_drop is not None:
+            # 需要拿到被丢弃的帧，手动弹出最旧的一帧（消费者可能已先取走）
+            try:
+                self._on_drop(self._frames.popleft())
+            except IndexError:
+                pass
+        self._frames.append(frame)
+        self._put_count += 1
+        if dropped:
+            self._dropped_count += 1
+        if self._closed:
+            # 写入过程中通道被关闭（关闭方可能已清空）：再清空一次，不遗留帧
+            self.clear()
+            return dropped
+        self._notify()
+        return dropped
+
+    def put_blocking(self, frame: Any, timeout: Optional[float] = None) -> bool:
+        """写入一帧，通道已满时先等待消费者取走帧（最多 timeout 秒）.
+
+        超时后仍满则与 put_nowait 相同地丢弃最旧的帧，返回是否发生了丢弃。
+        """
+        if len(self._frames) >= self._capacity:
+            self._space_event.clear()
+            self._producer_waiting = True
+            try:
+                # 登记等待后再检查一次，避免消费者在登记前取走帧导致丢失唤醒
+                if len(self._frames) >= self._capacity:
+                    self._blocked_count += 1
+                    self._space_event.wait(timeout)
+            finally:
+                self._producer_waiting = False
+        return self.put_nowait(frame)
+
+    def _notify(self):
+        waiter = self._waiter
+        if waiter is not None and not self._wakeup_pending:
+            loop = self._waiter_loop
+            if loop is not None and not loop.is_closed():
+                self._wakeup_pending = True
+                try:
+                    loop.call_soon_threadsafe(self._wake_waiter, waiter)
+                except RuntimeError:
+                    # 事件循环已关闭
+                    self._wakeup_pending = False
+
+        if self._thread_waiting:
+            self._thread_event.set()
+
+    def _wake_waiter(self, waiter: asyncio.Future):
+        self._wakeup_pending = False
+        # 原 waiter 已被取消并换成了新的 waiter 时，唤醒当前的那个
+        current = self._waiter
+        if current is not None and current is not waiter and self._frames:
+            waiter = current
+        if not waiter.done():
+            waiter.set_result(None)
+
+    # -----------------------
+    # 消费者
+    # -----------------------
+    def get_nowait(self) -> Any:
+        """
+        取出一帧，通道为空时抛出 asyncio.QueueEmpty（与 asyncio.Queue 保持一致）.
+        """
+        try:
+            frame = self._frames.popleft()
+        except IndexError:
+            raise asyncio.QueueEmpty from None
+        self._get_count += 1
+        if self._producer_waiting:
+            self._space_event.set()
+        return frame
+
+    async def get(self) -> Any:
+        """
+        等待并取出一帧（仅限单个 asyncio 消费者）.
+        """
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            self._waiter_loop = loop
+            self._waiter = waiter
+            try:
+                # 登记 waiter 后再检查一次，避免生产者在登记前写入导致丢失唤醒
+                if self._frames:
+                    continue
+                await waiter
+            finally:
+                self._waiter = None
+
+    def get_blocking(self, timeout: Optional[float] = None) -> Any:
+        """
+        线程消费者阻塞等待一帧，超时返回 None.
+        """
+        try:
+            return self.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        self._thread_event.clear()
+        self._thread_waiting = True
+        try:
+            if not self._frames:
+                self._thread_event.wait(timeout)
+        finally:
+            self._thread_waiting = False
+
+        try:
+            return self.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def wake(self):
+        """
+        唤醒正在等待的消费者（用于关闭时让等待方退出）.
+        """
+        self._thread_event.set()
+        self._space_event.set()
+        waiter = self._waiter
+        loop = self._waiter_loop
+        if waiter is not None and loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wake_waiter, waiter)
+            except RuntimeError:
+                pass
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> int:
+        """关闭通道并清空，返回被丢弃的帧数.
+
+        之后写入的帧直接丢弃；与生产者并发关闭时，由生产者负责清掉
+        它在关闭之后写入的帧。
+        """
+        self._closed = True
+        cleared = self.clear()
+        self.wake()
+        return cleared
+
+    def clear(self) -> int:
+        """
+        清空通道，返回被丢弃的帧数.
+        """
+        cleared = 0
+        while True:
+            try:
+                frame = self._frames.popleft()
+            except IndexError:
+                break
+            cleared += 1
+            if self._on_drop is not None:
+                self._on_drop(frame)
+        if self._producer_waiting:
+            self._space_event.set()
+        return cleared
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取通道统计信息.
+        """
+        return {
+            "name": self.name,
+            "capacity": self._capacity,
+            "depth": len(self._frames),
+            "put": self._put_count,
+            "get": self._get_count,
+            "dropped": self._dropped_count,
+            "blocked": self._blocked_count,
+        }
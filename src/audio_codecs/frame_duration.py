@@ -0,0 +1,95 @@
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import opuslib
+
+from src.constants.constants import AudioConfig
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Opus 支持、且录音/播放路径都能处理的帧长度（毫秒）
+SUPPORTED_FRAME_DURATIONS = (10, 20, 40, 60)
+MAX_FRAME_DURATION = max(SUPPORTED_FRAME_DURATIONS)
+
+# 编解码一帧允许占用的单核 CPU 比例（乘以空闲比例后作为预算）
+AUDIO_CPU_BUDGET = 0.05
+
+
+def is_supported_frame_duration(frame_duration: int) -> bool:
+    return frame_duration in SUPPORTED_FRAME_DURATIONS
+
+
+def measure_codec_load(
+    frame_durations: Iterable[int] = SUPPORTED_FRAME_DURATIONS, frames: int = 50
+) -> Dict[int, float]:
+    """测量各帧长度下 Opus 编码+解码一帧占用的单核 CPU 比例.
+
+    帧越短，每帧固定开销（Python 调用、回调调度）占比越大，负载越高。
+    """
+    rng = np.random.default_rng(0)
+    loads = {}
+    for duration in frame_durations:
+        frame_size = AudioConfig.INPUT_SAMPLE_RATE * duration // 1000
+        encoder = opuslib.Encoder(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            AudioConfig.CHANNELS,
+            opuslib.APPLICATION_AUDIO,
+        )
+        decoder = opuslib.Decoder(AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.CHANNELS)
+        pcm = (rng.standard_normal(frame_size) * 3000).astype(np.int16).tobytes()
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            decoder.decode(encoder.encode(pcm, frame_size), frame_size)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / frames
+        loads[duration] = elapsed_ms / duration
+    return loads
+
+
+def measure_cpu_idle(interval: float = 0.2) -> float:
+    """
+    测量系统空闲比例（0~1），psutil 不可用时视为完全空闲.
+    """
+    try:
+        import psutil
+
+        return max(0.0, 1.0 - psutil.cpu_percent(interval=interval) / 100.0)
+    except Exception:
+        return 1.0
+
+
+def choose_frame_duration(
+    candidates: Iterable[int] = SUPPORTED_FRAME_DURATIONS,
+    budget: float = AUDIO_CPU_BUDGET,
+    loads: Optional[Dict[int, float]] = None,
+    cpu_idle: Optional[float] = None,
+) -> int:
+    """按实测 CPU 余量选择帧长度.
+
+    选择编解码负载不超过 ``budget * 空闲比例`` 的最短帧长（延迟最低）；
+    都不满足时使用最长帧长，降低每秒回调与编解码次数。
+    """
+    candidates = sorted(d for d in candidates if is_supported_frame_duration(d))
+    if not candidates:
+        return AudioConfig.FRAME_DURATION
+
+    if loads is None:
+        loads = measure_codec_load(candidates)
+    if cpu_idle is None:
+        cpu_idle = measure_cpu_idle()
+
+    allowed = budget * cpu_idle
+    for duration in candidates:
+        if loads.get(duration, float("inf")) <= allowed:
+            chosen = duration
+            break
+    else:
+        chosen = candidates[-1]
+
+    logger.info(
+        f"帧长度选择: {chosen}ms (空闲 {cpu_idle:.0%}, 预算 {allowed:.2%}, "
+        f"负载 {', '.join(f'{d}ms={v:.2%}' for d, v in sorted(loads.items()))})"
+    )
+    return chosen
@@ -0,0 +1,131 @@
+import ctypes
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class PooledFrame:
+    """
+    帧池中的一帧：预分配的 PCM 缓冲 + 引用计数，引用归零时自动回到帧池.
+    """
+
+    __slots__ = ("_pool", "_refs", "samples", "length", "pointer", "timestamp")
+
+    def __init__(self, pool: "AudioFramePool", frame_size: int, dtype):
+        self._pool = pool
+        self._refs = 0
+        self.samples = np.zeros(frame_size, dtype=dtype)
+        self.length = frame_size
+        # 指向缓冲区的 ctypes 指针（供 Opus 编码器等 C 接口直接读取，无需 tobytes）
+        self.pointer = self.samples.ctypes.data_as(ctypes.POINTER(ctypes.c_int16))
+        self.timestamp = 0.0
+
+    @property
+    def pcm(self) -> np.ndarray:
+        """
+        有效采样的视图（不复制）.
+        """
+        return self.samples[: self.length]
+
+    @property
+    def nbytes(self) -> int:
+        return self.length * self.samples.itemsize
+
+    def memoryview(self) -> memoryview:
+        """
+        有效采样的只读字节视图（不复制）.
+        """
+        return memoryview(self.samples[: self.length]).cast("B").toreadonly()
+
+    def retain(self) -> "PooledFrame":
+        """
+        增加一个引用（交给另一个消费者之前调用）.
+        """
+        self._pool._retain(self)
+        return self
+
+    def release(self):
+        """
+        释放一个引用，最后一个引用释放后帧回到帧池.
+        """
+        self._pool._release(self)
+
+
+class AudioFramePool:
+    """录音路径的预分配帧池.
+
+    - 帧在构造时一次性分配，录音回调 acquire() 取用、消费者用完 release() 归还，
+      稳态下每帧不产生新的 PCM 缓冲分配
+    - 同一帧可通过引用计数同时交给多个消费者（编码器、唤醒词检测等）
+    - 帧池耗尽时（消费者积压）临时分配新帧并计入 runtime_allocations，
+      可据此验证零拷贝/零分配
+    """
+
+    def __init__(self, frame_size: int, count: int = 32, dtype=np.int16):
+        if frame_size <= 0 or count <= 0:
+            raise ValueError(f"帧池参数无效: frame_size={frame_size}, count={count}")
+
+        self._frame_size = int(frame_size)
+        self._dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._free = deque(
+            PooledFrame(self, self._frame_size, self._dtype) for _ in range(count)
+        )
+
+        # 统计
+        self._allocated = count
+        self._runtime_allocations = 0
+        self._acquired = 0
+        self._recycled = 0
+
+    @property
+    def frame_size(self) -> int:
+        return self._frame_size
+
+    def acquire(self, length: Optional[int] = None) -> PooledFrame:
+        """
+        取出一帧（引用计数为1），length 为本帧有效采样数（不超过帧长）.
+        """
+        try:
+            frame = self._free.pop()
+        except IndexError:
+            frame = PooledFrame(self, self._frame_size, self._dtype)
+            with self._lock:
+                self._allocated += 1
+                self._runtime_allocations += 1
+
+        frame._refs = 1
+        frame.length = (
+            self._frame_size if length is None else min(length, self._frame_size)
+        )
+        self._acquired += 1
+        return frame
+
+    def _retain(self, frame: PooledFrame):
+        with self._lock:
+            frame._refs += 1
+
+    def _release(self, frame: PooledFrame):
+        with self._lock:
+            frame._refs -= 1
+            if frame._refs != 0:
+                return
+            self._recycled += 1
+        self._free.append(frame)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取帧池统计信息.
+        """
+        free = len(self._free)
+        return {
+            "frame_size": self._frame_size,
+            "allocated": self._allocated,
+            "runtime_allocations": self._runtime_allocations,
+            "acquired": self._acquired,
+            "recycled": self._recycled,
+            "free": free,
+            "in_use": self._allocated - free,
+        }
@@ -0,0 +1,225 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.audio_codecs.frame_channel import FrameChannel
+
+
+class AdaptiveJitterBuffer:
+    """下行播放的自适应抖动缓冲.
+
+    位于 Opus 解码与播放回调之间：
+    - 每段语音开始时先预缓冲到目标延迟再开始出帧，把网络抖动吸收在缓冲里
+    - 按帧相对媒体时钟的到达延迟的均值/方差动态调整目标延迟：
+      抖动变大时快速加深，网络平稳后缓慢回落；服务端突发提前发送的帧
+      不会被误判为抖动
+    - 一段语音结束后（一段时间没有新帧）剩余不足目标延迟的帧会直接放完
+    - 统计当前深度、欠载次数和迟到帧数（相对延迟超过当时目标延迟、
+      即晚于播放点到达的帧；下行没有序号，以本段语音的媒体时钟判断）
+
+    push() 在事件循环/解码线程调用，pop() 在播放回调（音频线程）调用。
+    """
+
+    # 目标延迟 = 相对延迟均值 + 系数 * 标准差 + 一帧，覆盖绝大多数迟到
+    DEVIATION_MULTIPLIER = 3.0
+    # 相对延迟均值/方差的平滑系数（RFC 3550 使用 1/16）
+    SMOOTHING = 1 / 16
+    # 目标延迟回落速度（每帧向期望值靠近的比例），加深时直接跳到期望值
+    DECAY_RATE = 0.02
+
+    def __init__(
+        self,
+        channel: FrameChannel,
+        sample_rate: int,
+        frame_duration_ms: float,
+        target_delay_ms: float = 60,
+        min_delay_ms: float = 20,
+        max_delay_ms: float = 300,
+        adaptive: bool = True,
+        talkspurt_gap_ms: float = 500,
+    ):
+        self._channel = channel
+        self._sample_rate = sample_rate
+        self._frame_ms = float(frame_duration_ms)
+
+        self._min_delay_ms = float(min_delay_ms)
+        self._max_delay_ms = float(max(max_delay_ms, min_delay_ms))
+        self._base_delay_ms = self._clamp(float(target_delay_ms))
+        self._target_delay_ms = self._base_delay_ms
+        self._adaptive = adaptive
+        # 超过该间隔视为新的一段语音，不计入抖动/欠载
+        self._talkspurt_gap_ms = float(talkspurt_gap_ms)
+
+        # 状态：预缓冲中 / 播放中
+        self._playing = False
+        # 正在放完一段语音的尾部（此时缓冲耗尽不算欠载）
+        self._draining = False
+        self._last_arrival: Optional[float] = None
+        self._starved_at: Optional[float] = None
+
+        # 当前语音段的到达延迟估计（相对于本段最早到达的帧）
+        self._talkspurt_start: Optional[float] = None
+        self._media_ms = 0.0
+        self._min_offset_ms = 0.0
+        self._delay_mean_ms = 0.0
+        self._delay_var_ms2 = 0.0
+
+        # 统计
+        self._frames_in = 0
+        self._frames_out = 0
+        self._underruns = 0
+        self._late_frames = 0
+
+    def _clamp(self, delay_ms: float) -> float:
+        return min(max(delay_ms, self._min_delay_ms), self._max_delay_ms)
+
+    @property
+    def target_delay_ms(self) -> float:
+        return self._target_delay_ms
+
+    def depth_ms(self) -> float:
+        return self._channel.qsize() * self._frame_ms
+
+    def set_frame_duration(self, frame_duration_ms: float):
+        self._frame_ms = float(frame_duration_ms)
+
+    # -----------------------
+    # 生产者：解码后的帧
+    # -----------------------
+    def push(self, frame: np.ndarray, arrival: Optional[float] = None):
+        """
+        放入一帧解码后的 PCM，并更新到达抖动估计.
+        """
+        now = time.monotonic() if arrival is None else arrival
+        if len(frame):
+            self._frame_ms = len(frame) * 1000.0 / self._sample_rate
+
+        # 相对延迟超过目标延迟：该帧晚于其播放点到达（在调整目标延迟之前判断）
+        if self._update_delay_estimate(now) > self._target_delay_ms:
+            self._late_frames += 1
+
+        # 播放已因缺帧中断，而新帧在同一段语音内到达：记为一次欠载
+        starved_at = self._starved_at
+        if starved_at is not None:
+            self._starved_at = None
+            if (now - starved_at) * 1000.0 < self._talkspurt_gap_ms:
+                self._underruns += 1
+
+        self._last_arrival = now
+        self._draining = False
+        self._frames_in += 1
+        self._channel.put_nowait(frame)
+
+        if self._adaptive:
+            self._adapt()
+
+    def _update_delay_estimate(self, now: float) -> float:
+        """更新到达延迟的均值/方差估计，返回该帧的相对延迟（毫秒）.
+
+        以本段语音第一帧为媒体时钟起点，帧 i 的偏移 = 实际到达时间 - 媒体时间；
+        相对延迟 = 偏移 - 本段最小偏移，即该帧比"最准时"的帧晚到了多少。
+        """
+        last = self._last_arrival
+        if last is None or (now - last) * 1000.0 >= self._talkspurt_gap_ms:
+            # 新的一段语音
+            self._talkspurt_start = now
+            self._media_ms = 0.0
+            self._min_offset_ms = 0.0
+
+        offset_ms = (now - self._talkspurt_start) * 1000.0 - self._media_ms
+        self._min_offset_ms = min(self._min_offset_ms, offset_ms)
+        relative_delay = offset_ms - self._min_offset_ms
+
+        diff = relative_delay - self._delay_mean_ms
+        self._delay_mean_ms += diff * self.SMOOTHING
+        self._delay_var_ms2 += (diff * diff - self._delay_var_ms2) * self.SMOOTHING
+        self._media_ms += self._frame_ms
+        return relative_delay
+
+    def _adapt(self):
+        deviation_ms = self._delay_var_ms2**0.5
+        desired = self._clamp(
+            max(
+                self._base_delay_ms,
+                self._delay_mean_ms
+                + deviation_ms * self.DEVIATION_MULTIPLIER
+                + self._frame_ms,
+            )
+        )
+        if desired > self._target_delay_ms:
+            self._target_delay_ms = desired
+        else:
+            self._target_delay_ms += (desired - self._target_delay_ms) * self.DECAY_RATE
+
+    # -----------------------
+    # 消费者：播放回调
+    # -----------------------
+    def pop(self) -> Optional[Any]:
+        """
+        取出一帧用于播放；预缓冲未满或缓冲已空时返回 None（调用方输出静音）.
+        """
+        if not self._playing:
+            depth = self._channel.qsize()
+            if depth == 0:
+                return None
+            if depth * self._frame_ms < self._target_delay_ms:
+                # 一段语音的尾部：较长时间没有新帧到达，直接放完剩余帧
+                last = self._last_arrival
+                idle_ms = (time.monotonic() - last) * 1000.0 if last else 0.0
+                if idle_ms < self._target_delay_ms:
+                    return None
+                self._draining = True
+            self._playing = True
+
+        try:
+            frame = self._channel.get_nowait()
+        except asyncio.QueueEmpty:
+            # 缓冲耗尽，回到预缓冲状态；是否算欠载取决于后续帧是否很快到达
+            self._playing = False
+            if not self._draining:
+                self._starved_at = time.monotonic()
+            self._draining = False
+            return None
+
+        self._frames_out += 1
+        return frame
+
+    def is_starved(self) -> bool:
+        """
+        是否处于语音段中途的缺帧状态（调用方可据此做丢包隐藏而不是输出静音）.
+        """
+        starved_at = self._starved_at
+        if starved_at is None or self._playing:
+            return False
+        return (time.monotonic() - starved_at) * 1000.0 < self._talkspurt_gap_ms
+
+    def reset(self) -> int:
+        """
+        清空缓冲并回到预缓冲状态（打断/清空播放队列时调用），返回丢弃的帧数.
+        """
+        cleared = self._channel.clear()
+        self._playing = False
+        self._draining = False
+        self._last_arrival = None
+        self._starved_at = None
+        return cleared
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取抖动缓冲统计信息.
+        """
+        return {
+            "playing": self._playing,
+            "depth_frames": self._channel.qsize(),
+            "depth_ms": round(self.depth_ms(), 1),
+            "target_delay_ms": round(self._target_delay_ms, 1),
+            "delay_mean_ms": round(self._delay_mean_ms, 2),
+            "jitter_ms": round(self._delay_var_ms2**0.5, 2),
+            "frames_in": self._frames_in,
+            "frames_out": self._frames_out,
+            "underruns": self._underruns,
+            "late_frames": self._late_frames,
+            "dropped": self._channel.get_stats()["dropped"],
+        }
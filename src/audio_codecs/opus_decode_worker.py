@@ -0,0 +1,177 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.audio_codecs.frame_channel import FrameChannel
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 队列中的一项：(到达时间, Opus数据包 / 丢失帧数 / 标记回调, 提交时的代数)
+DecodeItem = Tuple[float, Any, int]
+
+
+class OpusDecodeWorker:
+    """下行 Opus 解码工作线程.
+
+    - 网络回调只需 ``submit()`` 把数据包放入有界队列（满时丢弃最旧的包），
+      不创建 asyncio 任务，也不在事件循环线程上解码
+    - 单个工作线程阻塞等待队列，一次取走已积压的多个包批量交给 handler 解码，
+      由 handler 直接写入播放缓冲
+    - 丢包标记与数据包走同一队列，保证隐藏帧与后续音频的先后顺序
+    - 标记回调同样按序排队，在之前的数据包都解码完成后由 handler 调用；
+      被丢弃（队列溢出或清空）时立即调用，保证不会丢失
+    - 每项带提交时的代数（epoch），clear() 使代数加一；工作线程在清空前
+      已取走的项属于旧代数，handler 据此丢弃，避免打断后仍播放旧音频
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[DecodeItem]], None],
+        capacity: int = 100,
+        batch_size: int = 8,
+        name: str = "opus-decode",
+    ):
+        self._handler = handler
+        self._batch_size = max(1, int(batch_size))
+        self._name = name
+        self._queue = FrameChannel(capacity, name=name, on_drop=self._on_drop)
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # 工作线程正在处理的批次大小（用于判断是否还有未解码的数据）
+        self._in_flight = 0
+        self._epoch = 0
+
+        # 统计
+        self._batches = 0
+        self._decoded_items = 0
+        self._max_batch = 0
+        self._decode_time = 0.0
+
+    def start(self):
+        """
+        启动工作线程.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """
+        停止工作线程并丢弃未处理的数据包.
+        """
+        self._running = False
+        self._queue.wake()
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+        self._queue.clear()
+
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def epoch(self) -> int:
+        """
+        当前代数，项的代数与之不同表示提交后队列已被清空.
+        """
+        return self._epoch
+
+    # -----------------------
+    # 生产者（任意线程，不阻塞）
+    # -----------------------
+    def submit(self, opus_data: bytes):
+        """
+        提交一个 Opus 数据包.
+        """
+        self._queue.put_nowait((time.monotonic(), opus_data, self._epoch))
+
+    def submit_loss(self, lost_frames: int):
+        """
+        提交丢包标记，工作线程会在下一个数据包之前补出隐藏帧.
+        """
+        if lost_frames > 0:
+            self._queue.put_nowait((time.monotonic(), int(lost_frames), self._epoch))
+
+    def submit_marker(self, callback: Callable[[], None]):
+        """
+        提交标记回调：之前提交的数据包都解码写入播放缓冲后调用.
+        """
+        self._queue.put_nowait((time.monotonic(), callback, self._epoch))
+
+    @staticmethod
+    def _on_drop(item: DecodeItem):
+        if callable(item[1]):
+            try:
+                item[1]()
+            except Exception as e:
+                logger.warning(f"执行被丢弃的标记回调失败: {e}")
+
+    def pending(self) -> int:
+        """
+        尚未解码完成的项数（队列中 + 正在处理）.
+        """
+        return self._queue.qsize() + self._in_flight
+
+    def clear(self) -> int:
+        """
+        丢弃尚未解码的数据包并使代数加一（正在处理的批次随之作废），返回丢弃数.
+        """
+        self._epoch += 1
+        return self._queue.clear()
+
+    # -----------------------
+    # 工作线程
+    # -----------------------
+    def _run(self):
+        logger.debug(f"{self._name} 解码线程已启动")
+        while self._running:
+            item = self._queue.get_blocking(timeout=0.5)
+            if item is None:
+                continue
+
+            batch = [item]
+            self._in_flight = 1
+            while len(batch) < self._batch_size:
+                item = self._queue.get_blocking(timeout=0)
+                if item is None:
+                    break
+                batch.append(item)
+                self._in_flight = len(batch)
+
+            start = time.perf_counter()
+            try:
+                self._handler(batch)
+            except Exception as e:
+                logger.warning(f"批量解码失败，丢弃 {len(batch)} 个数据包: {e}")
+            finally:
+                self._in_flight = 0
+
+            self._decode_time += time.perf_counter() - start
+            self._batches += 1
+            self._decoded_items += len(batch)
+            self._max_batch = max(self._max_batch, len(batch))
+
+        logger.debug(f"{self._name} 解码线程已停止")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取解码线程统计信息.
+        """
+        batches = self._batches
+        return {
+            "running": self._running,
+            "pending": self.pending(),
+            "queue": self._queue.get_stats(),
+            "batches": batches,
+            "items": self._decoded_items,
+            "avg_batch": round(self._decoded_items / batches, 2) if batches else 0.0,
+            "max_batch": self._max_batch,
+            "avg_batch_ms": (
+                round(self._decode_time / batches * 1000, 3) if batches else 0.0
+            ),
+        }
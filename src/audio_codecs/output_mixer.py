@@ -0,0 +1,393 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 主音源（TTS，来自抖动缓冲）在混音器中的名称
+PRIMARY_SOURCE = "tts"
+
+
+class MixerSource:
+    """混音器的流式音源（音乐、提示音等）.
+
+    生产者（解码线程）调用 ``write()`` 写入 PCM，缓冲满时阻塞等待播放回调取走数据
+    （背压），播放回调在混音时读取；``finish()`` 表示数据已写完，放完后音源结束。
+    所有数据均为混音器采样率的单声道 int16。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sample_rate: int,
+        gain: float = 1.0,
+        duckable: bool = False,
+        capacity_ms: int = 2000,
+        one_shot: bool = False,
+    ):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.gain = float(gain)
+        # TTS 播放时是否被压低音量
+        self.duckable = duckable
+        # 放完后自动从混音器移除（提示音）
+        self.one_shot = one_shot
+        self.paused = False
+
+        self._buffer = AudioRingBuffer(max(1, sample_rate * capacity_ms // 1000))
+        self._space_event = threading.Event()
+        self._finished = False
+        self._closed = False
+
+        # 统计
+        self._consumed = 0
+        self._underruns = 0
+
+    @property
+    def finished(self) -> bool:
+        """
+        数据已写完且全部放完.
+        """
+        return self._finished and not self._buffer
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def position(self) -> float:
+        """
+        已播放时长（秒）.
+        """
+        return self._consumed / self.sample_rate
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def write(self, data: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """写入 PCM（任意线程），缓冲空间不足时阻塞等待.
+
+        音源被关闭或等待超时时返回 False。
+        """
+        data = np.asarray(data, dtype=np.int16).reshape(-1)
+        capacity = self._buffer.capacity
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        offset = 0
+        while offset < len(data):
+            if self._closed:
+                return False
+            space = capacity - len(self._buffer)
+            if space <= 0:
+                self._space_event.clear()
+                # 清除事件后再检查一次，避免错过回调刚发出的通知
+                if capacity - len(self._buffer) <= 0:
+                    wait = None if deadline is None else deadline - time.monotonic()
+                    if wait is not None and wait <= 0:
+                        return False
+                    self._space_event.wait(wait)
+                continue
+            chunk = data[offset : offset + space]
+            self._buffer.write(chunk)
+            offset += len(chunk)
+        return True
+
+    def finish(self):
+        """
+        数据已全部写入，放完后音源结束.
+        """
+        self._finished = True
+
+    def clear(self) -> int:
+        """
+        丢弃未播放的数据（跳转时使用），返回丢弃的采样数.
+        """
+        cleared = self._buffer.clear()
+        self._finished = False
+        self._space_event.set()
+        return cleared
+
+    def close(self):
+        """
+        关闭音源：唤醒阻塞中的生产者并丢弃剩余数据.
+        """
+        self._closed = True
+        self._buffer.clear()
+        self._space_event.set()
+
+    def reset_position(self, samples: int = 0):
+        self._consumed = samples
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        播放回调中读取至多 len(out) 个采样，返回实际读取数.
+        """
+        if self.paused or self._closed:
+            return 0
+        count = len(self._buffer.read_available(len(out), out=out))
+        if count:
+            self._consumed += count
+            self._space_event.set()
+        if count < len(out) and not self._finished:
+            self._underruns += 1
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "gain": self.gain,
+            "duckable": self.duckable,
+            "paused": self.paused,
+            "pending_ms": round(len(self._buffer) * 1000 / self.sample_rate, 1),
+            "position": round(self.position, 2),
+            "finished": self.finished,
+            "underruns": self._underruns,
+        }
+
+
+class OutputMixer:
+    """播放混音器：TTS 与音乐、提示音等音源混合后经同一个输出流播放.
+
+    在解码采样率（24kHz）下混音，之后共用一个输出重采样器和一个播放设备。
+    TTS 为主音源，由播放回调从抖动缓冲取帧后传入 ``mix()``；其他音源为
+    ``MixerSource``。TTS 出声时可压低（闪避）duckable 音源的音量，
+    TTS 结束并保持 hold_ms 后再恢复，增益按采样线性渐变，避免爆音。
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        duck_gain: float = 0.2,
+        attack_ms: int = 50,
+        release_ms: int = 400,
+        hold_ms: int = 300,
+        primary_gain: float = 1.0,
+    ):
+        self.sample_rate = sample_rate
+        self.duck_gain = float(duck_gain)
+        self.primary_gain = float(primary_gain)
+        # 每个采样的增益变化量
+        self._attack_step = (1.0 - self.duck_gain) / max(
+            1, sample_rate * attack_ms // 1000
+        )
+        self._release_step = (1.0 - self.duck_gain) / max(
+            1, sample_rate * release_ms // 1000
+        )
+        self._hold_samples = sample_rate * hold_ms // 1000
+
+        self._lock = threading.Lock()
+        self._sources: Dict[str, MixerSource] = {}
+        # 播放回调只读快照，增删音源时整体替换，回调中无需加锁
+        self._snapshot = ()
+
+        # 闪避状态
+        self._duck_level = 1.0
+        self._hold_remaining = 0
+
+        # 预分配的混音缓冲（按需扩容）
+        self._acc = np.zeros(0, dtype=np.float32)
+        self._read = np.zeros(0, dtype=np.int16)
+        self._ramp = np.zeros(0, dtype=np.float32)
+        self._out = np.zeros(0, dtype=np.int16)
+
+        # 统计
+        self._mixed_blocks = 0
+        self._clipped_blocks = 0
+        self._mix_time = 0.0
+        self._max_mix_time = 0.0
+
+    # ---- 音源管理（任意线程） ----
+
+    def add_source(self, name: str, **kwargs) -> MixerSource:
+        """
+        添加音源（同名音源会被关闭并替换）.
+        """
+        if name == PRIMARY_SOURCE:
+            raise ValueError(f"音源名称 {PRIMARY_SOURCE} 保留给TTS")
+        source = MixerSource(name, self.sample_rate, **kwargs)
+        with self._lock:
+            old = self._sources.get(name)
+            self._sources[name] = source
+            self._snapshot = tuple(self._sources.values())
+        if old:
+            old.close()
+        logger.debug(f"混音器添加音源: {name}")
+        return source
+
+    def remove_source(self, name: str) -> bool:
+        with self._lock:
+            source = self._sources.pop(name, None)
+            self._snapshot = tuple(self._sources.values())
+        if source is None:
+            return False
+        source.close()
+        logger.debug(f"混音器移除音源: {name}")
+        return True
+
+    def get_source(self, name: str) -> Optional[MixerSource]:
+        return self._sources.get(name)
+
+    def set_gain(self, name: str, gain: float) -> bool:
+        """
+        设置音源增益（PRIMARY_SOURCE 为TTS）.
+        """
+        gain = max(0.0, float(gain))
+        if name == PRIMARY_SOURCE:
+            self.primary_gain = gain
+            return True
+        source = self._sources.get(name)
+        if source is None:
+            return False
+        source.gain = gain
+        return True
+
+    def has_pending(self) -> bool:
+        """
+        是否有音源待播放（播放回调据此决定是否需要混音）.
+        """
+        for source in self._snapshot:
+            if not source.paused and source.pending():
+                return True
+        return False
+
+    def close(self):
+        with self._lock:
+            sources = list(self._sources.values())
+            self._sources.clear()
+            self._snapshot = ()
+        for source in sources:
+            source.close()
+
+    # ---- 混音（播放回调） ----
+
+    def _ensure_capacity(self, frames: int):
+        if frames <= len(self._acc):
+            return
+        self._acc = np.zeros(frames, dtype=np.float32)
+        self._read = np.zeros(frames, dtype=np.int16)
+        self._ramp = np.zeros(frames, dtype=np.float32)
+        self._out = np.zeros(frames, dtype=np.int16)
+
+    def mix(self, primary: Optional[np.ndarray], frames: int) -> Optional[np.ndarray]:
+        """混合一块音频.
+
+        primary 为本块的TTS数据（None 表示TTS无数据），frames 为 TTS 无数据时的块长度。
+        没有任何音源需要混音时原样返回 primary（不拷贝），否则返回预分配缓冲的视图，
+        在下一次 mix() 之前有效。
+        """
+        if primary is not None:
+            frames = len(primary)
+        sources = self._snapshot
+        # TTS 出声时闪避，结束后保持一段时间再恢复
+        self._update_hold(primary is not None, frames)
+        if not sources and (primary is None or self.primary_gain == 1.0):
+            self._advance_duck(frames)
+            return primary
+
+        start = time.perf_counter()
+        self._ensure_capacity(frames)
+        acc = self._acc[:frames]
+        ramp = self._duck_ramp(frames)
+
+        if primary is not None:
+            np.multiply(primary, self.primary_gain, out=acc, casting="unsafe")
+        else:
+            acc.fill(0.0)
+
+        mixed = primary is not None
+        finished = []
+        read = self._read[:frames]
+        for source in sources:
+            count = source.read_into(read)
+            if count:
+                segment = read[:count].astype(np.float32)
+                segment *= source.gain
+                if source.duckable and ramp is not None:
+                    segment *= ramp[:count]
+                acc[:count] += segment
+                mixed = True
+            if source.one_shot and source.finished:
+                finished.append(source.name)
+
+        for name in finished:
+            self._remove_finished(name)
+
+        if not mixed:
+            return None
+
+        out = self._out[:frames]
+        if np.abs(acc).max() > 32767:
+            self._clipped_blocks += 1
+            np.clip(acc, -32768, 32767, out=acc)
+        np.copyto(out, acc, casting="unsafe")
+
+        elapsed = time.perf_counter() - start
+        self._mixed_blocks += 1
+        self._mix_time += elapsed
+        if elapsed > self._max_mix_time:
+            self._max_mix_time = elapsed
+        return out
+
+    def _update_hold(self, primary_active: bool, frames: int):
+        if primary_active:
+            self._hold_remaining = self._hold_samples
+        else:
+            self._hold_remaining = max(0, self._hold_remaining - frames)
+
+    def _duck_target(self) -> float:
+        return self.duck_gain if self._hold_remaining > 0 else 1.0
+
+    def _advance_duck(self, frames: int):
+        target = self._duck_target()
+        level = self._duck_level
+        if level > target:
+            level = max(target, level - self._attack_step * frames)
+        elif level < target:
+            level = min(target, level + self._release_step * frames)
+        self._duck_level = level
+
+    def _duck_ramp(self, frames: int) -> Optional[np.ndarray]:
+        """
+        本块的闪避增益曲线，未闪避时返回 None（无需相乘）.
+        """
+        begin = self._duck_level
+        self._advance_duck(frames)
+        end = self._duck_level
+        if begin == 1.0 and end == 1.0:
+            return None
+        ramp = self._ramp[:frames]
+        if begin == end:
+            ramp.fill(end)
+        else:
+            # 线性渐变到本块结束时的增益
+            ramp[:] = np.linspace(begin, end, frames, dtype=np.float32)
+        return ramp
+
+    def _remove_finished(self, name: str):
+        with self._lock:
+            source = self._sources.get(name)
+            if source is None or not source.finished:
+                return
+            del self._sources[name]
+            self._snapshot = tuple(self._sources.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取混音统计信息.
+        """
+        blocks = self._mixed_blocks
+        return {
+            "sources": {s.name: s.get_stats() for s in self._snapshot},
+            "primary_gain": self.primary_gain,
+            "duck_gain": self.duck_gain,
+            "duck_level": round(self._duck_level, 3),
+            "ducking": self._hold_remaining > 0,
+            "mixed_blocks": blocks,
+            "clipped_blocks": self._clipped_blocks,
+            "avg_mix_us": round(self._mix_time / blocks * 1e6, 2) if blocks else 0.0,
+            "max_mix_us": round(self._max_mix_time * 1e6, 2),
+        }
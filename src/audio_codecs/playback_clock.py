@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class PlaybackClock:
+    """下行播放位置跟踪（按解码采样率计数的采样位置）.
+
+    - written：已写入播放链路（抖动缓冲）的采样总数，解码线程/播放回调累加
+    - played：已交给声卡的采样总数，播放回调在每次写入 outdata 后累加，
+      同时记录声卡输出延迟（outdata 从写入到真正发声的时间）
+    - ``wait_played(N)`` 等待第 N 个采样真正发声：播放位置越过 N 时，
+      按该采样在本块中的偏移 + 设备延迟计算发声时刻，到点后唤醒等待者，
+      无需轮询
+
+    播放链路空闲（缓冲全部放完）时 played 直接对齐 written，链路中被丢弃的帧
+    （缓冲溢出、重采样器尾部）不会让等待者卡住；``flush()`` 用于打断播放，
+    立即唤醒所有等待者（结果为 False）。
+    """
+
+    def __init__(self, sample_rate: int):
+        self._sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._written = 0.0
+        self._played = 0.0
+        self._latency = 0.0
+        # (目标采样位置, 事件循环, future)，按目标位置升序
+        self._waiters: List[Tuple[float, asyncio.AbstractEventLoop, Any]] = []
+
+        # 统计
+        self._completed = 0
+        self._interrupted = 0
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    @property
+    def written(self) -> int:
+        return int(self._written)
+
+    @property
+    def played(self) -> int:
+        return int(self._played)
+
+    @property
+    def latency(self) -> float:
+        """
+        最近一次播放回调观测到的设备输出延迟（秒）.
+        """
+        return self._latency
+
+    def pending_samples(self) -> int:
+        """
+        已写入但尚未交给声卡的采样数.
+        """
+        return max(0, int(self._written - self._played))
+
+    def add_written(self, samples: int):
+        """
+        记录写入播放链路的采样（解码线程或播放回调调用）.
+        """
+        with self._lock:
+            self._written += samples
+
+    def on_played(self, samples: float, latency: float):
+        """
+        播放回调写入 outdata 后调用：samples 为本块中真实音频的采样数（解码采样率）.
+        """
+        with self._lock:
+            start = self._played
+            self._played += samples
+            self._latency = latency
+            if not self._waiters or self._waiters[0][0] > self._played:
+                return
+            reached = self._pop_reached(self._played)
+
+        now = time.monotonic()
+        for target, loop, future in reached:
+            # 目标采样在本块中的偏移 + 本块到达扬声器的延迟
+            offset = max(0.0, target - start) / self._sample_rate
+            self._resolve(loop, future, True, now + latency + offset)
+
+    def on_idle(self, latency: float):
+        """
+        播放链路已空（没有待播放的数据）：已写入的采样都已交给声卡.
+        """
+        with self._lock:
+            self._latency = latency
+            if self._played >= self._written:
+                return
+            self._played = self._written
+            reached = self._pop_reached(self._played)
+
+        deadline = time.monotonic() + latency
+        for _, loop, future in reached:
+            self._resolve(loop, future, True, deadline)
+
+    def flush(self) -> int:
+        """
+        丢弃待播放的数据（打断播放）：对齐播放位置并以 False 唤醒所有等待者.
+        """
+        with self._lock:
+            discarded = int(self._written - self._played)
+            self._played = max(self._played, self._written)
+            waiters, self._waiters = self._waiters, []
+
+        for _, loop, future in waiters:
+            self._resolve(loop, future, False, 0.0)
+        return max(0, discarded)
+
+    def add_waiter(
+        self,
+        target: Optional[float],
+        loop: asyncio.AbstractEventLoop,
+        future: asyncio.Future,
+    ):
+        """注册等待者（任意线程）：第 target 个采样发声后 future 结果为 True.
+
+        target 为 None 时取当前已写入位置（等待已写入的数据全部放完）。
+        """
+        with self._lock:
+            if target is None:
+                target = self._written
+            if self._played < target:
+                self._waiters.append((target, loop, future))
+                self._waiters.sort(key=lambda w: w[0])
+                return
+
+        # 已交给声卡，剩余的只是设备延迟
+        self._resolve(loop, future, True, time.monotonic() + self._latency)
+
+    async def wait_played(
+        self, target: Optional[float] = None, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        等待第 target 个采样发声，返回 True；被打断或超时返回 False.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.add_waiter(target, loop, future)
+        return await self.wait_future(future, timeout)
+
+    @staticmethod
+    async def wait_future(future: asyncio.Future, timeout: Optional[float]) -> bool:
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    def _pop_reached(self, position: float):
+        # 调用方持有锁
+        index = 0
+        while index < len(self._waiters) and self._waiters[index][0] <= position:
+            index += 1
+        reached = self._waiters[:index]
+        del self._waiters[:index]
+        return reached
+
+    def _resolve(self, loop, future, result: bool, deadline: float):
+        if result:
+            self._completed += 1
+        else:
+            self._interrupted += 1
+
+        def _set():
+            delay = deadline - time.monotonic()
+            if delay > 0 and result:
+                loop.call_later(delay, _finish)
+            else:
+                _finish()
+
+        def _finish():
+            if not future.done():
+                future.set_result(result)
+
+        try:
+            loop.call_soon_threadsafe(_set)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取播放位置统计信息.
+        """
+        return {
+            "written": self.written,
+            "played": self.played,
+            "pending_ms": round(self.pending_samples() * 1000 / self._sample_rate, 1),
+            "device_latency_ms": round(self._latency * 1000, 1),
+            "waiters": len(self._waiters),
+            "completed": self._completed,
+            "interrupted": self._interrupted,
+        }
@@ -0,0 +1,82 @@
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class EncodedPreRoll:
+    """已编码录音帧（Opus）的滚动预录缓冲.
+
+    音频通道打开之前（唤醒词触发到开始监听之间）编码出的帧不能发送，
+    先按到达顺序存在这里，只保留最近 duration_ms 的数据；通道打开后
+    取出唤醒时刻之后的帧补发，避免丢掉唤醒词后紧接着说的话。
+    只在事件循环线程中使用，不加锁。
+    """
+
+    def __init__(self, duration_ms: int = 2000, frame_duration_ms: int = 20):
+        self.duration_ms = max(0, int(duration_ms))
+        self._frame_duration_ms = frame_duration_ms
+        self._frames = deque(maxlen=self._capacity(frame_duration_ms))
+
+        # 统计
+        self._pushed = 0
+        self._flushed = 0
+        self._expired = 0
+
+    def _capacity(self, frame_duration_ms: int) -> int:
+        return max(1, -(-self.duration_ms // max(1, frame_duration_ms)))
+
+    @property
+    def frame_duration_ms(self) -> int:
+        return self._frame_duration_ms
+
+    def set_frame_duration(self, frame_duration_ms: int):
+        """
+        录音帧长度变化时调整容量，保留最近的帧.
+        """
+        if frame_duration_ms == self._frame_duration_ms:
+            return
+        self._frame_duration_ms = frame_duration_ms
+        self._frames = deque(self._frames, maxlen=self._capacity(frame_duration_ms))
+
+    def push(self, data: bytes, timestamp: Optional[float] = None):
+        """
+        写入一帧，超出时长的最旧帧被丢弃.
+        """
+        if len(self._frames) == self._frames.maxlen:
+            self._expired += 1
+        self._frames.append(
+            (time.monotonic() if timestamp is None else timestamp, data)
+        )
+        self._pushed += 1
+
+    def drain(self, since: Optional[float] = None) -> List[bytes]:
+        """
+        取出并清空缓冲，只返回 since（monotonic 秒）之后到达的帧，按时间顺序.
+        """
+        frames = [
+            data
+            for timestamp, data in self._frames
+            if since is None or timestamp >= since
+        ]
+        self._frames.clear()
+        self._flushed += len(frames)
+        return frames
+
+    def clear(self) -> int:
+        count = len(self._frames)
+        self._frames.clear()
+        return count
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "duration_ms": self.duration_ms,
+            "frame_duration_ms": self._frame_duration_ms,
+            "buffered_frames": len(self._frames),
+            "buffered_ms": len(self._frames) * self._frame_duration_ms,
+            "pushed": self._pushed,
+            "flushed": self._flushed,
+            "expired": self._expired,
+        }
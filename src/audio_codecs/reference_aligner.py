@@ -0,0 +1,349 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class DelayEstimator:
+    """参考信号与录音之间的延迟估计（GCC-PHAT 互相关）.
+
+    每个10ms块把配对的参考/录音（AEC之前）写入历史，每隔 interval_ms 对最近
+    window_ms 的数据做一次频域互相关，峰值位置即录音中回声相对参考的滞后。
+    也搜索负滞后（回声早于参考，参考缓冲过深），供调用方降低参考缓冲水位。
+    参考能量过低（静音）或峰值不明显时不更新估计；新估计需连续两次一致才会
+    跳变，避免单次误判导致 APM 延迟来回抖动。
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_ms: int = 500,
+        max_delay_ms: int = 250,
+        max_lead_ms: int = 100,
+        interval_ms: int = 1000,
+        min_confidence: float = 0.1,
+    ):
+        self.sample_rate = sample_rate
+        self.max_lag = sample_rate * max_delay_ms // 1000
+        self.max_lead = sample_rate * max_lead_ms // 1000
+        self._window = sample_rate * window_ms // 1000
+        self._interval = sample_rate * interval_ms // 1000
+        self.min_confidence = min_confidence
+
+        # 参考历史前后多保留 max_lag/max_lead，使录音窗口中的回声都能找到对应参考
+        self._length = self._window + self.max_lag + self.max_lead
+        self._reference = np.zeros(self._length, dtype=np.float32)
+        self._capture = np.zeros(self._length, dtype=np.float32)
+        self._pos = 0
+        self._filled = 0
+        self._since_estimate = 0
+
+        nfft = 1
+        while nfft < self._length + self._window:
+            nfft *= 2
+        self._nfft = nfft
+
+        self.delay_samples: Optional[int] = None
+        self.confidence = 0.0
+        self._candidate: Optional[int] = None
+
+        # 统计
+        self._estimates = 0
+        self._rejected = 0
+        self._estimate_time = 0.0
+
+    @property
+    def delay_ms(self) -> Optional[float]:
+        if self.delay_samples is None:
+            return None
+        return self.delay_samples * 1000 / self.sample_rate
+
+    def add(self, reference: np.ndarray, capture: np.ndarray) -> bool:
+        """
+        写入一块配对的参考/录音，到达估计间隔时更新估计，返回估计值是否改变.
+        """
+        count = len(capture)
+        end = self._pos + count
+        if end <= self._length:
+            self._reference[self._pos : end] = reference
+            self._capture[self._pos : end] = capture
+        else:
+            first = self._length - self._pos
+            self._reference[self._pos :] = reference[:first]
+            self._capture[self._pos :] = capture[:first]
+            self._reference[: count - first] = reference[first:]
+            self._capture[: count - first] = capture[first:]
+        self._pos = end % self._length
+        self._filled = min(self._length, self._filled + count)
+        self._since_estimate += count
+
+        if self._filled < self._length or self._since_estimate < self._interval:
+            return False
+        self._since_estimate = 0
+        return self._estimate()
+
+    def _estimate(self) -> bool:
+        start = time.perf_counter()
+        try:
+            # 按时间顺序展开环形历史
+            reference = np.roll(self._reference, -self._pos)
+            capture = np.roll(self._capture, -self._pos)
+            capture = capture[self.max_lag : self.max_lag + self._window]
+
+            if float(np.dot(capture, capture)) < 1e-3 * len(capture) or float(
+                np.dot(reference, reference)
+            ) < 1e-3 * len(reference):
+                self._rejected += 1
+                return False
+
+            # 录音窗口的第 i 个采样与参考历史的第 max_lag + i 个采样同时刻，
+            # 回声滞后 d（-max_lead..max_lag）时与参考历史的第 max_lag + i - d 个采样相关
+            spectrum = np.fft.rfft(capture, self._nfft) * np.conj(
+                np.fft.rfft(reference, self._nfft)
+            )
+            # PHAT 加权：只保留相位，峰值更尖锐，不受语音频谱形状影响
+            spectrum /= np.abs(spectrum) + 1e-9
+            correlation = np.fft.irfft(spectrum, self._nfft)
+            # 相关峰位于 correlation[-j]（j = max_lag - d，0..max_lag + max_lead）
+            span = self.max_lag + self.max_lead
+            lags = np.concatenate(
+                (correlation[:1], correlation[self._nfft - span :][::-1])
+            )
+            index = int(np.argmax(lags))
+            self.confidence = float(lags[index])
+            delay = self.max_lag - index
+
+            if self.confidence < self.min_confidence:
+                self._rejected += 1
+                return False
+
+            self._estimates += 1
+            if self.delay_samples is None or abs(delay - self.delay_samples) <= 16:
+                changed = delay != self.delay_samples
+                self.delay_samples = delay
+                self._candidate = None
+                return changed
+            # 跳变较大：连续两次一致才采用
+            if self._candidate is not None and abs(delay - self._candidate) <= 16:
+                self.delay_samples = delay
+                self._candidate = None
+                return True
+            self._candidate = delay
+            return False
+        finally:
+            self._estimate_time += time.perf_counter() - start
+
+    def reset(self):
+        self._reference.fill(0)
+        self._capture.fill(0)
+        self._pos = 0
+        self._filled = 0
+        self._since_estimate = 0
+        self.delay_samples = None
+        self.confidence = 0.0
+        self._candidate = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        estimates = self._estimates + self._rejected
+        return {
+            "delay_ms": (
+                round(self.delay_ms, 1) if self.delay_samples is not None else None
+            ),
+            "confidence": round(self.confidence, 3),
+            "estimates": self._estimates,
+            "rejected": self._rejected,
+            "avg_estimate_ms": (
+                round(self._estimate_time / estimates * 1000, 3) if estimates else 0.0
+            ),
+        }
+
+
+class ReferenceAligner:
+    """AEC参考信号对齐：有界缓冲 + 时钟漂移补偿.
+
+    参考信号来自独立的声卡（如 BlackHole），与麦克风的时钟存在微小差异，
+    长时间运行后缓冲会逐渐堆积或耗尽。参考流回调写入（任意线程），录音线程
+    每个10ms块读取一帧：读取时用分数倍率的线性插值重采样，倍率由缓冲水位的
+    PI 控制器调节，使水位稳定在目标值，积分项即为估计的时钟漂移（ppm）。
+    水位偏离过大（启动、设备卡顿）时直接丢弃/补零重新同步。
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        capacity_ms: int = 2000,
+        target_ms: int = 40,
+        max_drift_ppm: float = 1000.0,
+    ):
+        self.sample_rate = sample_rate
+        self._buffer = AudioRingBuffer(max(1, sample_rate * capacity_ms // 1000))
+        self._target = sample_rate * target_ms // 1000
+        self._max_ratio = max_drift_ppm * 1e-6
+        # 水位误差（相对目标）到倍率的比例/积分增益（每次读取）
+        self._kp = 5e-3
+        self._ki = 4e-6
+        self._resync_threshold = max(self._target, sample_rate // 20)
+
+        self._lock = threading.Lock()
+        self._primed = False
+        self._drift = 0.0
+        self._ratio = 1.0
+        self._fill = float(self._target)
+        # 插值工作区：上次剩余的采样 + 本次读取的采样
+        self._work = np.zeros(0, dtype=np.float32)
+        self._scratch = np.zeros(0, dtype=np.int16)
+        self._carry = np.zeros(2, dtype=np.float32)
+        self._carry_len = 0
+        self._phase = 0.0
+        self._positions = np.zeros(0, dtype=np.float64)
+
+        # 统计
+        self._written = 0
+        self._read = 0
+        self._underruns = 0
+        self._resyncs = 0
+
+    @property
+    def drift_ppm(self) -> float:
+        return self._drift * 1e6
+
+    @property
+    def target_ms(self) -> float:
+        return self._target * 1000 / self.sample_rate
+
+    def write(self, samples: np.ndarray):
+        """
+        写入参考采样（参考流回调中调用），超出容量时丢弃最旧数据.
+        """
+        self._buffer.write(samples)
+        self._written += len(samples)
+
+    def set_target_ms(self, target_ms: float):
+        """
+        调整目标水位（参考相对回声过晚时降低，使参考更早送入APM）.
+        """
+        with self._lock:
+            target = int(max(0.0, target_ms) * self.sample_rate / 1000)
+            skip = self._target - target
+            self._target = target
+            if skip > 0:
+                self._buffer.skip(skip)
+            self._fill = float(len(self._buffer))
+
+    def read(self, count: int, out: np.ndarray) -> np.ndarray:
+        """
+        读取 count 个对齐后的参考采样到 out（录音线程调用），数据不足时补零.
+        """
+        with self._lock:
+            return self._read_locked(count, out)
+
+    def _read_locked(self, count: int, out: np.ndarray) -> np.ndarray:
+        available = len(self._buffer)
+        if not self._primed:
+            # 启动时先积累到目标水位，避免一开始就欠载
+            if available < self._target + count:
+                out[:count] = 0
+                return out
+            self._buffer.skip(available - self._target - count)
+            self._primed = True
+            available = len(self._buffer)
+
+        # 水位按本次读取之后计算
+        if abs(available - count - self._target) > self._resync_threshold:
+            self._resync(available, count)
+            available = len(self._buffer)
+
+        # PI 控制：积分项跟踪时钟漂移，比例项修正当前水位偏差
+        self._fill += 0.05 * (available - count - self._fill)
+        relative = (self._fill - self._target) / max(1, self._target)
+        self._drift = float(
+            np.clip(
+                self._drift + self._ki * relative, -self._max_ratio, self._max_ratio
+            )
+        )
+        self._ratio = 1.0 + float(
+            np.clip(
+                self._drift + self._kp * relative, -self._max_ratio, self._max_ratio
+            )
+        )
+        self._interpolate(count, out)
+        return out
+
+    def _resync(self, available: int, count: int):
+        self._resyncs += 1
+        excess = available - self._target - count
+        if excess > 0:
+            self._buffer.skip(excess)
+        else:
+            # 参考不足：停止读取直到重新积累到目标水位
+            self._primed = False
+        self._fill = float(self._target)
+        self._carry_len = 0
+        self._phase = 0.0
+        logger.debug(f"参考信号重新同步: 水位 {available}, 目标 {self._target}")
+
+    def _interpolate(self, count: int, out: np.ndarray):
+        ratio = self._ratio
+        phase = self._phase
+        # 需要的输入采样数：最后一个输出位置的下一个采样
+        needed = int(phase + (count - 1) * ratio) + 2
+        if len(self._work) < needed:
+            self._work = np.zeros(needed * 2, dtype=np.float32)
+            self._scratch = np.zeros(needed * 2, dtype=np.int16)
+        if len(self._positions) < count:
+            self._positions = np.arange(count * 2, dtype=np.float64)
+
+        work = self._work[:needed]
+        carry = self._carry_len
+        work[:carry] = self._carry[:carry]
+        fresh = self._buffer.read_available(needed - carry, out=self._scratch)
+        work[carry : carry + len(fresh)] = fresh
+        got = carry + len(fresh)
+        if got < needed:
+            self._underruns += 1
+            work[got:] = 0
+
+        positions = phase + self._positions[:count] * ratio
+        index = positions.astype(np.int64)
+        frac = (positions - index).astype(np.float32)
+        value = work[index] * (1.0 - frac) + work[index + 1] * frac
+        np.copyto(out[:count], value, casting="unsafe")
+
+        consumed = phase + count * ratio
+        used = int(consumed)
+        self._phase = consumed - used
+        # 未用完的采样（最多2个）留到下次
+        keep = max(0, got - used)
+        keep = min(keep, len(self._carry))
+        self._carry[:keep] = work[used : used + keep]
+        self._carry_len = keep
+        self._read += count
+
+    def reset(self):
+        with self._lock:
+            self._buffer.clear()
+            self._primed = False
+            self._drift = 0.0
+            self._ratio = 1.0
+            self._fill = float(self._target)
+            self._carry_len = 0
+            self._phase = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "fill_ms": round(len(self._buffer) * 1000 / self.sample_rate, 1),
+            "target_ms": round(self.target_ms, 1),
+            "drift_ppm": round(self.drift_ppm, 1),
+            "ratio": round(self._ratio, 6),
+            "written": self._written,
+            "read": self._read,
+            "underruns": self._underruns,
+            "resyncs": self._resyncs,
+            "dropped": self._buffer.dropped_samples,
+        }
@@ -0,0 +1,104 @@
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import soxr
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 重采样档位 -> soxr 质量参数
+# 档位越高，滤波器越长：音质更好，但算法延迟和CPU开销也越大
+RESAMPLER_PROFILES = {
+    "low_latency": "QQ",  # 快速三次插值，几乎无延迟
+    "balanced": "MQ",
+    "high_quality": "HQ",
+}
+DEFAULT_RESAMPLER_PROFILE = "low_latency"
+
+# (输入采样率, 输出采样率, 档位) -> 实测延迟(毫秒)
+_delay_cache: Dict[Tuple[int, int, str], float] = {}
+
+
+def resolve_profile(profile: Optional[str]) -> str:
+    """
+    规范化档位名称，未知档位回退到默认档位.
+    """
+    if profile in RESAMPLER_PROFILES:
+        return profile
+    if profile:
+        logger.warning(
+            f"未知的重采样档位: {profile}，使用 {DEFAULT_RESAMPLER_PROFILE}，"
+            f"可选: {', '.join(RESAMPLER_PROFILES)}"
+        )
+    return DEFAULT_RESAMPLER_PROFILE
+
+
+def create_resampler(
+    in_rate: int, out_rate: int, channels: int, profile: Optional[str] = None
+) -> soxr.ResampleStream:
+    """
+    按档位创建流式重采样器.
+    """
+    return soxr.ResampleStream(
+        in_rate,
+        out_rate,
+        channels,
+        dtype="int16",
+        quality=RESAMPLER_PROFILES[resolve_profile(profile)],
+    )
+
+
+def measure_group_delay(
+    in_rate: int, out_rate: int, profile: Optional[str] = None, chunk_ms: int = 20
+) -> float:
+    """实测流式重采样的延迟（毫秒）.
+
+    soxr 会把滤波器的群延迟从输出开头裁掉，表现为输出比输入"少"一段：
+    按回调大小持续送入1秒数据，延迟 = (应产出采样数 - 实际产出采样数) / 输出采样率。
+    结果按 (采样率, 档位) 缓存。
+    """
+    profile = resolve_profile(profile)
+    key = (in_rate, out_rate, profile)
+    if key in _delay_cache:
+        return _delay_cache[key]
+
+    resampler = create_resampler(in_rate, out_rate, 1, profile)
+    chunk = max(1, in_rate * chunk_ms // 1000)
+    silence = np.zeros(chunk, dtype=np.int16)
+
+    fed = 0
+    produced = 0
+    while fed < in_rate:
+        produced += len(resampler.resample_chunk(silence, last=False))
+        fed += chunk
+
+    expected = fed * out_rate / in_rate
+    delay_ms = max(0.0, (expected - produced) * 1000.0 / out_rate)
+    _delay_cache[key] = delay_ms
+    return delay_ms
+
+
+def describe_resampler(
+    in_rate: int, out_rate: int, profile: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    重采样配置描述（用于延迟预算统计），采样率相同时为直通.
+    """
+    if in_rate == out_rate:
+        return {
+            "profile": None,
+            "in_rate": in_rate,
+            "out_rate": out_rate,
+            "bypassed": True,
+            "group_delay_ms": 0.0,
+        }
+
+    profile = resolve_profile(profile)
+    return {
+        "profile": profile,
+        "in_rate": in_rate,
+        "out_rate": out_rate,
+        "bypassed": False,
+        "group_delay_ms": round(measure_group_delay(in_rate, out_rate, profile), 2),
+    }
@@ -0,0 +1,135 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """预分配的 NumPy 环形缓冲区，用于音频回调中的采样数据暂存.
+
+    - 写入/读取均为向量化的切片拷贝，不做逐采样的 Python 操作
+    - 写满时覆盖最旧的数据（与原 deque + popleft 的丢弃策略一致）
+    - 内部带一把轻量锁，可在生产者/消费者位于不同线程时使用
+      （如 AEC 参考信号：参考流回调写入，录音回调读取）
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError(f"环形缓冲区容量必须大于0: {capacity}")
+
+        self._capacity = int(capacity)
+        self._buffer = np.zeros(self._capacity, dtype=dtype)
+        self._read_pos = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+        # 统计：因写满而被覆盖丢弃的采样数
+        self._dropped_samples = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    @property
+    def dropped_samples(self) -> int:
+        return self._dropped_samples
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def write(self, data: np.ndarray) -> int:
+        """
+        写入一段采样，返回实际写入的采样数.
+        """
+        data = np.asarray(data).reshape(-1)
+        count = len(data)
+        if count == 0:
+            return 0
+
+        with self._lock:
+            # 单次写入超过容量时只保留最新的部分
+            if count >= self._capacity:
+                self._dropped_samples += self._size + count - self._capacity
+                self._buffer[:] = data[-self._capacity :]
+                self._read_pos = 0
+                self._size = self._capacity
+                return self._capacity
+
+            # 空间不足时先丢弃最旧的数据
+            overflow = self._size + count - self._capacity
+            if overflow > 0:
+                self._read_pos = (self._read_pos + overflow) % self._capacity
+                self._size -= overflow
+                self._dropped_samples += overflow
+
+            write_pos = (self._read_pos + self._size) % self._capacity
+            first = min(count, self._capacity - write_pos)
+            self._buffer[write_pos : write_pos + first] = data[:first]
+            if first < count:
+                self._buffer[: count - first] = data[first:]
+            self._size += count
+            return count
+
+    def read(
+        self, count: int, out: Optional[np.ndarray] = None
+    ) -> Optional[np.ndarray]:
+        """读取固定数量的采样.
+
+        数据不足时返回 None 且不消耗缓冲区；提供 out 时直接写入 out（避免分配）。
+        """
+        with self._lock:
+            if count <= 0 or self._size < count:
+                return None
+
+            if out is None:
+                out = np.empty(count, dtype=self._buffer.dtype)
+            else:
+                out = out.reshape(-1)[:count]
+
+            first = min(count, self._capacity - self._read_pos)
+            out[:first] = self._buffer[self._read_pos : self._read_pos + first]
+            if first < count:
+                out[first:count] = self._buffer[: count - first]
+
+            self._read_pos = (self._read_pos + count) % self._capacity
+            self._size -= count
+            return out
+
+    def read_available(
+        self, max_count: int, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        读取至多 max_count 个采样（不足时有多少读多少）.
+        """
+        with self._lock:
+            count = min(max_count, self._size)
+        if count <= 0:
+            return np.empty(0, dtype=self._buffer.dtype) if out is None else out[:0]
+        return self.read(count, out)
+
+    def skip(self, count: int) -> int:
+        """
+        丢弃最旧的 count 个采样，返回实际丢弃数.
+        """
+        with self._lock:
+            count = max(0, min(count, self._size))
+            self._read_pos = (self._read_pos + count) % self._capacity
+            self._size -= count
+            return count
+
+    def clear(self) -> int:
+        """
+        清空缓冲区，返回被清掉的采样数.
+        """
+        with self._lock:
+            cleared = self._size
+            self._read_pos = 0
+            self._size = 0
+            return cleared
@@ -0,0 +1,122 @@
+from collections import deque
+from typing import Any, Dict, List
+
+
+class UplinkGate:
+    """上行静音抑制（DTX）：按录音帧的语音判定决定哪些已编码帧需要发送.
+
+    - 语音帧：发送；从静音恢复时先补发最近 pre_roll_ms 的被抑制帧，
+      保留语音起始部分（VAD 判定有延迟）
+    - 语音结束后的 hangover_ms 内：继续发送，避免切掉句尾和词间停顿
+    - 之后的静音帧：不发送，存入短预录缓冲；若距上次发送超过
+      keepalive_ms，发送一帧作为保活（0 表示不发保活帧）
+
+    只在事件循环线程中使用，不加锁。
+    """
+
+    def __init__(
+        self,
+        hangover_ms: int = 1000,
+        pre_roll_ms: int = 200,
+        keepalive_ms: int = 1000,
+        frame_duration_ms: int = 20,
+    ):
+        self.hangover_ms = max(0, int(hangover_ms))
+        self.pre_roll_ms = max(0, int(pre_roll_ms))
+        self.keepalive_ms = max(0, int(keepalive_ms))
+        self._frame_duration_ms = 0
+        self._pre_roll = deque(maxlen=1)
+        self.set_frame_duration(frame_duration_ms)
+
+        self._active = True
+        self._hangover_left = self._hangover_frames
+        self._since_sent = 0
+
+        # 统计
+        self._sent = 0
+        self._suppressed = 0
+        self._keepalive = 0
+        self._talkspurts = 0
+        self._pre_roll_sent = 0
+
+    @staticmethod
+    def _frames(duration_ms: int, frame_duration_ms: int) -> int:
+        return -(-duration_ms // max(1, frame_duration_ms))
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def set_frame_duration(self, frame_duration_ms: int):
+        """
+        录音帧长度变化时重新换算帧数.
+        """
+        if frame_duration_ms == self._frame_duration_ms:
+            return
+        self._frame_duration_ms = frame_duration_ms
+        self._hangover_frames = self._frames(self.hangover_ms, frame_duration_ms)
+        self._keepalive_frames = self._frames(self.keepalive_ms, frame_duration_ms)
+        self._pre_roll = deque(
+            self._pre_roll,
+            maxlen=max(1, self._frames(self.pre_roll_ms, frame_duration_ms)),
+        )
+
+    def process(self, data: bytes, voice: bool) -> List[bytes]:
+        """
+        输入一帧及其语音判定，按顺序返回需要发送的帧（可能为空）.
+        """
+        if voice:
+            self._hangover_left = self._hangover_frames
+            if self._active:
+                return self._emit([data])
+            # 静音 -> 语音：先补发预录帧
+            self._active = True
+            self._talkspurts += 1
+            frames = list(self._pre_roll) if self.pre_roll_ms else []
+            self._pre_roll.clear()
+            self._pre_roll_sent += len(frames)
+            frames.append(data)
+            return self._emit(frames)
+
+        if self._active and self._hangover_left > 0:
+            self._hangover_left -= 1
+            return self._emit([data])
+
+        self._active = False
+        self._since_sent += 1
+        if self._keepalive_frames and self._since_sent >= self._keepalive_frames:
+            self._keepalive += 1
+            return self._emit([data])
+
+        self._suppressed += 1
+        self._pre_roll.append(data)
+        return []
+
+    def _emit(self, frames: List[bytes]) -> List[bytes]:
+        self._sent += len(frames)
+        self._since_sent = 0
+        return frames
+
+    def reset(self):
+        """
+        新一轮发送开始（通道重新打开）：从发送状态开始，丢弃预录帧.
+        """
+        self._active = True
+        self._hangover_left = self._hangover_frames
+        self._since_sent = 0
+        self._pre_roll.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self._sent + self._suppressed
+        return {
+            "active": self._active,
+            "hangover_ms": self.hangover_ms,
+            "pre_roll_ms": self.pre_roll_ms,
+            "keepalive_ms": self.keepalive_ms,
+            "sent": self._sent,
+            "suppressed": self._suppressed,
+            "keepalive": self._keepalive,
+            "talkspurts": self._talkspurts,
+            "pre_roll_sent": self._pre_roll_sent,
+            "suppressed_ratio": self._suppressed / total if total else 0.0,
+        }
@@ -0,0 +1,143 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from src.audio_codecs.frame_channel import FrameChannel
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_BLOCK = "block"
+
+# 队列中的一项：(编码完成时间, Opus数据包, 该帧的语音判定)
+UplinkItem = Tuple[float, bytes, bool]
+
+
+class UplinkSender:
+    """上行麦克风音频的单一发送协程.
+
+    - 录音线程只需 ``submit()`` 把已编码帧放入有界队列，不创建 asyncio 任务
+    - 事件循环中一个长期运行的 ``run()`` 协程按提交顺序逐帧交给 handler
+      处理（状态判断、预录补发、静音抑制、发送），帧之间的顺序始终保持
+    - 队列写满时的背压策略：
+      - drop_oldest：丢弃最旧的帧，录音线程不等待（默认）
+      - block：录音线程最多等待 block_timeout_ms，仍满则丢弃最旧的帧；
+        等待发生在录音回调中，时间过长会导致录音溢出
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[UplinkItem], Awaitable[None]],
+        capacity: int = 100,
+        policy: str = POLICY_DROP_OLDEST,
+        block_timeout_ms: int = 20,
+        name: str = "uplink",
+    ):
+        self._handler = handler
+        self._name = name
+        self._queue = FrameChannel(capacity, name=name)
+
+        policy = str(policy).lower()
+        if policy not in (POLICY_DROP_OLDEST, POLICY_BLOCK):
+            logger.warning(f"未知的上行队列策略: {policy}，使用 {POLICY_DROP_OLDEST}")
+            policy = POLICY_DROP_OLDEST
+        self.policy = policy
+        self._block_timeout = max(0, int(block_timeout_ms)) / 1000
+
+        self._running = False
+
+        # 统计
+        self._depth_total = 0
+        self._max_depth = 0
+        self._handled = 0
+        self._latency_total = 0.0
+        self._max_latency = 0.0
+
+    def is_running(self) -> bool:
+        return self._running
+
+    # -----------------------
+    # 生产者（录音线程）
+    # -----------------------
+    def submit(self, encoded_data: bytes, voice: bool = True):
+        """
+        提交一帧已编码的录音.
+        """
+        depth = self._queue.qsize()
+        self._depth_total += depth
+        if depth > self._max_depth:
+            self._max_depth = depth
+
+        item = (time.monotonic(), encoded_data, voice)
+        if self.policy == POLICY_BLOCK:
+            self._queue.put_blocking(item, self._block_timeout)
+        else:
+            self._queue.put_nowait(item)
+
+    def pending(self) -> int:
+        """
+        队列中尚未处理的帧数.
+        """
+        return self._queue.qsize()
+
+    def clear(self) -> int:
+        """
+        丢弃尚未处理的帧，返回丢弃数.
+        """
+        return self._queue.clear()
+
+    # -----------------------
+    # 发送协程
+    # -----------------------
+    async def run(self):
+        """
+        逐帧处理队列直到 stop()，由调用方作为任务运行.
+        """
+        self._running = True
+        logger.debug(f"{self._name} 发送协程已启动")
+        try:
+            while self._running:
+                item = await self._queue.get()
+                if not self._running:
+                    break
+                try:
+                    await self._handler(item)
+                except Exception as e:
+                    logger.warning(f"上行音频处理失败: {e}")
+
+                latency = time.monotonic() - item[0]
+                self._handled += 1
+                self._latency_total += latency
+                if latency > self._max_latency:
+                    self._max_latency = latency
+        finally:
+            self._running = False
+            logger.debug(f"{self._name} 发送协程已停止")
+
+    def stop(self):
+        """
+        停止发送协程并丢弃未处理的帧.
+        """
+        self._running = False
+        self._queue.wake()
+        self._queue.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取发送队列统计信息（latency 为提交到处理完成的时间）.
+        """
+        queue_stats = self._queue.get_stats()
+        submitted = queue_stats["put"]
+        handled = self._handled
+        return {
+            "running": self._running,
+            "policy": self.policy,
+            "queue": queue_stats,
+            "avg_depth": round(self._depth_total / submitted, 2) if submitted else 0.0,
+            "max_depth": self._max_depth,
+            "handled": handled,
+            "avg_latency_ms": (
+                round(self._latency_total / handled * 1000, 3) if handled else 0.0
+            ),
+            "max_latency_ms": round(self._max_latency * 1000, 3),
+        }
@@ -0,0 +1,535 @@
+import threading
+import time
+import wave
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.audio_codecs.audio_backend import AudioBackend
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 每个流最多保留的回调耗时样本数
+MAX_TIMING_SAMPLES = 100000
+
+
+def load_wav(path: Union[str, Path]) -> Tuple[np.ndarray, int]:
+    """
+    读取16位 PCM WAV 文件，返回 (int16 数组[采样, 通道], 采样率).
+    """
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位PCM WAV: {path}")
+        channels = wav.getnchannels()
+        sample_rate = wav.getframerate()
+        data = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    return data.reshape(-1, channels), sample_rate
+
+
+class _CallbackStatus:
+    """
+    回调状态标志（虚拟设备不会出现 underflow/overflow，恒为假）.
+    """
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return ""
+
+
+class _EchoPath:
+    """虚拟声学回声路径：播放输出经延迟、衰减后叠加到录音输入（测试AEC）.
+
+    按设备时间对齐：输出块按 DAC 时间记录，输入块按 ADC 时间取对应时刻的输出，
+    输出/输入采样率不同时线性插值。
+    """
+
+    def __init__(self, gain: float, delay: float, history: float = 2.0):
+        self.gain = float(gain)
+        self.delay = float(delay)
+        self._history_seconds = history
+        self._data = np.zeros(0, dtype=np.float32)
+        self._rate = None
+        # _data[0] 对应的 DAC 时间
+        self._start_time = 0.0
+
+    def write(self, block: np.ndarray, dac_time: float, rate: float):
+        mono = block.astype(np.float32).mean(axis=1)
+        if self._rate != rate or not len(self._data):
+            self._rate = rate
+            self._start_time = dac_time
+            self._data = mono
+            return
+        # 保留最近 history 秒
+        keep = int(self._history_seconds * rate)
+        data = np.concatenate([self._data, mono])
+        if len(data) > 2 * keep:
+            self._start_time += (len(data) - keep) / rate
+            data = data[-keep:]
+        self._data = data
+
+    def render(self, adc_time: float, count: int, rate: float) -> np.ndarray:
+        if self._rate is None or not len(self._data):
+            return np.zeros(count, dtype=np.float32)
+        times = adc_time + np.arange(count) / rate - self.delay
+        positions = (times - self._start_time) * self._rate
+        echo = np.interp(
+            positions, np.arange(len(self._data)), self._data, left=0.0, right=0.0
+        )
+        return (echo * self.gain).astype(np.float32)
+
+
+class VirtualStream:
+    """
+    虚拟音频流：由 VirtualAudioBackend 的驱动线程按块调用回调.
+    """
+
+    def __init__(
+        self,
+        backend: "VirtualAudioBackend",
+        kind: str,
+        samplerate: float,
+        channels: int,
+        dtype: Any,
+        blocksize: Optional[int],
+        callback: Callable,
+        finished_callback: Optional[Callable] = None,
+        device: Optional[int] = None,
+        latency: Any = None,
+    ):
+        self._backend = backend
+        self.kind = kind
+        self.samplerate = float(samplerate)
+        self.channels = int(channels)
+        self.dtype = np.dtype(dtype)
+        # 未指定块大小时按10ms
+        self.blocksize = int(blocksize) if blocksize else int(self.samplerate // 100)
+        self.device = device
+        self.latency = backend.latency
+        self._callback = callback
+        self._finished_callback = finished_callback
+        self._buffer = np.zeros((self.blocksize, self.channels), dtype=self.dtype)
+
+        self.active = False
+        self.closed = False
+        # 下一块的虚拟时间（秒）
+        self.next_time = 0.0
+        self.blocks = 0
+        self.callback_times = deque(maxlen=MAX_TIMING_SAMPLES)
+
+    @property
+    def block_duration(self) -> float:
+        return self.blocksize / self.samplerate
+
+    def start(self):
+        if self.closed:
+            raise RuntimeError("虚拟音频流已关闭")
+        if self.active:
+            return
+        self.active = True
+        self.next_time = self._backend.now
+        self._backend._start_stream(self)
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        self._backend._stop_stream(self)
+        if self._finished_callback:
+            try:
+                self._finished_callback()
+            except Exception as e:
+                logger.warning(f"虚拟音频流结束回调出错: {e}")
+
+    def close(self):
+        self.stop()
+        self.closed = True
+
+    def _run_block(self, now: float):
+        time_info = SimpleNamespace(
+            currentTime=now,
+            inputBufferAdcTime=now - self.latency,
+            outputBufferDacTime=now + self.latency,
+        )
+        if self.kind == "input":
+            self._backend._fill_input(self._buffer)
+            self._backend._add_echo(
+                self._buffer, time_info.inputBufferAdcTime, self.samplerate
+            )
+        else:
+            self._buffer.fill(0)
+
+        start = time.perf_counter()
+        self._callback(self._buffer, self.blocksize, time_info, _CallbackStatus())
+        self.callback_times.append(time.perf_counter() - start)
+
+        if self.kind == "output":
+            self._backend._record_output(
+                self._buffer, time_info.outputBufferDacTime, self.samplerate
+            )
+        self.blocks += 1
+        self.next_time += self.block_duration
+
+    def get_timing_stats(self) -> Dict[str, Any]:
+        """
+        回调耗时统计（毫秒）及占块时长的比例.
+        """
+        if not self.callback_times:
+            return {"blocks": self.blocks}
+        times = np.fromiter(self.callback_times, dtype=np.float64) * 1000
+        block_ms = self.block_duration * 1000
+        return {
+            "blocks": self.blocks,
+            "block_ms": round(block_ms, 2),
+            "mean_ms": round(float(times.mean()), 4),
+            "p50_ms": round(float(np.percentile(times, 50)), 4),
+            "p95_ms": round(float(np.percentile(times, 95)), 4),
+            "p99_ms": round(float(np.percentile(times, 99)), 4),
+            "max_ms": round(float(times.max()), 4),
+            "cpu_load": round(float(times.mean()) / block_ms, 4),
+        }
+
+
+class VirtualAudioBackend(AudioBackend):
+    """文件/NumPy 驱动的虚拟声卡（无声卡环境的测试与基准）.
+
+    - 一个输入设备和一个输出设备；输入数据来自 WAV 文件或 NumPy 数组
+      （用完后循环或补静音），输出写入内存供分析
+    - 单个驱动线程按虚拟时钟依次调用各流的回调：speed=1 为实时，
+      speed>1 按倍速，speed=0 不等待（尽可能快）
+    - ``before_output`` 钩子在每次播放回调前调用，快速模式下可用来等待
+      异步处理（如解码线程）追上虚拟时钟
+    - paused=True 时流启动后虚拟时钟不走，``resume()`` 后才开始驱动回调，
+      便于在初始化、设置完成后再开始计时
+    - echo_gain > 0 时模拟扬声器到麦克风的声学回声：播放输出延迟 echo_delay 秒、
+      乘以 echo_gain 后叠加到录音输入（测试回声消除）
+    """
+
+    name = "virtual"
+    virtual = True
+
+    def __init__(
+        self,
+        input_source: Union[None, str, Path, np.ndarray] = None,
+        input_rate: int = 48000,
+        output_rate: int = 48000,
+        channels: int = 1,
+        source_rate: Optional[int] = None,
+        supported_rates: Optional[Iterable[int]] = None,
+        speed: float = 1.0,
+        latency: float = 0.0,
+        loop_input: bool = False,
+        record_output: bool = True,
+        before_output: Optional[Callable[[], None]] = None,
+        paused: bool = False,
+        echo_gain: float = 0.0,
+        echo_delay: float = 0.02,
+    ):
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        self.channels = int(channels)
+        self.speed = max(0.0, float(speed))
+        self.latency = float(latency)
+        self.loop_input = loop_input
+        self.record_output = record_output
+        self.before_output = before_output
+        self._echo = _EchoPath(echo_gain, echo_delay) if echo_gain > 0 else None
+        # 未指定时设备只支持自身的默认采样率
+        self._supported_rates = set(supported_rates or ()) | {
+            self.input_rate,
+            self.output_rate,
+        }
+
+        # 原始输入数据及其采样率；_source 为按录音流采样率重采样后的数据
+        self._source_data, self._source_rate = self._load_source(
+            input_source, source_rate
+        )
+        self._source = self._source_data
+        self._source_stream_rate = self._source_rate
+        self._source_pos = 0
+        self._resample_source(self.input_rate)
+        self.input_exhausted = threading.Event()
+
+        self._output_blocks: List[np.ndarray] = []
+        self._streams: List[VirtualStream] = []
+        # 最近创建的各方向流（停止后仍保留统计）
+        self._last_streams: Dict[str, VirtualStream] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._resumed = threading.Event()
+        if not paused:
+            self._resumed.set()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # 虚拟时钟（秒）与对应的起始墙钟
+        self.now = 0.0
+        self._wall_start = 0.0
+
+    # -----------------------
+    # 输入数据
+    # -----------------------
+    def _load_source(self, source, source_rate: Optional[int]):
+        if source is None:
+            return np.zeros((0, self.channels), dtype=np.int16), self.input_rate
+
+        if isinstance(source, (str, Path)):
+            data, file_rate = load_wav(source)
+            source_rate = source_rate or file_rate
+        else:
+            data = np.asarray(source)
+            if data.dtype != np.int16:
+                data = np.clip(data, -32768, 32767).astype(np.int16)
+            data = data.reshape(len(data), -1)
+        source_rate = source_rate or self.input_rate
+
+        # 通道数对齐：多余的丢弃，不足的复制第一通道
+        if data.shape[1] > self.channels:
+            data = data[:, : self.channels]
+        elif data.shape[1] < self.channels:
+            data = np.repeat(data[:, :1], self.channels, axis=1)
+
+        return np.ascontiguousarray(data), int(source_rate)
+
+    def _resample_source(self, stream_rate: int):
+        """
+        按录音流的采样率准备输入数据（流以非默认采样率打开时重新生成），保持播放进度.
+        """
+        stream_rate = int(stream_rate)
+        if stream_rate == self._source_stream_rate:
+            return
+
+        data = self._source_data
+        if stream_rate != self._source_rate and len(data):
+            import soxr
+
+            data = soxr.resample(data, self._source_rate, stream_rate, quality="HQ")
+            data = np.ascontiguousarray(
+                data.astype(np.int16).reshape(-1, self.channels)
+            )
+        self._source_pos = self._source_pos * stream_rate // self._source_stream_rate
+        self._source = data
+        self._source_stream_rate = stream_rate
+
+    def _fill_input(self, buffer: np.ndarray):
+        need = len(buffer)
+        filled = 0
+        total = len(self._source)
+        while filled < need and total:
+            if self._source_pos >= total:
+                if not self.loop_input:
+                    break
+                self._source_pos = 0
+            count = min(need - filled, total - self._source_pos)
+            buffer[filled : filled + count] = self._source[
+                self._source_pos : self._source_pos + count
+            ]
+            filled += count
+            self._source_pos += count
+
+        if filled < need:
+            buffer[filled:] = 0
+            self.input_exhausted.set()
+
+    def _record_output(self, buffer: np.ndarray, dac_time: float, rate: float):
+        if self.record_output:
+            self._output_blocks.append(buffer.copy())
+        if self._echo is not None:
+            self._echo.write(buffer, dac_time, rate)
+
+    def _add_echo(self, buffer: np.ndarray, adc_time: float, rate: float):
+        if self._echo is None:
+            return
+        echo = self._echo.render(adc_time, len(buffer), rate)
+        mixed = buffer.astype(np.float32) + echo[:, None]
+        np.copyto(buffer, np.clip(mixed, -32768, 32767), casting="unsafe")
+
+    def get_output(self) -> np.ndarray:
+        """
+        已播放的全部输出（int16 数组[采样, 通道]）.
+        """
+        if not self._output_blocks:
+            return np.zeros((0, self.channels), dtype=np.int16)
+        return np.concatenate(self._output_blocks)
+
+    def wait_input_exhausted(self, timeout: Optional[float] = None) -> bool:
+        """
+        阻塞等待输入数据播完（loop_input=False 时）.
+        """
+        return self.input_exhausted.wait(timeout)
+
+    # -----------------------
+    # AudioBackend 接口
+    # -----------------------
+    def query_devices(self) -> List[Dict[str, Any]]:
+        common = {
+            "hostapi": 0,
+            "default_low_input_latency": self.latency,
+            "default_high_input_latency": self.latency,
+            "default_low_output_latency": self.latency,
+            "default_high_output_latency": self.latency,
+        }
+        return [
+            dict(
+                common,
+                name="Virtual Input",
+                max_input_channels=self.channels,
+                max_output_channels=0,
+                default_samplerate=float(self.input_rate),
+            ),
+            dict(
+                common,
+                name="Virtual Output",
+                max_input_channels=0,
+                max_output_channels=self.channels,
+                default_samplerate=float(self.output_rate),
+            ),
+        ]
+
+    def query_hostapis(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": "Virtual",
+                "devices": [0, 1],
+                "default_input_device": 0,
+                "default_output_device": 1,
+            }
+        ]
+
+    def default_device_index(self, kind: str) -> int:
+        return 0 if kind == "input" else 1
+
+    def check_settings(
+        self,
+        kind: str,
+        device: Optional[int],
+        samplerate: Optional[float],
+        channels: int,
+        dtype: Any = "int16",
+    ):
+        expected = self.default_device_index(kind)
+        if device is not None and device != expected:
+            raise ValueError(f"虚拟设备[{device}]不支持{kind}")
+        if channels > self.channels:
+            raise ValueError(f"虚拟设备最多 {self.channels} 通道")
+        if samplerate is not None and int(samplerate) not in self._supported_rates:
+            raise ValueError(f"虚拟设备不支持采样率 {samplerate}")
+
+    def input_stream(self, **kwargs) -> VirtualStream:
+        return self._create_stream("input", **kwargs)
+
+    def output_stream(self, **kwargs) -> VirtualStream:
+        return self._create_stream("output", **kwargs)
+
+    def _create_stream(
+        self, kind: str, samplerate=None, channels=None, **kwargs
+    ) -> VirtualStream:
+        default_rate = self.input_rate if kind == "input" else self.output_rate
+        samplerate = samplerate or default_rate
+        channels = channels or self.channels
+        self.check_settings(kind, kwargs.get("device"), samplerate, channels)
+        if kind == "input":
+            self._resample_source(samplerate)
+        stream = VirtualStream(
+            self,
+            kind,
+            samplerate,
+            channels,
+            kwargs.pop("dtype", np.int16),
+            kwargs.pop("blocksize", None),
+            kwargs.pop("callback"),
+            finished_callback=kwargs.pop("finished_callback", None),
+            device=kwargs.pop("device", None),
+            latency=kwargs.pop("latency", None),
+        )
+        self._last_streams[kind] = stream
+        return stream
+
+    # -----------------------
+    # 驱动线程
+    # -----------------------
+    def _start_stream(self, stream: VirtualStream):
+        with self._lock:
+            self._streams.append(stream)
+            if not self._running:
+                self._running = True
+                self._wall_start = time.monotonic() - self._wall_elapsed(self.now)
+                self._thread = threading.Thread(
+                    target=self._run, name="virtual-audio", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def _stop_stream(self, stream: VirtualStream):
+        with self._lock:
+            if stream in self._streams:
+                self._streams.remove(stream)
+            if not self._streams:
+                self._running = False
+        self._wakeup.set()
+        thread = self._thread
+        if (
+            not self._running
+            and thread
+            and thread.is_alive()
+            and thread is not threading.current_thread()
+        ):
+            thread.join(1.0)
+
+    def pause(self):
+        """
+        暂停虚拟时钟（正在执行的回调会先完成）.
+        """
+        self._resumed.clear()
+
+    def resume(self):
+        """
+        恢复虚拟时钟，实时模式下从当前墙钟重新对齐.
+        """
+        self._wall_start = time.monotonic() - self._wall_elapsed(self.now)
+        self._resumed.set()
+
+    def _wall_elapsed(self, virtual_time: float) -> float:
+        return virtual_time / self.speed if self.speed > 0 else 0.0
+
+    def _run(self):
+        while self._running:
+            if not self._resumed.wait(0.1):
+                continue
+            with self._lock:
+                streams = [s for s in self._streams if s.active]
+            if not streams:
+                self._wakeup.wait(0.1)
+                self._wakeup.clear()
+                continue
+
+            # 推进到最早到期的块；同一时刻先录音后播放
+            due = min(s.next_time for s in streams)
+            if self.speed > 0:
+                delay = self._wall_start + self._wall_elapsed(due) - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.now = due
+
+            for stream in sorted(streams, key=lambda s: s.kind != "input"):
+                if stream.next_time > due or not stream.active:
+                    continue
+                if stream.kind == "output" and self.before_output:
+                    self.before_output()
+                try:
+                    stream._run_block(due)
+                except Exception as e:
+                    logger.error(f"虚拟音频流回调出错: {e}")
+
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """
+        各方向最近一个流的回调耗时统计.
+        """
+        return {
+            kind: stream.get_timing_stats()
+            for kind, stream in self._last_streams.items()
+        }
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class KeywordEntry:
+    """keywords.txt 中的一个唤醒词.
+
+    行格式（sherpa-onnx）: ``x iǎo m ǐ x iǎo m ǐ :2.0 #0.3 @小米小米``，
+    其中 ``:`` 为该词的加分（boosting score），``#`` 为该词的触发阈值，
+    未指定时使用 WAKE_WORD_OPTIONS 中的全局 KEYWORDS_SCORE / KEYWORDS_THRESHOLD。
+    """
+
+    tokens: str
+    label: str
+    boost: Optional[float] = None
+    threshold: Optional[float] = None
+
+    def to_line(self) -> str:
+        parts = [self.tokens]
+        if self.boost is not None:
+            parts.append(f":{self.boost:g}")
+        if self.threshold is not None:
+            parts.append(f"#{self.threshold:g}")
+        parts.append(f"@{self.label}")
+        return " ".join(parts)
+
+    def unknown_tokens(self, tokens: Set[str]) -> List[str]:
+        """
+        返回不在模型 tokens.txt 中的 token.
+        """
+        return [token for token in self.tokens.split() if token not in tokens]
+
+
+def parse_keyword_line(line: str) -> Optional[KeywordEntry]:
+    """
+    解析 keywords.txt 的一行，空行和注释返回 None.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    body, _, label = line.partition("@")
+    tokens = []
+    boost = threshold = None
+    for part in body.split():
+        if part.startswith(":") and len(part) > 1:
+            boost = float(part[1:])
+        elif part.startswith("#") and len(part) > 1:
+            threshold = float(part[1:])
+        else:
+            tokens.append(part)
+    if not tokens:
+        raise ValueError(f"唤醒词缺少拼音token: {line}")
+
+    tokens_str = " ".join(tokens)
+    return KeywordEntry(tokens_str, label.strip() or tokens_str, boost, threshold)
+
+
+def parse_display_line(text: str) -> Tuple[str, Optional[float], Optional[float]]:
+    """
+    解析设置界面中的一行 "小米小米 :2.0 #0.3"，返回 (中文, 加分, 阈值).
+    """
+    words = []
+    boost = threshold = None
+    for part in text.split():
+        if part.startswith(":") and len(part) > 1:
+            boost = float(part[1:])
+        elif part.startswith("#") and len(part) > 1:
+            threshold = float(part[1:])
+        else:
+            words.append(part)
+    return "".join(words), boost, threshold
+
+
+def format_display_line(entry: KeywordEntry) -> str:
+    """
+    设置界面中显示的一行：中文，附带单独设置的加分/阈值.
+    """
+    parts = [entry.label]
+    if entry.boost is not None:
+        parts.append(f":{entry.boost:g}")
+    if entry.threshold is not None:
+        parts.append(f"#{entry.threshold:g}")
+    return " ".join(parts)
+
+
+def load_keywords_file(path: Path) -> List[KeywordEntry]:
+    """
+    读取 keywords.txt，跳过无法解析的行.
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                entry = parse_keyword_line(line)
+            except ValueError as e:
+                logger.warning(f"{path}:{number} 唤醒词格式错误: {e}")
+                continue
+            if entry is not None:
+                entries.append(entry)
+    return entries
+
+
+def save_keywords_file(path: Path, entries: Iterable[KeywordEntry]):
+    """
+    写入 keywords.txt（先写临时文件再替换，运行中的检测器不会读到半个文件）.
+    """
+    path = Path(path)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(entry.to_line() + "\n")
+    temp_path.replace(path)
+
+
+def load_tokens_file(path: Path) -> Set[str]:
+    """
+    读取模型 tokens.txt 中的全部 token.
+    """
+    tokens = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                tokens.add(parts[0])
+    return tokens
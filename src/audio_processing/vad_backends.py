@@ -0,0 +1,205 @@
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import webrtcvad
+
+from src.utils.logging_config import get_logger
+from src.utils.resource_finder import resource_finder
+
+logger = get_logger(__name__)
+
+BACKEND_WEBRTC = "webrtc"
+BACKEND_SILERO = "silero"
+
+
+class WebRTCVADBackend:
+    """WebRTC VAD：每帧判定为语音且平均幅度超过能量阈值时概率为1，否则为0.
+
+    CPU 开销极低，但只依赖频谱/能量特征，音乐、电视声容易误判。
+    """
+
+    name = BACKEND_WEBRTC
+
+    def __init__(self, config: Dict[str, Any], sample_rate: int):
+        self.sample_rate = sample_rate
+        self.vad = webrtcvad.Vad()
+        self.vad.set_mode(int(config.get("MODE", 3)))  # 3 为最高灵敏度
+
+        self.frame_ms = int(config.get("FRAME_MS", 20))  # 10 / 20 / 30 毫秒
+        if self.frame_ms not in (10, 20, 30):
+            logger.warning(f"VAD帧长度 {self.frame_ms}ms 无效，使用20ms")
+            self.frame_ms = 20
+        self.frame_size = sample_rate * self.frame_ms // 1000
+        self.energy_threshold = config.get("ENERGY_THRESHOLD", 300)
+        # 判定结果只有0/1，任意介于两者之间的阈值等价
+        self.threshold = 0.5
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """
+        判定一批分析帧（形状 (n, frame_size) 的 int16），返回每帧的语音概率.
+        """
+        # 整批一次计算平均幅度，只有超过能量阈值的帧才交给 WebRTC VAD
+        energy = np.mean(np.abs(frames, dtype=np.int32), axis=1)
+        probabilities = np.zeros(len(frames), dtype=np.float32)
+        for index in np.flatnonzero(energy > self.energy_threshold):
+            # 行切片是连续内存，按字节视图传递缓冲区，不复制
+            if self.vad.is_speech(frames[index].data.cast("B"), self.sample_rate):
+                probabilities[index] = 1.0
+        return probabilities
+
+    def reset(self):
+        pass
+
+
+class SileroVADBackend:
+    """Silero 神经网络 VAD（在CPU上运行ONNX模型）.
+
+    对音乐、电视等非语音声音的区分能力明显好于 WebRTC VAD。每次前进
+    一个窗口（16kHz 下512个采样，32ms），模型输入前面拼接上一窗口末尾的
+    上下文采样（16kHz 下64个），窗口必须按时间顺序逐个推理。
+
+    - 安装了 onnxruntime：直接运行模型并保持 LSTM 状态，输出每个窗口的
+      语音概率
+    - 否则通过 sherpa_onnx 的 is_speech() 运行，只能得到0/1判定
+    """
+
+    name = BACKEND_SILERO
+
+    # 采样率 -> (每次前进的采样数, 上下文采样数)，模型只支持这两种采样率
+    WINDOWS = {16000: (512, 64), 8000: (256, 32)}
+    PROVIDERS = {
+        "cuda": "CUDAExecutionProvider",
+        "coreml": "CoreMLExecutionProvider",
+    }
+
+    def __init__(self, config: Dict[str, Any], sample_rate: int):
+        if sample_rate not in self.WINDOWS:
+            raise ValueError(f"Silero VAD 不支持采样率 {sample_rate}Hz")
+
+        model_path = self._find_model(config.get("MODEL", "models/silero_vad.onnx"))
+        self.sample_rate = sample_rate
+        self.threshold = float(config.get("THRESHOLD", 0.5))
+        self.frame_size, self._context_size = self.WINDOWS[sample_rate]
+        self.frame_ms = self.frame_size * 1000 / sample_rate
+        num_threads = int(config.get("NUM_THREADS", 1))
+        provider = str(config.get("PROVIDER", "cpu")).lower()
+
+        # 延迟导入，只有选择该后端时才加载推理库
+        try:
+            import onnxruntime
+        except ImportError:
+            onnxruntime = None
+
+        if onnxruntime is not None:
+            self._init_onnxruntime(onnxruntime, model_path, num_threads, provider)
+        else:
+            logger.warning(
+                "未安装 onnxruntime，Silero VAD 通过 sherpa_onnx 只输出0/1判定"
+            )
+            self._init_sherpa(model_path, num_threads, provider)
+
+        # 模型输入：上下文 + 当前窗口，推理后把窗口末尾移到开头作为下一次的上下文
+        self._input = np.zeros((1, self._context_size + self.frame_size), np.float32)
+        logger.info(f"Silero VAD 已加载（{self.runtime}）: {model_path}")
+
+    def _init_onnxruntime(
+        self, onnxruntime, model_path: Path, threads: int, provider: str
+    ):
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        providers = ["CPUExecutionProvider"]
+        if provider in self.PROVIDERS:
+            providers.insert(0, self.PROVIDERS[provider])
+        self._session = onnxruntime.InferenceSession(
+            str(model_path), sess_options=options, providers=providers
+        )
+        self._sr = np.array(self.sample_rate, dtype=np.int64)
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self.model = None
+        self.runtime = "onnxruntime"
+
+    def _init_sherpa(self, model_path: Path, threads: int, provider: str):
+        import sherpa_onnx
+
+        vad_config = sherpa_onnx.VadModelConfig()
+        vad_config.silero_vad.model = str(model_path)
+        vad_config.silero_vad.threshold = self.threshold
+        vad_config.silero_vad.window_size = self.frame_size
+        # 语音/静音的最短时长由检测器的 TRIGGER_MS / HANGOVER_MS 控制，
+        # 这里取不到一个窗口的最小正值（为0时 validate() 不通过）
+        vad_config.silero_vad.min_speech_duration = 0.02
+        vad_config.silero_vad.min_silence_duration = 0.02
+        vad_config.sample_rate = self.sample_rate
+        vad_config.num_threads = threads
+        vad_config.provider = provider
+        if not vad_config.validate():
+            raise ValueError(f"Silero VAD 配置无效: {model_path}")
+
+        self.model = sherpa_onnx.VadModel.create(vad_config)
+        # is_speech() 要求输入长度等于 window_size()：新版本包含上下文
+        # （512 + 64），旧版本只有窗口本身
+        context_size = self.model.window_size() - self.frame_size
+        if context_size not in (0, self._context_size):
+            raise ValueError(f"不支持的 Silero VAD 窗口: {self.model.window_size()}")
+        self._context_size = context_size
+        self._session = None
+        self.runtime = "sherpa_onnx"
+
+    @staticmethod
+    def _find_model(model: str) -> Path:
+        path = resource_finder.find_file(model)
+        if path is None:
+            path = Path(model)
+        if not path.exists():
+            raise FileNotFoundError(
+                f"VAD模型文件不存在: {model}，"
+                "可运行 scripts/download_vad_model.py 下载"
+            )
+        return path
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """
+        推理一批窗口（形状 (n, frame_size) 的 int16），返回每个窗口的语音概率.
+
+        通过 sherpa_onnx 运行时结果只有0/1。
+        """
+        batch = frames.astype(np.float32) * (1.0 / 32768.0)
+        probabilities = np.empty(len(batch), dtype=np.float32)
+        buffer = self._input
+        context = self._context_size
+        for index, window in enumerate(batch):
+            buffer[0, context:] = window
+            if self._session is not None:
+                output, self._state = self._session.run(
+                    None, {"input": buffer, "state": self._state, "sr": self._sr}
+                )
+                probabilities[index] = output[0, 0]
+            else:
+                probabilities[index] = float(self.model.is_speech(buffer[0]))
+            if context:
+                buffer[0, :context] = buffer[0, -context:]
+        return probabilities
+
+    def reset(self):
+        self._input.fill(0)
+        if self._session is not None:
+            self._state = np.zeros_like(self._state)
+        else:
+            self.model.reset()
+
+
+def create_vad_backend(config: Dict[str, Any], sample_rate: int):
+    """
+    按 VAD_OPTIONS.BACKEND 创建VAD后端，神经网络后端不可用时回退到 WebRTC VAD.
+    """
+    backend = str(config.get("BACKEND", BACKEND_WEBRTC)).lower()
+    if backend == BACKEND_SILERO:
+        try:
+            return SileroVADBackend(config, sample_rate)
+        except Exception as e:
+            logger.warning(f"Silero VAD 不可用，回退到 WebRTC VAD: {e}")
+    elif backend != BACKEND_WEBRTC:
+        logger.warning(f"未知的VAD后端: {backend}，使用 WebRTC VAD")
+    return WebRTCVADBackend(config, sample_rate)
@@ -1,95 +1,132 @@
-import logging
-import threading
+import asyncio
 import time
+from typing import Any, Callable, Dict, Optional
 
 import numpy as np
-import pyaudio
-import webrtcvad
 
-from src.constants.constants import AbortReason, DeviceState
+from src.audio_codecs.ring_buffer import AudioRingBuffer
+from src.audio_processing.vad_backends import create_vad_backend
+from src.constants.constants import AbortReason, AudioConfig, DeviceState
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
 
-# 配置日志
-logger = logging.getLogger("VADDetector")
+logger = get_logger(__name__)
+
+# AudioCodec 录音订阅名称
+CAPTURE_TAP_NAME = "vad"
 
 
 class VADDetector:
-    """
-    基于WebRTC VAD的语音活动检测器，用于检测用户打断.
+    """语音活动检测器，用于检测用户打断.
+
+    订阅 AudioCodec 已采集的16kHz录音帧（经 AEC/预处理之后），不再单独打开
+    录音设备；录音回调写入帧后唤醒检测任务，无需轮询。每个分析帧由后端
+    （WebRTC VAD + 能量阈值，或 Silero 神经网络VAD）给出语音概率，
+    超过后端阈值即为语音帧；连续语音达到 TRIGGER_MS 时进入语音状态
+    （说话中触发打断），静音持续 HANGOVER_MS 后才退出语音状态。
     """
 
-    def __init__(self, audio_codec, protocol, app_instance, loop):
+    def __init__(self, audio_codec, app_instance=None, backend=None):
         """初始化VAD检测器.
 
         参数:
             audio_codec: 音频编解码器实例
-            protocol: 通信协议实例
-            app_instance: 应用程序实例
-            loop: 事件循环
+            app_instance: 应用程序实例（用于判断是否在说话并触发打断，可为 None）
+            backend: VAD后端实例，默认按 VAD_OPTIONS.BACKEND 创建
         """
         self.audio_codec = audio_codec
-        self.protocol = protocol
         self.app = app_instance
-        self.loop = loop
 
-        # VAD设置
-        self.vad = webrtcvad.Vad()
-        self.vad.set_mode(3)  # 设置最高灵敏度
+        config = ConfigManager.get_instance().get_config("VAD_OPTIONS", {}) or {}
+
+        # VAD后端
+        self.sample_rate = AudioConfig.INPUT_SAMPLE_RATE
+        self.backend = backend or create_vad_backend(config, self.sample_rate)
+        self.frame_size = self.backend.frame_size
+        self.frame_duration = self.backend.frame_ms
 
-        # 参数设置
-        self.sample_rate = 16000
-        self.frame_duration = 20  # 毫秒
-        self.frame_size = int(self.sample_rate * self.frame_duration / 1000)
-        self.speech_window = 5  # 连续检测到多少帧语音才触发打断
-        self.energy_threshold = 300  # 能量阈值
+        # 连续多少帧语音才进入语音状态 / 连续多少帧静音才退出（拖尾）
+        self.trigger_frames = max(
+            1, round(config.get("TRIGGER_MS", 100) / self.frame_duration)
+        )
+        self.hangover_frames = max(
+            0, round(config.get("HANGOVER_MS", 300) / self.frame_duration)
+        )
+        self.interrupt_enabled = bool(config.get("INTERRUPT", True))
+        # 语音概率的平滑系数（每帧），时间常数约 SMOOTHING_MS
+        smoothing_ms = max(self.frame_duration, config.get("SMOOTHING_MS", 100))
+        self._alpha = self.frame_duration / smoothing_ms
 
         # 状态变量
         self.running = False
         self.paused = False
-        self.thread = None
+        self.task: Optional[asyncio.Task] = None
+        self._channel = None
         self.speech_count = 0
         self.silence_count = 0
-        self.triggered = False
-
-        # 创建独立的PyAudio实例和流，避免与主音频流冲突
-        self.pa = None
-        self.stream = None
-
-    def start(self):
+        self.in_speech = False
+        self.speech_probability = 0.0
+        self.last_probability = 0.0
+
+        # 分析帧缓冲（录音帧长度与VAD帧长度不必相同），凑齐的窗口整批处理
+        self._pending = AudioRingBuffer(self.sample_rate)
+        self._batch = np.zeros(self.sample_rate, dtype=np.int16)
+
+        # 回调
+        self.on_speech_start: Optional[Callable] = None
+        self.on_speech_end: Optional[Callable] = None
+        # 每个分析帧的原始语音概率（在检测任务中同步调用）
+        self.on_probability: Optional[Callable[[float], None]] = None
+
+        # 统计
+        self._frames = 0
+        self._speech_frames = 0
+        self._segments = 0
+        self._interrupts = 0
+        self._process_time = 0.0
+
+    async def start(self) -> bool:
         """
-        启动VAD检测器.
+        启动VAD检测器：订阅录音帧并启动检测任务.
         """
-        if self.thread and self.thread.is_alive():
+        if self.task and not self.task.done():
             logger.warning("VAD检测器已经在运行")
-            return
+            return True
+        if self.audio_codec is None:
+            logger.error("VAD检测器缺少音频编解码器")
+            return False
 
         self.running = True
         self.paused = False
-
-        # 初始化PyAudio和流
-        self._initialize_audio_stream()
-
-        # 启动检测线程
-        self.thread = threading.Thread(target=self._detection_loop, daemon=True)
-        self.thread.start()
+        self._reset_state()
+        self._channel = self.audio_codec.add_capture_tap(CAPTURE_TAP_NAME)
+        self.task = asyncio.create_task(self._detection_loop(), name="vad_detector")
         logger.info("VAD检测器已启动")
+        return True
 
-    def stop(self):
+    async def stop(self):
         """
         停止VAD检测器.
         """
         self.running = False
 
-        # 关闭音频流
-        self._close_audio_stream()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
 
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=1.0)
+        if self.audio_codec is not None and self._channel is not None:
+            self.audio_codec.remove_capture_tap(CAPTURE_TAP_NAME)
+        self._channel = None
 
         logger.info("VAD检测器已停止")
 
     def pause(self):
         """
-        暂停VAD检测.
+        暂停VAD检测（仍会取走录音帧，但不做判定）.
         """
         self.paused = True
         logger.info("VAD检测器已暂停")
@@ -99,10 +136,7 @@ class VADDetector:
         恢复VAD检测.
         """
         self.paused = False
-        # 重置状态
-        self.speech_count = 0
-        self.silence_count = 0
-        self.triggered = False
+        self._reset_state()
         logger.info("VAD检测器已恢复")
 
     def is_running(self):
@@ -111,188 +145,159 @@ class VADDetector:
         """
         return self.running and not self.paused
 
-    def _initialize_audio_stream(self):
-        """
-        初始化独立的音频流.
-        """
-        try:
-            # 创建PyAudio实例
-            self.pa = pyaudio.PyAudio()
-
-            # 获取默认输入设备
-            device_index = None
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info["maxInputChannels"] > 0:
-                    device_index = i
-                    break
-
-            if device_index is None:
-                logger.error("找不到可用的输入设备")
-                return False
-
-            # 创建输入流
-            self.stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=self.frame_size,
-                start=True,
-            )
-
-            logger.info(f"VAD检测器音频流已初始化，使用设备索引: {device_index}")
-            return True
-
-        except Exception as e:
-            logger.error(f"初始化VAD音频流失败: {e}")
-            return False
-
-    def _close_audio_stream(self):
-        """
-        关闭音频流.
-        """
-        try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-
-            if self.pa:
-                self.pa.terminate()
-                self.pa = None
-
-            logger.info("VAD检测器音频流已关闭")
-        except Exception as e:
-            logger.error(f"关闭VAD音频流失败: {e}")
-
-    def _detection_loop(self):
+    async def _detection_loop(self):
         """
-        VAD检测主循环.
+        VAD检测主循环：等待录音回调送来的帧.
         """
         logger.info("VAD检测循环已启动")
+        channel = self._channel
 
         while self.running:
-            # 如果暂停或者音频流未初始化，则跳过
-            if self.paused or not self.stream:
-                time.sleep(0.1)
-                continue
-
             try:
-                # 只在说话状态下进行检测
-                if self.app.device_state == DeviceState.SPEAKING:
-                    # 读取音频帧
-                    frame = self._read_audio_frame()
-                    if not frame:
-                        time.sleep(0.01)
-                        continue
-
-                    # 检测是否是语音
-                    is_speech = self._detect_speech(frame)
-
-                    # 如果检测到语音并且达到触发条件，处理打断
-                    if is_speech:
-                        self._handle_speech_frame(frame)
-                    else:
-                        self._handle_silence_frame(frame)
-                else:
-                    # 不在说话状态，重置状态
-                    self._reset_state()
-
+                frame = await channel.get()
+                try:
+                    if not self.paused:
+                        self.feed(frame.pcm)
+                finally:
+                    frame.release()
+
+            except asyncio.CancelledError:
+                break
             except Exception as e:
                 logger.error(f"VAD检测循环出错: {e}")
 
-            time.sleep(0.01)  # 小延迟，减少CPU使用
-
         logger.info("VAD检测循环已结束")
 
-    def _read_audio_frame(self):
+    def feed(self, pcm: np.ndarray) -> int:
         """
-        读取一帧音频数据.
+        写入任意长度的16kHz int16 录音，处理所有凑齐的分析帧，返回处理的帧数.
         """
-        try:
-            if not self.stream or not self.stream.is_active():
-                return None
+        self._pending.write(pcm)
+        count = len(self._pending) // self.frame_size
+        if count == 0:
+            return 0
 
-            # 读取音频数据
-            data = self.stream.read(self.frame_size, exception_on_overflow=False)
-            return data
-        except Exception as e:
-            logger.error(f"读取音频帧失败: {e}")
-            return None
+        batch = self._pending.read(count * self.frame_size, out=self._batch)
+        return self.process_frames(batch.reshape(count, self.frame_size))
 
-    def _detect_speech(self, frame):
+    def process_frames(self, frames: np.ndarray) -> int:
         """
-        检测是否是语音.
+        判定一批分析帧（形状 (n, frame_size) 的 int16），依次更新语音概率与语音状态.
         """
+        start = time.perf_counter()
         try:
-            # 确保帧长度正确
-            if len(frame) != self.frame_size * 2:  # 16位音频，每个样本2字节
-                return False
-
-            # 使用VAD检测
-            is_speech = self.vad.is_speech(frame, self.sample_rate)
-
-            # 计算音频能量
-            audio_data = np.frombuffer(frame, dtype=np.int16)
-            energy = np.mean(np.abs(audio_data))
-
-            # 结合VAD和能量阈值
-            is_valid_speech = is_speech and energy > self.energy_threshold
-
-            if is_valid_speech:
-                logger.debug(
-                    f"检测到语音 [能量: {energy:.2f}] [连续语音帧: {self.speech_count+1}]"
-                )
-
-            return is_valid_speech
+            probabilities = self.backend.process(frames)
         except Exception as e:
             logger.error(f"检测语音失败: {e}")
-            return False
+            probabilities = np.zeros(len(frames), dtype=np.float32)
+        self._process_time += time.perf_counter() - start
+
+        threshold = self.backend.threshold
+        for probability in probabilities:
+            if self.paused:
+                break
+            self._update(float(probability), probability >= threshold)
+        return len(frames)
+
+    def _update(self, probability: float, is_speech: bool):
+        self.last_probability = probability
+        self.speech_probability += self._alpha * (probability - self.speech_probability)
+        self._frames += 1
+        if self.on_probability is not None:
+            try:
+                self.on_probability(probability)
+            except Exception as e:
+                logger.error(f"VAD概率回调执行失败: {e}")
+
+        if is_speech:
+            self._speech_frames += 1
+            self._handle_speech_frame()
+        else:
+            self._handle_silence_frame()
 
-    def _handle_speech_frame(self, frame):
+    def _handle_speech_frame(self):
         """
         处理语音帧.
         """
         self.speech_count += 1
         self.silence_count = 0
 
-        # 检测到足够的连续语音帧，触发打断
-        if self.speech_count >= self.speech_window and not self.triggered:
-            self.triggered = True
-            logger.info("检测到持续语音，触发打断！")
-            self._trigger_interrupt()
-
-            # 立即暂停自己，防止重复触发
-            self.paused = True
-            logger.info("VAD检测器已自动暂停以防止重复触发")
-
-            # 重置状态
-            self.speech_count = 0
-            self.silence_count = 0
-            self.triggered = False
+        # 检测到足够的连续语音帧，进入语音状态
+        if not self.in_speech and self.speech_count >= self.trigger_frames:
+            self.in_speech = True
+            self._segments += 1
+            logger.debug(f"检测到语音开始 [概率: {self.speech_probability:.2f}]")
+            self._emit(self.on_speech_start)
+            self._maybe_interrupt()
 
-    def _handle_silence_frame(self, frame):
+    def _handle_silence_frame(self):
         """
-        处理静音帧.
+        处理静音帧：静音持续超过拖尾时长才结束语音状态.
         """
         self.silence_count += 1
         self.speech_count = 0
 
+        if self.in_speech and self.silence_count > self.hangover_frames:
+            self.in_speech = False
+            logger.debug("检测到语音结束")
+            self._emit(self.on_speech_end)
+
+    def _maybe_interrupt(self):
+        """
+        应用正在说话时触发打断.
+        """
+        if not self.interrupt_enabled or self.app is None:
+            return
+        if self.app.device_state != DeviceState.SPEAKING:
+            return
+
+        logger.info("检测到持续语音，触发打断！")
+        self._interrupts += 1
+        self.app.spawn(
+            self.app.abort_speaking(AbortReason.WAKE_WORD_DETECTED), "vad:abort"
+        )
+
+        # 立即暂停自己，防止重复触发
+        self.paused = True
+        logger.info("VAD检测器已自动暂停以防止重复触发")
+
+    def _emit(self, callback: Optional[Callable]):
+        if callback is None:
+            return
+        try:
+            result = callback(self.speech_probability)
+            if asyncio.iscoroutine(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            logger.error(f"VAD回调执行失败: {e}")
+
     def _reset_state(self):
         """
         重置状态.
         """
         self.speech_count = 0
         self.silence_count = 0
-        self.triggered = False
+        self.in_speech = False
+        self.speech_probability = 0.0
+        self.last_probability = 0.0
+        self._pending.clear()
+        self.backend.reset()
 
-    def _trigger_interrupt(self):
+    def get_stats(self) -> Dict[str, Any]:
         """
-        触发打断.
+        获取VAD统计信息.
         """
-        # 通知应用程序中止当前语音输出
-        self.app.schedule(
-            lambda: self.app.abort_speaking(AbortReason.WAKE_WORD_DETECTED)
-        )
+        frames = self._frames
+        return {
+            "running": self.is_running(),
+            "backend": self.backend.name,
+            "frame_ms": self.frame_duration,
+            "in_speech": self.in_speech,
+            "speech_probability": round(self.speech_probability, 3),
+            "frames": frames,
+            "speech_ratio": round(self._speech_frames / frames, 3) if frames else 0.0,
+            "segments": self._segments,
+            "interrupts": self._interrupts,
+            "avg_us": round(self._process_time / frames * 1e6, 2) if frames else 0.0,
+            "channel": self._channel.get_stats() if self._channel else None,
+        }
@@ -1,11 +1,18 @@
 import asyncio
+import threading
 import time
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import sherpa_onnx
 
+from src.audio_processing.keywords import (
+    KeywordEntry,
+    load_keywords_file,
+    load_tokens_file,
+    parse_keyword_line,
+)
 from src.constants.constants import AudioConfig
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
@@ -13,6 +20,102 @@ from src.utils.resource_finder import resource_finder
 
 logger = get_logger(__name__)
 
+# 预热时送入的静音时长（秒），足够触发首次解码和 ONNX 会话的内存分配
+WARMUP_SECONDS = 0.5
+
+
+class _LoadedSpotter:
+    """
+    已加载（并预热）的 KeywordSpotter 及其加载耗时.
+    """
+
+    def __init__(self, spotter, load_ms: float, warmup_ms: float):
+        self.spotter = spotter
+        self.load_ms = load_ms
+        self.warmup_ms = warmup_ms
+        self.hits = 0
+
+
+# 进程内模型缓存：按模型目录和参数复用已加载的 KeywordSpotter，
+# 检测器重建/重启时无需重新加载 ONNX 模型（ARM 设备上需要数秒）
+_spotter_cache: Dict[tuple, _LoadedSpotter] = {}
+_spotter_cache_lock = threading.Lock()
+
+
+def _warm_up_spotter(spotter, sample_rate: int, keywords: Optional[str]) -> float:
+    """
+    用一段静音做一次完整解码，让 ONNX 会话完成首次推理的初始化，返回耗时（毫秒）.
+    """
+    start = time.perf_counter()
+    stream = spotter.create_stream(keywords) if keywords else spotter.create_stream()
+    stream.accept_waveform(
+        sample_rate=sample_rate,
+        waveform=np.zeros(int(sample_rate * WARMUP_SECONDS), dtype=np.float32),
+    )
+    while spotter.is_ready(stream):
+        spotter.decode_stream(stream)
+    spotter.get_result(stream)
+    return (time.perf_counter() - start) * 1000
+
+
+def get_keyword_spotter(
+    model_dir: Path, keywords: Optional[str] = None, **params
+) -> Tuple[_LoadedSpotter, bool]:
+    """获取（必要时加载并预热）KeywordSpotter，返回 (模型, 是否命中缓存).
+
+    缓存键为模型目录、模型文件的修改时间和 params（线程数、阈值等）；
+    唤醒词列表不在键中，检测流总是用 create_stream(keywords) 显式创建。
+    """
+    files = {
+        name: model_dir / name
+        for name in ("encoder.onnx", "decoder.onnx", "joiner.onnx", "tokens.txt")
+    }
+    key = (
+        str(model_dir.resolve()),
+        tuple(files[name].stat().st_mtime for name in sorted(files)),
+        tuple(sorted(params.items())),
+    )
+
+    with _spotter_cache_lock:
+        loaded = _spotter_cache.get(key)
+        if loaded is not None:
+            loaded.hits += 1
+            return loaded, True
+
+        start = time.perf_counter()
+        spotter = sherpa_onnx.KeywordSpotter(
+            tokens=str(files["tokens.txt"]),
+            encoder=str(files["encoder.onnx"]),
+            decoder=str(files["decoder.onnx"]),
+            joiner=str(files["joiner.onnx"]),
+            keywords_file=str(model_dir / "keywords.txt"),
+            feature_dim=80,
+            **params,
+        )
+        load_ms = (time.perf_counter() - start) * 1000
+        try:
+            warmup_ms = _warm_up_spotter(spotter, params["sample_rate"], keywords)
+        except Exception as e:
+            logger.warning(f"KeywordSpotter预热失败: {e}")
+            warmup_ms = 0.0
+
+        loaded = _LoadedSpotter(spotter, load_ms, warmup_ms)
+        _spotter_cache[key] = loaded
+        logger.info(
+            f"KeywordSpotter模型已加载: 加载 {load_ms:.0f}ms, 预热 {warmup_ms:.0f}ms"
+        )
+        return loaded, False
+
+
+def clear_keyword_spotter_cache() -> int:
+    """
+    释放缓存的模型（已创建的检测器仍持有各自的引用），返回释放的数量.
+    """
+    with _spotter_cache_lock:
+        count = len(_spotter_cache)
+        _spotter_cache.clear()
+        return count
+
 
 class WakeWordDetector:
 
@@ -21,7 +124,8 @@ class WakeWordDetector:
         self.audio_codec = None
         self.is_running_flag = False
         self.paused = False
-        self.detection_task = None
+        self.detection_thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
         # 防重复触发机制 - 缩短冷却时间提高响应
         self.last_detection_time = 0
@@ -31,6 +135,37 @@ class WakeWordDetector:
         self.on_detected_callback: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
 
+        # 性能统计（工作线程写入）
+        self._frames_processed = 0
+        self._decode_time = 0.0
+        self._max_decode_time = 0.0
+        self._detections = 0
+        self._suppressed = 0
+        self._latency_count = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._last_latency: Optional[float] = None
+        self._keyword_counts: Dict[str, int] = {}
+        self._last_keyword: Optional[str] = None
+        self._reloads = 0
+        self._last_reload_ms: Optional[float] = None
+        self.model_load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.model_cached = False
+        self.model_init_ms: Optional[float] = None
+
+        # Sherpa-ONNX KWS组件
+        self.keyword_spotter = None
+        self.stream = None
+
+        # 唤醒词列表（运行时可替换，不重新加载模型）
+        self.keywords: List[KeywordEntry] = []
+        self._keywords_spec: Optional[str] = None
+        self._tokens = set()
+        self.keywords_path: Optional[Path] = None
+        self._keywords_mtime: Optional[float] = None
+        self._keywords_checked = 0.0
+
         # 配置检查
         config = ConfigManager.get_instance()
         if not config.get_config("WAKE_WORD_OPTIONS.USE_WAKE_WORD", False):
@@ -42,10 +177,6 @@ class WakeWordDetector:
         self.enabled = True
         self.sample_rate = AudioConfig.INPUT_SAMPLE_RATE
 
-        # Sherpa-ONNX KWS组件
-        self.keyword_spotter = None
-        self.stream = None
-
         # 初始化配置
         self._load_config(config)
         self._init_kws_model()
@@ -83,6 +214,10 @@ class WakeWordDetector:
         self.num_trailing_blanks = config.get_config(
             "WAKE_WORD_OPTIONS.NUM_TRAILING_BLANKS", 1
         )
+        # keywords.txt 修改后自动重新加载唤醒词（不重新加载模型）
+        self.keywords_hot_reload = config.get_config(
+            "WAKE_WORD_OPTIONS.KEYWORDS_HOT_RELOAD", True
+        )
 
         logger.info(
             f"KWS配置加载完成 - 阈值: {self.keywords_threshold}, 分数: {self.keywords_score}"
@@ -113,29 +248,134 @@ class WakeWordDetector:
 
             logger.info(f"加载Sherpa-ONNX KeywordSpotter模型: {self.model_dir}")
 
-            # 创建KeywordSpotter
-            self.keyword_spotter = sherpa_onnx.KeywordSpotter(
-                tokens=str(tokens_path),
-                encoder=str(encoder_path),
-                decoder=str(decoder_path),
-                joiner=str(joiner_path),
-                keywords_file=str(keywords_path),
+            self.keywords_path = keywords_path
+            self._tokens = load_tokens_file(tokens_path)
+            self.keywords = load_keywords_file(keywords_path)
+            self._keywords_mtime = self._get_keywords_mtime()
+            if self.keywords:
+                self._keywords_spec = "/".join(
+                    entry.to_line() for entry in self.keywords
+                )
+
+            # 获取KeywordSpotter（同一进程内相同模型和参数只加载一次）
+            start = time.perf_counter()
+            loaded, self.model_cached = get_keyword_spotter(
+                self.model_dir,
+                self._keywords_spec,
                 num_threads=self.num_threads,
                 sample_rate=self.sample_rate,
-                feature_dim=80,
                 max_active_paths=self.max_active_paths,
                 keywords_score=self.keywords_score,
                 keywords_threshold=self.keywords_threshold,
                 num_trailing_blanks=self.num_trailing_blanks,
                 provider=self.provider,
             )
-
-            logger.info("Sherpa-ONNX KeywordSpotter模型加载成功")
+            self.keyword_spotter = loaded.spotter
+            self.model_load_ms = loaded.load_ms
+            self.warmup_ms = loaded.warmup_ms
+            self.model_init_ms = (time.perf_counter() - start) * 1000
+
+            logger.info(
+                f"Sherpa-ONNX KeywordSpotter模型加载成功"
+                f"（{'复用缓存' if self.model_cached else '新加载'}，"
+                f"{self.model_init_ms:.0f}ms），唤醒词: "
+                f"{', '.join(entry.label for entry in self.keywords)}"
+            )
 
         except Exception as e:
             logger.error(f"Sherpa-ONNX KeywordSpotter初始化失败: {e}", exc_info=True)
             self.enabled = False
 
+    def set_keywords(self, keywords: Iterable[Union[str, KeywordEntry]]) -> bool:
+        """运行时替换唤醒词列表.
+
+        keywords 为 keywords.txt 格式的行或 KeywordEntry，可单独指定每个词的
+        加分（:2.0）和阈值（#0.3）。在已加载的模型上创建新的检测流，只需
+        毫秒级时间；拼音 token 不在模型中的词会被跳过，全部无效时保留原列表。
+        """
+        if not self.keyword_spotter:
+            logger.error("KeywordSpotter未初始化，无法设置唤醒词")
+            return False
+
+        entries = []
+        for keyword in keywords:
+            try:
+                entry = (
+                    parse_keyword_line(keyword) if isinstance(keyword, str) else keyword
+                )
+            except ValueError as e:
+                logger.warning(f"唤醒词格式错误: {e}")
+                continue
+            if entry is None:
+                continue
+            unknown = entry.unknown_tokens(self._tokens) if self._tokens else []
+            if unknown:
+                logger.warning(
+                    f"唤醒词 {entry.label} 包含模型中不存在的token: "
+                    f"{', '.join(unknown)}，已跳过"
+                )
+                continue
+            entries.append(entry)
+
+        if not entries:
+            logger.error("没有有效的唤醒词，保留原唤醒词列表")
+            return False
+
+        start = time.perf_counter()
+        spec = "/".join(entry.to_line() for entry in entries)
+        try:
+            stream = self.keyword_spotter.create_stream(spec)
+        except Exception as e:
+            logger.error(f"创建唤醒词检测流失败: {e}")
+            return False
+
+        self.keywords = entries
+        self._keywords_spec = spec
+        if self.stream is not None:
+            # 工作线程每帧读取一次 self.stream，替换引用即可生效
+            self.stream = stream
+
+        self._reloads += 1
+        self._last_reload_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"唤醒词已更新({self._last_reload_ms:.1f}ms): "
+            f"{', '.join(entry.label for entry in entries)}"
+        )
+        return True
+
+    def reload_keywords(self) -> bool:
+        """
+        重新读取 keywords.txt 并替换唤醒词列表.
+        """
+        if self.keywords_path is None:
+            return False
+        self._keywords_mtime = self._get_keywords_mtime()
+        try:
+            entries = load_keywords_file(self.keywords_path)
+        except OSError as e:
+            logger.error(f"读取唤醒词文件失败: {e}")
+            return False
+        return self.set_keywords(entries)
+
+    def _get_keywords_mtime(self) -> Optional[float]:
+        try:
+            return self.keywords_path.stat().st_mtime
+        except (AttributeError, OSError):
+            return None
+
+    def _check_keywords_file(self):
+        """
+        工作线程中检查 keywords.txt 是否被修改（设置界面、keyword_generator），最多每2秒一次.
+        """
+        now = time.monotonic()
+        if now - self._keywords_checked < 2.0:
+            return
+        self._keywords_checked = now
+        mtime = self._get_keywords_mtime()
+        if mtime is not None and mtime != self._keywords_mtime:
+            logger.info("检测到唤醒词文件变化，重新加载唤醒词")
+            self.reload_keywords()
+
     def on_detected(self, callback: Callable):
         """
         设置检测到唤醒词的回调函数.
@@ -154,125 +394,159 @@ class WakeWordDetector:
             logger.error("KeywordSpotter未初始化")
             return False
 
+        if self.detection_thread and self.detection_thread.is_alive():
+            logger.warning("KWS检测线程已经在运行")
+            return True
+
         try:
             self.audio_codec = audio_codec
+            self._loop = asyncio.get_running_loop()
             self.is_running_flag = True
             self.paused = False
 
-            # 创建检测流
-            self.stream = self.keyword_spotter.create_stream()
+            # 创建检测流（使用当前唤醒词列表，缓存的模型可能由其他列表加载）
+            if self._keywords_spec:
+                self.stream = self.keyword_spotter.create_stream(self._keywords_spec)
+            else:
+                self.stream = self.keyword_spotter.create_stream()
 
-            # 启动检测任务
-            self.detection_task = asyncio.create_task(self._detection_loop())
+            # 启动检测线程：解码在工作线程中进行，不占用事件循环
+            self.detection_thread = threading.Thread(
+                target=self._detection_loop, name="kws_worker", daemon=True
+            )
+            self.detection_thread.start()
 
             logger.info("Sherpa-ONNX KeywordSpotter检测器启动成功")
             return True
         except Exception as e:
             logger.error(f"启动KeywordSpotter检测器失败: {e}")
+            self.is_running_flag = False
             self.enabled = False
             return False
 
-    async def _detection_loop(self):
-        """
-        检测循环.
+    def _detection_loop(self):
+        """检测循环（工作线程）.
+
+        阻塞等待录音回调送来的帧，没有音频时不会被唤醒。
         """
         error_count = 0
         MAX_ERRORS = 5
 
         while self.is_running_flag:
             try:
-                if self.paused:
-                    await asyncio.sleep(0.1)
-                    continue
+                if self.keywords_hot_reload:
+                    self._check_keywords_file()
 
-                if not self.audio_codec:
-                    await asyncio.sleep(0.5)
+                frame = self.audio_codec.get_capture_frame_blocking(timeout=0.5)
+                if frame is None:
                     continue
 
-                # 处理音频数据
-                await self._process_audio()
+                # 暂停时仍取走帧，避免恢复后处理积压的旧音频
+                if self.paused:
+                    frame.release()
+                    continue
 
-                # 减少延迟提高响应速度
-                await asyncio.sleep(0.005)
+                self._process_frame(frame)
                 error_count = 0
 
-            except asyncio.CancelledError:
-                break
             except Exception as e:
                 error_count += 1
                 logger.error(f"KWS检测循环错误({error_count}/{MAX_ERRORS}): {e}")
 
-                # 调用错误回调
+                # 调用错误回调（在事件循环中执行）
                 if self.on_error:
-                    try:
-                        if asyncio.iscoroutinefunction(self.on_error):
-                            await self.on_error(e)
-                        else:
-                            self.on_error(e)
-                    except Exception as callback_error:
-                        logger.error(f"执行错误回调时失败: {callback_error}")
+                    self._call_in_loop(self._run_error_callback(e))
 
                 if error_count >= MAX_ERRORS:
                     logger.critical("达到最大错误次数，停止KWS检测")
+                    self.is_running_flag = False
                     break
-                await asyncio.sleep(1)
+                time.sleep(1)
 
-    async def _process_audio(self):
-        """处理音频数据 - 批量处理优化"""
-        try:
-            if not self.audio_codec or not self.stream:
-                return
-
-            # 批量获取多个音频帧以提高效率
-            audio_batches = []
-            for _ in range(3):  # 一次处理最多3帧
-                data = await self.audio_codec.get_raw_audio_for_detection()
-                if data:
-                    audio_batches.append(data)
-
-            if not audio_batches:
-                return
-
-            # 批量处理音频数据
-            for data in audio_batches:
-                # 转换音频格式
-                if isinstance(data, bytes):
-                    samples = (
-                        np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-                    )
-                else:
-                    samples = np.array(data, dtype=np.float32)
+        logger.info("KWS检测线程已退出")
 
-                # 提供音频数据给KeywordSpotter
-                self.stream.accept_waveform(
-                    sample_rate=self.sample_rate, waveform=samples
-                )
+    def _process_frame(self, frame):
+        """
+        送入一帧音频并解码（工作线程），检测到唤醒词时交给事件循环处理.
+        """
+        # 取到的是录音帧池中的共享帧，转换后立即归还
+        try:
+            timestamp = frame.timestamp
+            samples = frame.pcm.astype(np.float32)
+        finally:
+            frame.release()
+        samples *= 1.0 / 32768.0
+
+        start = time.perf_counter()
+        # 唤醒词列表可能在其他线程被替换，本帧始终使用同一个流
+        stream = self.stream
+        stream.accept_waveform(sample_rate=self.sample_rate, waveform=samples)
+
+        result = None
+        while self.keyword_spotter.is_ready(stream):
+            self.keyword_spotter.decode_stream(stream)
+            result = self.keyword_spotter.get_result(stream)
+            if result:
+                # 重置流状态，检测到后立即处理，不继续解码
+                self.keyword_spotter.reset_stream(stream)
+                break
 
-            # 处理检测结果
-            while self.keyword_spotter.is_ready(self.stream):
-                self.keyword_spotter.decode_stream(self.stream)
-                result = self.keyword_spotter.get_result(self.stream)
+        elapsed = time.perf_counter() - start
+        self._frames_processed += 1
+        self._decode_time += elapsed
+        if elapsed > self._max_decode_time:
+            self._max_decode_time = elapsed
 
-                if result:
-                    await self._handle_detection_result(result)
-                    # 重置流状态
-                    self.keyword_spotter.reset_stream(self.stream)
-                    break  # 检测到后立即处理，不继续批量处理
+        if result:
+            self._call_in_loop(self._handle_detection_result(result, timestamp))
 
-        except Exception as e:
-            logger.debug(f"KWS音频处理错误: {e}")
+    def _call_in_loop(self, coro):
+        """
+        从工作线程把协程交给事件循环执行.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            coro.close()
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+        except RuntimeError:
+            # 事件循环已关闭
+            coro.close()
 
-    async def _handle_detection_result(self, result):
+    async def _run_error_callback(self, error: Exception):
+        try:
+            if asyncio.iscoroutinefunction(self.on_error):
+                await self.on_error(error)
+            else:
+                self.on_error(error)
+        except Exception as callback_error:
+            logger.error(f"执行错误回调时失败: {callback_error}")
+
+    async def _handle_detection_result(self, result, timestamp: float = 0.0):
         """
-        处理检测结果.
+        处理检测结果（事件循环中执行），timestamp 为包含唤醒词末尾的音频帧的采集时间.
         """
         # 防重复触发检查
         current_time = time.time()
         if current_time - self.last_detection_time < self.detection_cooldown:
+            self._suppressed += 1
             return
 
         self.last_detection_time = current_time
 
+        # 检测延迟：音频采集 -> 回调；结果为触发的唤醒词（keywords.txt 中 @ 后的文字）
+        self._detections += 1
+        self._last_keyword = result
+        self._keyword_counts[result] = self._keyword_counts.get(result, 0) + 1
+        if timestamp:
+            latency = time.monotonic() - timestamp
+            self._latency_count += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+            self._last_latency = latency
+            logger.info(f"检测到唤醒词: {result}（延迟 {latency * 1000:.1f}ms）")
+
         # 触发回调
         if self.on_detected_callback:
             try:
@@ -289,12 +563,15 @@ class WakeWordDetector:
         """
         self.is_running_flag = False
 
-        if self.detection_task:
-            self.detection_task.cancel()
-            try:
-                await self.detection_task
-            except asyncio.CancelledError:
-                pass
+        thread = self.detection_thread
+        if thread and thread.is_alive():
+            if self.audio_codec:
+                self.audio_codec.wake_capture_consumer()
+            # 等待当前解码完成，避免关闭后仍访问检测流
+            await asyncio.to_thread(thread.join, 2.0)
+            if thread.is_alive():
+                logger.warning("KWS检测线程未能及时退出")
+        self.detection_thread = None
 
         logger.info("Sherpa-ONNX KeywordSpotter检测器已停止")
 
@@ -350,6 +627,47 @@ class WakeWordDetector:
             "keywords_threshold": self.keywords_threshold,
             "keywords_score": self.keywords_score,
             "is_running": self.is_running(),
+            "keywords": [entry.label for entry in self.keywords],
+            "keyword_detections": dict(self._keyword_counts),
+            "last_keyword": self._last_keyword,
+            # 模型加载/预热耗时（首次加载时测得）与本检测器获取模型的耗时
+            "model_cached": self.model_cached,
+            "model_load_ms": (
+                round(self.model_load_ms, 1) if self.model_load_ms is not None else None
+            ),
+            "warmup_ms": (
+                round(self.warmup_ms, 1) if self.warmup_ms is not None else None
+            ),
+            "model_init_ms": (
+                round(self.model_init_ms, 1) if self.model_init_ms is not None else None
+            ),
+            "keyword_reloads": self._reloads,
+            "last_reload_ms": (
+                round(self._last_reload_ms, 2)
+                if self._last_reload_ms is not None
+                else None
+            ),
+            "frames_processed": self._frames_processed,
+            "avg_decode_ms": (
+                round(self._decode_time / self._frames_processed * 1000, 3)
+                if self._frames_processed
+                else 0.0
+            ),
+            "max_decode_ms": round(self._max_decode_time * 1000, 3),
+            "detections": self._detections,
+            "suppressed": self._suppressed,
+            # 检测延迟：包含唤醒词末尾的音频帧采集时间 -> 回调执行
+            "avg_latency_ms": (
+                round(self._latency_total / self._latency_count * 1000, 1)
+                if self._latency_count
+                else None
+            ),
+            "max_latency_ms": round(self._latency_max * 1000, 1),
+            "last_latency_ms": (
+                round(self._last_latency * 1000, 1)
+                if self._last_latency is not None
+                else None
+            ),
         }
 
     def clear_cache(self):
@@ -14,6 +14,8 @@ import pygame
 import requests
 
 from src.constants.constants import AudioConfig
+from src.mcp.tools.music.music_stream import MusicStream
+from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 from src.utils.resource_finder import get_user_cache_dir
 
@@ -114,9 +116,14 @@ class MusicPlayer:
     只保留核心功能：搜索、播放、暂停、停止、跳转
     """
 
+    # 在 AudioCodec 混音器中的音源名称
+    MIXER_SOURCE = "music"
+
     def __init__(self):
-        # 根据服务器类型优化pygame mixer初始化
-        self._init_pygame_mixer()
+        # 播放方式：优先经 AudioCodec 混音器播放（与TTS共用输出流，TTS时自动闪避），
+        # 没有 ffmpeg 或音频编解码器时回退到 pygame mixer（按需初始化）
+        self._stream: Optional[MusicStream] = None
+        self._pygame_ready = False
 
         # 核心播放状态
         self.current_song = ""
@@ -169,6 +176,9 @@ class MusicPlayer:
         """
         根据服务器类型优化pygame mixer初始化.
         """
+        if self._pygame_ready:
+            return
+        self._pygame_ready = True
         try:
 
             # 预初始化mixer以设置缓冲区
@@ -193,6 +203,94 @@ class MusicPlayer:
                 frequency=AudioConfig.OUTPUT_SAMPLE_RATE, channels=AudioConfig.CHANNELS
             )
 
+    def _get_audio_codec(self):
+        """
+        获取已初始化的音频编解码器（用于混音播放）.
+        """
+        codec = getattr(self.app, "audio_codec", None) if self.app else None
+        if codec is None or codec.output_stream is None:
+            return None
+        return codec
+
+    def _start_playback(self, file_path: Path, position: float = 0.0):
+        """
+        开始播放文件：经混音器流式播放，条件不满足时回退到 pygame.
+        """
+        self._stop_playback()
+
+        codec = self._get_audio_codec()
+        if codec is not None and MusicStream.is_available():
+            gain = ConfigManager.get_instance().get_config(
+                "AUDIO_OPTIONS.MIXER.MUSIC_GAIN", 0.8
+            )
+            source = codec.add_output_source(
+                self.MIXER_SOURCE, gain=gain, duckable=True
+            )
+            self._stream = MusicStream(source, file_path, start=position)
+            self._stream.start()
+            logger.debug(f"音乐经混音器播放: {file_path.name}")
+            return
+
+        if codec is not None:
+            logger.warning("未找到 ffmpeg，音乐回退到 pygame 播放（不支持TTS闪避）")
+        self._init_pygame_mixer()
+        pygame.mixer.music.load(str(file_path))
+        pygame.mixer.music.play(start=position)
+
+    def _stop_playback(self):
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            stream.stop()
+            codec = self._get_audio_codec()
+            # 只移除自己的音源（同名音源可能已被新的播放替换）
+            source = codec.mixer.get_source(self.MIXER_SOURCE) if codec else None
+            if source is stream.source:
+                codec.remove_output_source(self.MIXER_SOURCE)
+        elif self._pygame_ready:
+            pygame.mixer.music.stop()
+
+    def _pause_playback(self):
+        if self._stream is not None:
+            self._stream.pause()
+        else:
+            pygame.mixer.music.pause()
+
+    def _resume_playback(self):
+        if self._stream is not None:
+            self._stream.resume()
+        else:
+            pygame.mixer.music.unpause()
+
+    def _seek_playback(self, position: float):
+        if self._stream is not None:
+            # 流式解码：从新位置重新解码
+            file_path = self._stream.file_path
+            paused = self._stream.paused
+            self._start_playback(file_path, position)
+            if paused and self._stream is not None:
+                self._stream.pause()
+            return
+
+        pygame.mixer.music.rewind()
+        pygame.mixer.music.set_pos(position)
+        if self.paused:
+            pygame.mixer.music.pause()
+
+    def _elapsed(self) -> float:
+        """
+        当前播放位置（秒）：混音器播放时按实际放出的采样计算.
+        """
+        if self._stream is not None:
+            return self._stream.position
+        if self.paused:
+            return self.current_position
+        return time.time() - self.start_play_time
+
+    def _playback_done(self) -> bool:
+        if self._stream is not None:
+            return self._stream.finished
+        return self.total_duration > 0 and self._elapsed() >= self.total_duration
+
     def _initialize_app_reference(self):
         """
         初始化应用程序引用.
@@ -414,13 +512,8 @@ class MusicPlayer:
             if MUTAGEN_AVAILABLE:
                 metadata.extract_metadata()
 
-            # 停止当前播放
-            if self.is_playing:
-                pygame.mixer.music.stop()
-
-            # 加载并播放
-            pygame.mixer.music.load(str(file_path))
-            pygame.mixer.music.play()
+            # 停止当前播放并加载播放
+            self._start_playback(file_path)
 
             # 更新播放状态
             title = metadata.title or "未知标题"
@@ -468,11 +561,12 @@ class MusicPlayer:
         if not self.is_playing or self.paused:
             return self.current_position
 
-        current_pos = min(self.total_duration, time.time() - self.start_play_time)
+        current_pos = min(self.total_duration, self._elapsed())
 
         # 检查是否播放完成
-        if current_pos >= self.total_duration and self.total_duration > 0:
+        if self._playback_done():
             await self._handle_playback_finished()
+            return self.current_position
 
         return current_pos
 
@@ -491,7 +585,7 @@ class MusicPlayer:
         """
         if self.is_playing:
             logger.info(f"歌曲播放完成: {self.current_song}")
-            pygame.mixer.music.stop()
+            self._stop_playback()
             self.is_playing = False
             self.paused = False
             self.current_position = self.total_duration
@@ -543,7 +637,7 @@ class MusicPlayer:
 
             elif self.is_playing and self.paused:
                 # 恢复播放
-                pygame.mixer.music.unpause()
+                self._resume_playback()
                 self.paused = False
                 self.start_play_time = time.time() - self.current_position
 
@@ -558,9 +652,9 @@ class MusicPlayer:
 
             elif self.is_playing and not self.paused:
                 # 暂停播放
-                pygame.mixer.music.pause()
+                self.current_position = self._elapsed()
+                self._pause_playback()
                 self.paused = True
-                self.current_position = time.time() - self.start_play_time
 
                 # 更新UI
                 if self.app and hasattr(self.app, "set_chat_message"):
@@ -587,7 +681,7 @@ class MusicPlayer:
             if not self.is_playing:
                 return {"status": "info", "message": "没有正在播放的歌曲"}
 
-            pygame.mixer.music.stop()
+            self._stop_playback()
             current_song = self.current_song
             self.is_playing = False
             self.paused = False
@@ -615,11 +709,7 @@ class MusicPlayer:
             self.current_position = position
             self.start_play_time = time.time() - position
 
-            pygame.mixer.music.rewind()
-            pygame.mixer.music.set_pos(position)
-
-            if self.paused:
-                pygame.mixer.music.pause()
+            self._seek_playback(position)
 
             # 更新UI
             pos_str = self._format_time(position)
@@ -761,18 +851,13 @@ class MusicPlayer:
         播放指定URL.
         """
         try:
-            # 停止当前播放
-            if self.is_playing:
-                pygame.mixer.music.stop()
-
             # 检查缓存或下载
             file_path = await self._get_or_download_file(url)
             if not file_path:
                 return False
 
-            # 加载并播放
-            pygame.mixer.music.load(str(file_path))
-            pygame.mixer.music.play()
+            # 停止当前播放并加载播放
+            self._start_playback(file_path)
 
             self.current_url = url
             self.is_playing = True
@@ -945,10 +1030,10 @@ class MusicPlayer:
                     await asyncio.sleep(0.5)
                     continue
 
-                current_time = time.time() - self.start_play_time
+                current_time = self._elapsed()
 
                 # 检查是否播放完成
-                if current_time >= self.total_duration:
+                if self._playback_done():
                     await self._handle_playback_finished()
                     break
 
@@ -996,7 +1081,7 @@ class MusicPlayer:
             time_sec, text = self.lyrics[current_index]
 
             # 在歌词前添加时间和进度信息
-            position_str = self._format_time(time.time() - self.start_play_time)
+            position_str = self._format_time(self._elapsed())
             duration_str = self._format_time(self.total_duration)
             display_text = f"[{position_str}/{duration_str}] {text}"
 
@@ -1046,6 +1131,8 @@ class MusicPlayer:
         清理资源.
         """
         try:
+            if self._stream is not None:
+                self._stream.stop()
             # 如果程序正常退出，额外清理一次临时缓存
             self._clean_temp_cache()
         except Exception:
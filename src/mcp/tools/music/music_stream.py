@@ -0,0 +1,169 @@
+"""音乐流式解码.
+
+用 ffmpeg 将音乐文件解码为 24kHz 单声道 PCM，分块写入 AudioCodec 混音器的音源，
+与 TTS 共用同一个输出流播放（TTS 播放时音乐自动闪避）。
+"""
+
+import shutil
+import subprocess
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.audio_codecs.output_mixer import MixerSource
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class MusicStream:
+    """
+    单首歌曲的解码线程：ffmpeg 输出 PCM -> 混音器音源（缓冲满时阻塞，按播放速度解码）.
+    """
+
+    # 每次读取的采样数（200ms）
+    CHUNK_MS = 200
+    # 保留 ffmpeg 最后若干行错误输出，用于解码失败时的日志
+    STDERR_LINES = 20
+
+    def __init__(self, source: MixerSource, file_path: Path, start: float = 0.0):
+        self.source = source
+        self.file_path = Path(file_path)
+        self.start_position = max(0.0, float(start))
+
+        self._process: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stderr_thread: Optional[threading.Thread] = None
+        self._stderr_tail = deque(maxlen=self.STDERR_LINES)
+        self._stopped = False
+        self.error: Optional[str] = None
+
+    @staticmethod
+    def ffmpeg_path() -> Optional[str]:
+        return shutil.which("ffmpeg")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        是否可以流式解码（需要系统安装 ffmpeg）.
+        """
+        return cls.ffmpeg_path() is not None
+
+    @property
+    def position(self) -> float:
+        """
+        当前播放位置（秒），按混音器实际取走的采样计算，暂停时不前进.
+        """
+        return self.start_position + self.source.position
+
+    @property
+    def finished(self) -> bool:
+        return self.source.finished or self.error is not None
+
+    @property
+    def paused(self) -> bool:
+        return self.source.paused
+
+    def start(self):
+        command = [
+            self.ffmpeg_path(),
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-ss",
+            f"{self.start_position:.3f}",
+            "-i",
+            str(self.file_path),
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-ar",
+            str(self.source.sample_rate),
+            "-",
+        ]
+        self._process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        # 持续读取 stderr：管道写满会阻塞 ffmpeg，导致音乐卡住
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, name="MusicDecodeStderr", daemon=True
+        )
+        self._stderr_thread.start()
+        self._thread = threading.Thread(
+            target=self._decode_loop, name="MusicDecode", daemon=True
+        )
+        self._thread.start()
+
+    def _drain_stderr(self):
+        try:
+            for line in self._process.stderr:
+                line = line.decode(errors="ignore").strip()
+                if line:
+                    self._stderr_tail.append(line)
+        except Exception:
+            pass
+
+    def _decode_loop(self):
+        chunk_bytes = self.source.sample_rate * self.CHUNK_MS // 1000 * 2
+        remainder = b""
+        try:
+            while not self._stopped:
+                data = self._process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                data = remainder + data
+                # 保证按整采样（2字节）写入
+                usable = len(data) - len(data) % 2
+                remainder = data[usable:]
+                if not self.source.write(np.frombuffer(data[:usable], np.int16)):
+                    # 音源已关闭（停止/切歌）
+                    return
+
+            if not self._stopped:
+                returncode = self._process.wait()
+                if returncode != 0:
+                    # 进程已退出，等 stderr 读到结尾
+                    self._stderr_thread.join(timeout=1.0)
+                    stderr = "\n".join(self._stderr_tail)
+                    self.error = stderr or f"ffmpeg 退出码 {returncode}"
+                    logger.error(f"音乐解码失败: {self.file_path.name}, {self.error}")
+                self.source.finish()
+        except Exception as e:
+            if not self._stopped:
+                self.error = str(e)
+                logger.error(f"音乐解码线程异常: {e}")
+                self.source.finish()
+
+    def pause(self):
+        self.source.paused = True
+
+    def resume(self):
+        self.source.paused = False
+
+    def stop(self):
+        """
+        停止解码并关闭音源.
+        """
+        self._stopped = True
+        self.source.close()
+        if self._process and self._process.poll() is None:
+            try:
+                self._process.kill()
+            except Exception:
+                pass
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        if self._process:
+            try:
+                self._process.wait(timeout=1.0)
+            except Exception:
+                pass
+            if self._stderr_thread:
+                self._stderr_thread.join(timeout=1.0)
+            for pipe in (self._process.stdout, self._process.stderr):
+                if pipe:
+                    pipe.close()
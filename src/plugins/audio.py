@@ -1,10 +1,22 @@
 import asyncio
 import os
-from typing import Any
+import time
+from typing import Any, Dict
 
+from src.audio_codecs.audio_backend import create_audio_backend
 from src.audio_codecs.audio_codec import AudioCodec
+from src.audio_codecs.pre_roll import EncodedPreRoll
+from src.audio_codecs.uplink_gate import UplinkGate
+from src.audio_codecs.uplink_sender import UplinkItem, UplinkSender
 from src.constants.constants import DeviceState, ListeningMode
 from src.plugins.base import Plugin
+from src.utils.config_manager import ConfigManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 唤醒后超过该时间仍未开始监听（如连接失败），不再补发预录音频
+PRE_ROLL_ARM_TIMEOUT = 10.0
 
 # from src.utils.opus_loader import setup_opus
 # setup_opus()
@@ -18,7 +30,22 @@ class AudioPlugin(Plugin):
         self.app = None  # ApplicationExample
         self.codec: AudioCodec | None = None
         self._loop = None
-        self._send_sem = asyncio.Semaphore(4)
+
+        # 上行发送：单一发送协程按顺序处理录音帧
+        self._uplink: UplinkSender | None = None
+        self._uplink_task: asyncio.Task | None = None
+
+        # 预录：通道打开前编码的帧，开始监听后按节奏补发
+        self._pre_roll: EncodedPreRoll | None = None
+        self._pre_roll_lead = 0.0
+        self._pre_roll_speed = 4.0
+        self._pre_roll_armed_at: float | None = None
+        self._pre_roll_flushes = 0
+        # 补发后队列中积压的实时帧仍按补发节奏发送，直到追上实时
+        self._catching_up = False
+
+        # 上行静音抑制（DTX）
+        self._uplink_gate: UplinkGate | None = None
 
     async def setup(self, app: Any) -> None:
         self.app = app
@@ -28,10 +55,14 @@ class AudioPlugin(Plugin):
             return
 
         try:
-            self.codec = AudioCodec()
+            # 音频后端由 XIAOZHI_AUDIO_BACKEND 选择（默认真实声卡，virtual 为虚拟设备）
+            self.codec = AudioCodec(create_audio_backend())
             await self.codec.initialize()
             # 录音编码后的回调（来自音频线程）
             self.codec.set_encoded_audio_callback(self._on_encoded_audio)
+            self._setup_uplink()
+            self._setup_pre_roll()
+            self._setup_dtx()
             # 暴露给应用，便于唤醒词插件使用
             try:
                 setattr(self.app, "audio_codec", self.codec)
@@ -41,6 +72,7 @@ class AudioPlugin(Plugin):
             self.codec = None
 
     async def start(self) -> None:
+        self._start_uplink()
         if self.codec:
             try:
                 await self.codec.start_streams()
@@ -59,13 +91,6 @@ class AudioPlugin(Plugin):
         # 示例：不处理
         await asyncio.sleep(0)
 
-    async def on_incoming_audio(self, data: bytes) -> None:
-        if self.codec:
-            try:
-                await self.codec.write_audio(data)
-            except Exception:
-                pass
-
     async def stop(self) -> None:
         """
         停止音频流（保留 codec 实例）
@@ -80,6 +105,7 @@ class AudioPlugin(Plugin):
         """
         完全关闭并释放音频资源.
         """
+        self._stop_uplink()
         if self.codec:
             try:
                 # 确保先停止流，再关闭（避免回调还在执行）
@@ -104,40 +130,214 @@ class AudioPlugin(Plugin):
             except Exception:
                 pass
 
+    # -------------------------
+    # 上行发送队列
+    # -------------------------
+    def _setup_uplink(self) -> None:
+        config = ConfigManager.get_instance().get_config("AUDIO_OPTIONS.UPLINK", {})
+        config = config or {}
+        self._uplink = UplinkSender(
+            self._process_uplink_frame,
+            capacity=max(1, int(config.get("QUEUE_SIZE", 100))),
+            policy=config.get("POLICY", "drop_oldest"),
+            block_timeout_ms=config.get("BLOCK_TIMEOUT_MS", 20),
+        )
+
+    def _start_uplink(self) -> None:
+        if self._uplink is None or not self.app:
+            return
+        if self._uplink_task is not None and not self._uplink_task.done():
+            return
+        self._uplink_task = self.app.spawn(self._uplink.run(), "audio:uplink")
+
+    def _stop_uplink(self) -> None:
+        if self._uplink is not None:
+            self._uplink.stop()
+        if self._uplink_task is not None and not self._uplink_task.done():
+            self._uplink_task.cancel()
+        self._uplink_task = None
+
+    def get_uplink_stats(self) -> Dict[str, Any]:
+        """
+        上行发送队列统计：队列深度、丢弃/阻塞次数、提交到发送完成的延迟.
+        """
+        if self._uplink is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._uplink.get_stats()}
+
+    # -------------------------
+    # 预录（唤醒后、通道打开前的音频）
+    # -------------------------
+    def _setup_pre_roll(self) -> None:
+        config = ConfigManager.get_instance().get_config("AUDIO_OPTIONS.PRE_ROLL", {})
+        config = config or {}
+        if not config.get("ENABLED", False):
+            return
+        self._pre_roll = EncodedPreRoll(
+            config.get("DURATION_MS", 2000), self.codec.frame_duration
+        )
+        self._pre_roll_lead = max(0, config.get("LEAD_MS", 200)) / 1000
+        self._pre_roll_speed = max(1.0, float(config.get("FLUSH_SPEED", 4.0)))
+
+    def arm_pre_roll(self) -> None:
+        """
+        唤醒词触发时调用：开始监听后补发从此刻前 LEAD_MS 起缓冲的录音.
+        """
+        if self._pre_roll is None:
+            return
+        self._pre_roll_armed_at = time.monotonic()
+
+    def get_pre_roll_stats(self) -> Dict[str, Any]:
+        """
+        获取预录缓冲与补发统计.
+        """
+        if self._pre_roll is None:
+            return {"enabled": False}
+        stats = self._pre_roll.get_stats()
+        stats.update(
+            {
+                "enabled": True,
+                "armed": self._pre_roll_armed_at is not None,
+                "catching_up": self._catching_up,
+                "flushes": self._pre_roll_flushes,
+            }
+        )
+        return stats
+
+    async def _flush_pre_roll(self) -> None:
+        """按 FLUSH_SPEED 倍实时速度补发预录帧（在发送协程中执行）.
+
+        补发期间新录的帧在上行队列中排队，补发结束后仍按同样节奏发送，
+        队列追上实时（清空）后恢复直接发送。
+        """
+        armed_at = self._pre_roll_armed_at
+        self._pre_roll_armed_at = None
+        if time.monotonic() - armed_at > PRE_ROLL_ARM_TIMEOUT:
+            self._pre_roll.clear()
+            return
+
+        frames = self._pre_roll.drain(since=armed_at - self._pre_roll_lead)
+        if not frames:
+            return
+
+        self._pre_roll_flushes += 1
+        logger.info(
+            f"补发预录音频: {len(frames)} 帧 "
+            f"({len(frames) * self._pre_roll.frame_duration_ms}ms)"
+        )
+        interval = self._pre_roll_interval()
+        for index, encoded_data in enumerate(frames):
+            if not self._can_send_microphone_audio():
+                return
+            await self._send_audio(encoded_data)
+            if index < len(frames) - 1:
+                await asyncio.sleep(interval)
+        self._catching_up = True
+
+    def _pre_roll_interval(self) -> float:
+        return self._pre_roll.frame_duration_ms / 1000 / self._pre_roll_speed
+
+    # -------------------------
+    # 上行静音抑制（DTX）
+    # -------------------------
+    def _setup_dtx(self) -> None:
+        config = ConfigManager.get_instance().get_config("AUDIO_OPTIONS.DTX", {})
+        config = config or {}
+        if not config.get("ENABLED", False):
+            return
+        try:
+            self.codec.enable_capture_vad(
+                True,
+                {
+                    "MODE": config.get("VAD_MODE", 2),
+                    "ENERGY_THRESHOLD": config.get("ENERGY_THRESHOLD", 200),
+                },
+            )
+        except Exception as e:
+            logger.warning(f"上行静音抑制初始化失败，保持连续发送: {e}")
+            return
+        self._uplink_gate = UplinkGate(
+            hangover_ms=config.get("HANGOVER_MS", 1000),
+            pre_roll_ms=config.get("PRE_ROLL_MS", 200),
+            keepalive_ms=config.get("KEEPALIVE_MS", 1000),
+            frame_duration_ms=self.codec.frame_duration,
+        )
+        logger.info("上行静音抑制已启用")
+
+    def get_dtx_stats(self) -> Dict[str, Any]:
+        """
+        上行静音抑制统计：发送/抑制/保活帧数.
+        """
+        if self._uplink_gate is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._uplink_gate.get_stats()}
+
     # -------------------------
     # 内部：发送麦克风音频
     # -------------------------
     def _on_encoded_audio(self, encoded_data: bytes) -> None:
-        # 音频线程回调 -> 切回主loop
+        # 音频线程回调 -> 放入上行队列，由发送协程按顺序处理
         try:
-            if not self.app or not self._loop or not self.app.running:
+            if not self.app or not self.app.running or self._uplink is None:
                 return
-            if self._loop.is_closed():
-                return
-            self._loop.call_soon_threadsafe(self._schedule_send_audio, encoded_data)
+            # 语音判定在编码前为当前帧计算，须在音频线程中同步读取
+            self._uplink.submit(encoded_data, self.codec.capture_voice_active)
         except Exception:
             pass
 
-    def _schedule_send_audio(self, encoded_data: bytes) -> None:
+    async def _process_uplink_frame(self, item: UplinkItem) -> None:
+        """
+        发送协程中逐帧处理：通道未打开时存入预录，打开后先补发预录，再经静音抑制发送.
+        """
+        timestamp, encoded_data, voice = item
         if not self.app or not self.app.running or not self.app.protocol:
             return
 
-        async def _send():
-            async with self._send_sem:
-                # 仅在允许的设备状态下发送麦克风音频
-                try:
-                    if not (
-                        self.app.protocol
-                        and self.app.protocol.is_audio_channel_opened()
-                    ):
-                        return
-                    if self._should_send_microphone_audio():
-                        await self.app.protocol.send_audio(encoded_data)
-                except Exception:
-                    pass
+        gate = self._uplink_gate
+        if not self._can_send_microphone_audio():
+            self._catching_up = False
+            if gate is not None:
+                gate.reset()
+            if self._pre_roll is not None:
+                # 通道未打开或当前不发送：存入预录缓冲
+                self._pre_roll.set_frame_duration(self.codec.frame_duration)
+                self._pre_roll.push(encoded_data, timestamp)
+            return
+
+        if self._pre_roll is not None and self._pre_roll_armed_at is not None:
+            await self._flush_pre_roll()
+
+        # 静音抑制：预录补发的帧不经过这里，全部发送
+        if gate is not None:
+            gate.set_frame_duration(self.codec.frame_duration)
+            frames = gate.process(encoded_data, voice)
+        else:
+            frames = (encoded_data,)
+
+        for data in frames:
+            await self._send_audio(data)
+
+        if self._catching_up:
+            if self._uplink.pending():
+                await asyncio.sleep(self._pre_roll_interval())
+            else:
+                self._catching_up = False
 
-        # 交给应用的任务管理
-        self.app.spawn(_send(), name="audio:send")
+    async def _send_audio(self, encoded_data: bytes) -> None:
+        try:
+            await self.app.protocol.send_audio(encoded_data)
+        except Exception:
+            pass
+
+    def _can_send_microphone_audio(self) -> bool:
+        try:
+            return bool(
+                self.app.protocol
+                and self.app.protocol.is_audio_channel_opened()
+                and self._should_send_microphone_audio()
+            )
+        except Exception:
+            return False
 
     def _should_send_microphone_audio(self) -> bool:
         """与应用状态机对齐：
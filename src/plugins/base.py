@@ -39,7 +39,10 @@ class Plugin:
 
     async def on_incoming_audio(self, data: bytes) -> None:
         """
-        收到音频数据时的通知。
+        收到音频数据（Opus数据包）时的通知。
+
+        播放由 AudioCodec 的解码线程直接处理，不依赖此通知；只有重写了此方法的
+        插件才会收到，且每个数据包都会调度一次，应保持轻量。
         """
         await asyncio.sleep(0)
 
@@ -61,8 +61,21 @@ class PluginManager:
             except Exception:
                 pass
 
+    def has_incoming_audio_listeners(self) -> bool:
+        """
+        是否有插件重写了 on_incoming_audio（没有时应用不为每个音频包调度通知）。
+        """
+        return any(self._incoming_audio_listeners())
+
+    def _incoming_audio_listeners(self) -> List[Plugin]:
+        return [
+            p
+            for p in self._plugins
+            if type(p).on_incoming_audio is not Plugin.on_incoming_audio
+        ]
+
     async def notify_incoming_audio(self, data: bytes) -> None:
-        for p in list(self._plugins):
+        for p in self._incoming_audio_listeners():
             try:
                 await p.on_incoming_audio(data)
             except Exception:
@@ -67,6 +67,10 @@ class WakeWordPlugin(Plugin):
                     if audio_plugin:
                         await audio_plugin.codec.clear_audio_queue()
                 else:
+                    # 补发唤醒后、通道打开前说的话
+                    audio_plugin = self.app.plugins.get_plugin("audio")
+                    if audio_plugin:
+                        audio_plugin.arm_pre_roll()
                     await self.app.start_auto_conversation()
         except Exception:
             pass
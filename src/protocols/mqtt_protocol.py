@@ -3,6 +3,7 @@ import json
 import socket
 import threading
 import time
+from typing import Optional
 
 import paho.mqtt.client as mqtt
 from cryptography.hazmat.backends import default_backend
@@ -18,6 +19,9 @@ logger = get_logger(__name__)
 
 
 class MqttProtocol(Protocol):
+    # 序列号回退不超过该包数时视为乱序迟到包
+    MAX_REORDER_PACKETS = 32
+
     def __init__(self, loop):
         super().__init__()
         self.loop = loop
@@ -311,12 +315,9 @@ class MqttProtocol(Protocol):
                     "mcp": True,
                 },
                 "transport": "udp",
-                "audio_params": {
-                    "format": "opus",
-                    "sample_rate": AudioConfig.OUTPUT_SAMPLE_RATE,
-                    "channels": AudioConfig.CHANNELS,
-                    "frame_duration": AudioConfig.FRAME_DURATION,
-                },
+                "audio_params": self._build_audio_params(
+                    AudioConfig.OUTPUT_SAMPLE_RATE
+                ),
             }
 
             # 发送消息并等待响应
@@ -396,6 +397,7 @@ class MqttProtocol(Protocol):
 
                 # 获取会话ID
                 self.session_id = data.get("session_id", "")
+                self._store_server_audio_params(data)
 
                 # 获取UDP配置
                 udp = data.get("udp")
@@ -470,6 +472,13 @@ class MqttProtocol(Protocol):
                     received_nonce = data[:16]
                     encrypted_audio = data[16:]
 
+                    # nonce 末尾4字节为序列号，据此检测丢包/重复包
+                    sequence = int.from_bytes(received_nonce[12:16], "big")
+                    lost_frames = self._check_remote_sequence(sequence)
+                    if lost_frames is None:
+                        # 重复或迟到的包：对应的帧已被隐藏，直接丢弃
+                        continue
+
                     # 使用AES-CTR解密
                     decrypted = self.aes_ctr_decrypt(
                         bytes.fromhex(self.aes_key), received_nonce, encrypted_audio
@@ -484,7 +493,10 @@ class MqttProtocol(Protocol):
                     # 处理解密后的音频数据
                     if self._on_incoming_audio:
 
-                        def process_audio(audio_data=decrypted):
+                        def process_audio(audio_data=decrypted, lost=lost_frames):
+                            # 先通知丢包，保证隐藏帧排在本包之前
+                            if lost and self._on_audio_loss:
+                                self._on_audio_loss(lost)
                             if asyncio.iscoroutinefunction(self._on_incoming_audio):
                                 coro = self._on_incoming_audio(audio_data)
                                 if coro is not None:
@@ -509,6 +521,30 @@ class MqttProtocol(Protocol):
 
         logger.info("UDP接收线程已停止")
 
+    def _check_remote_sequence(self, sequence: int) -> Optional[int]:
+        """检查下行序列号.
+
+        Returns:
+            本包之前丢失的帧数；重复或乱序迟到的包返回 None
+        """
+        last = self.remote_sequence
+        if not last:
+            self.remote_sequence = sequence
+            return 0
+
+        diff = (sequence - last) & 0xFFFFFFFF
+        if diff == 0:
+            return None
+        if diff >= 0x80000000:
+            # 序列号回退：小幅回退视为乱序迟到，大幅回退视为服务端重新计数
+            if 0x100000000 - diff <= self.MAX_REORDER_PACKETS:
+                return None
+            self.remote_sequence = sequence
+            return 0
+
+        self.remote_sequence = sequence
+        return diff - 1
+
     async def send_text(self, message):
         """
         发送文本消息.
@@ -1,6 +1,6 @@
 import json
 
-from src.constants.constants import AbortReason, ListeningMode
+from src.constants.constants import AbortReason, AudioConfig, ListeningMode
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -9,9 +9,15 @@ logger = get_logger(__name__)
 class Protocol:
     def __init__(self):
         self.session_id = ""
+        # 在 hello 中声明的上行帧长度（打开音频通道前可由编解码器更新）
+        self.frame_duration = AudioConfig.FRAME_DURATION
+        # 服务器 hello 响应中的下行音频参数
+        self.server_audio_params = {}
         # 初始化回调函数为None
         self._on_incoming_json = None
         self._on_incoming_audio = None
+        # 下行音频丢包回调（参数为丢失的帧数）
+        self._on_audio_loss = None
         self._on_audio_channel_opened = None
         self._on_audio_channel_closed = None
         self._on_network_error = None
@@ -19,6 +25,26 @@ class Protocol:
         self._on_connection_state_changed = None
         self._on_reconnecting = None
 
+    def _build_audio_params(self, sample_rate: int) -> dict:
+        """
+        构造 hello 消息中的音频参数.
+        """
+        return {
+            "format": "opus",
+            "sample_rate": sample_rate,
+            "channels": AudioConfig.CHANNELS,
+            "frame_duration": self.frame_duration,
+        }
+
+    def _store_server_audio_params(self, data: dict):
+        """
+        记录服务器 hello 响应中的音频参数（下行采样率、帧长度）.
+        """
+        audio_params = data.get("audio_params")
+        self.server_audio_params = (
+            audio_params if isinstance(audio_params, dict) else {}
+        )
+
     def on_incoming_json(self, callback):
         """
         设置JSON消息接收回调函数.
@@ -31,6 +57,17 @@ class Protocol:
         """
         self._on_incoming_audio = callback
 
+    def on_audio_loss(self, callback):
+        """设置下行音频丢包回调函数.
+
+        Args:
+            callback: 回调函数，接收参数 (lost_frames: int)，
+                在丢包之后的第一个音频包之前调用
+
+        只有能按序号检测丢包的协议（MQTT/UDP）会调用；WebSocket 不调用。
+        """
+        self._on_audio_loss = callback
+
     def on_audio_channel_opened(self, callback):
         """
         设置音频通道打开回调函数.
@@ -116,12 +116,7 @@ class WebsocketProtocol(Protocol):
                     "mcp": True,
                 },
                 "transport": "websocket",
-                "audio_params": {
-                    "format": "opus",
-                    "sample_rate": AudioConfig.INPUT_SAMPLE_RATE,
-                    "channels": AudioConfig.CHANNELS,
-                    "frame_duration": AudioConfig.FRAME_DURATION,
-                },
+                "audio_params": self._build_audio_params(AudioConfig.INPUT_SAMPLE_RATE),
             }
             await self.send_text(json.dumps(hello_message))
 
@@ -374,7 +369,9 @@ class WebsocketProtocol(Protocol):
                         except json.JSONDecodeError as e:
                             logger.error(f"无效的JSON消息: {message}, 错误: {e}")
                     elif isinstance(message, bytes):
-                        # 二进制消息，可能是音频
+                        # 二进制消息，可能是音频；TCP 不丢包、数据包不带序号，
+                        # 不做丢包检测（不调用 _on_audio_loss），晚到由抖动缓冲
+                        # 欠载时的 PLC 补帧处理
                         if self._on_incoming_audio:
                             self._on_incoming_audio(message)
                 except Exception as e:
@@ -482,6 +479,8 @@ class WebsocketProtocol(Protocol):
                 logger.error(f"不支持的传输方式: {transport}")
                 return
 
+            self._store_server_audio_params(data)
+
             # 设置 hello 接收事件
             self.hello_received.set()
 
@@ -36,6 +36,25 @@ class ConfigManager:
             "KEYWORDS_SCORE": 1.8,
             "KEYWORDS_THRESHOLD": 0.2,
             "NUM_TRAILING_BLANKS": 1,
+            # keywords.txt 修改后自动生效，不需要重启
+            "KEYWORDS_HOT_RELOAD": True,
+        },
+        "VAD_OPTIONS": {
+            # VAD后端: webrtc（WebRTC VAD + 能量阈值）/ silero（ONNX 神经网络，
+            # 使用 MODEL / THRESHOLD / NUM_THREADS / PROVIDER；模型需先用
+            # scripts/download_vad_model.py 下载，安装 onnxruntime 时输出语音概率）
+            "BACKEND": "webrtc",
+            "MODE": 3,
+            "FRAME_MS": 20,
+            "ENERGY_THRESHOLD": 300,
+            "TRIGGER_MS": 100,
+            "HANGOVER_MS": 300,
+            "SMOOTHING_MS": 100,
+            "INTERRUPT": True,
+            "MODEL": "models/silero_vad.onnx",
+            "THRESHOLD": 0.5,
+            "NUM_THREADS": 1,
+            "PROVIDER": "cpu",
         },
         "CAMERA": {
             "camera_index": 0,
@@ -60,10 +79,113 @@ class ConfigManager:
         },
         "AEC_OPTIONS": {
             "ENABLED": False,
+            # AEC模式: auto（macOS 用 BlackHole，Linux 用进程内播放参考）/
+            # loopback（进程内播放参考 + WebRTC）/ blackhole / system（系统级）
+            "MODE": "auto",
             "BUFFER_MAX_LENGTH": 200,
             "FRAME_DELAY": 3,
             "FILTER_LENGTH_RATIO": 0.4,
             "ENABLE_PREPROCESS": True,
+            # 独立声卡参考（BlackHole）的对齐：目标缓冲、最大时钟漂移、
+            # 最小流延迟（低于此值时缩小缓冲）、互相关搜索范围
+            "ALIGNMENT": {
+                "TARGET_MS": 20,
+                "MAX_DRIFT_PPM": 1000,
+                "MIN_DELAY_MS": 5,
+                "MAX_DELAY_MS": 250,
+            },
+        },
+        "AUDIO_OPTIONS": {
+            # 录音帧长度: null 使用默认帧长；可固定为 10/20/40/60，或设为 "auto"
+            # 按实测CPU余量选择（仅官方服务器，可能选到更短的帧，改变上行分包）
+            "FRAME_DURATION": None,
+            "JITTER_BUFFER": {
+                "ENABLED": True,
+                "TARGET_DELAY_MS": 60,
+                "MIN_DELAY_MS": 20,
+                "MAX_DELAY_MS": 300,
+                "ADAPTIVE": True,
+            },
+            "RESAMPLER": {
+                # 档位: low_latency / balanced / high_quality
+                "INPUT_PROFILE": "low_latency",
+                "OUTPUT_PROFILE": "low_latency",
+                # 设备支持16kHz/24kHz时直接以该采样率打开，跳过重采样；
+                # AUDIO_DEVICES 中指定了采样率时以指定的为准
+                "PREFER_NATIVE_RATE": True,
+            },
+            "OPUS": {
+                "INBAND_FEC": False,
+                "PACKET_LOSS_PERC": 10,
+                "MAX_CONCEALMENT_MS": 60,
+            },
+            "CAPTURE": {
+                # 录音通道数: 1 / 2~8 / "auto"（设备全部通道），多通道时下混为单声道
+                "CHANNELS": 1,
+                # 下混模式: select（取单个通道）/ average / beamform（线阵延迟求和）
+                "DOWNMIX": "average",
+                "SELECT_CHANNEL": 0,
+                # 波束形成：麦克风间距(米)与目标方向(相对阵列法线的角度)
+                "MIC_SPACING_M": 0.05,
+                "STEER_ANGLE_DEG": 0.0,
+            },
+            "PREPROCESS": {
+                # 录音预处理（AEC之后、编码之前），与AEC相互独立，各级可单独开关；
+                # 开启后会改变上行音频，默认关闭
+                "ENABLED": False,
+                "HIGH_PASS": True,
+                # 降噪级实际运行时接管 AEC 自带的降噪（不会两次降噪）
+                "NOISE_SUPPRESSION": True,
+                # 降噪级别: low / moderate / high / very_high（high 与 AEC 自带降噪相同）
+                "NS_LEVEL": "high",
+                "TRANSIENT_SUPPRESSION": False,
+                # 自适应数字增益：目标电平(-dBFS)与最大压缩增益(dB)；服务端
+                # 也会处理音量，按需开启
+                "AGC": False,
+                "AGC_TARGET_DBFS": 3,
+                "AGC_COMPRESSION_DB": 9,
+            },
+            "PRE_ROLL": {
+                # 唤醒后、音频通道打开前的录音先缓冲（已编码），开始监听后补发；
+                # 会改变服务端收到的音频，默认关闭
+                "ENABLED": False,
+                "DURATION_MS": 2000,
+                # 从唤醒词检测时刻往前多补发的时长（覆盖检测延迟，会带上唤醒词末尾）
+                "LEAD_MS": 200,
+                # 补发速度（实时的倍数），追上实时后恢复直接发送
+                "FLUSH_SPEED": 4.0,
+            },
+            "DTX": {
+                # 上行静音抑制：监听中的静音帧不发送，节省带宽和服务端算力
+                "ENABLED": False,
+                # 语音结束后继续发送的时长；自动停止模式下须大于服务端
+                # 判定说话结束所需的静音时长，否则服务端收不到结束静音
+                "HANGOVER_MS": 1000,
+                # 恢复发送时补发的静音期最后一段（覆盖VAD起始延迟）
+                "PRE_ROLL_MS": 200,
+                # 静音期间每隔该时长发送一帧保活，0 表示不发送
+                "KEEPALIVE_MS": 1000,
+                "VAD_MODE": 2,
+                "ENERGY_THRESHOLD": 200,
+            },
+            "UPLINK": {
+                # 上行发送队列容量（帧），由单一发送协程按顺序发送
+                "QUEUE_SIZE": 100,
+                # 队列写满时：drop_oldest 丢弃最旧帧；block 录音线程等待
+                # BLOCK_TIMEOUT_MS 后仍满再丢弃最旧帧
+                "POLICY": "drop_oldest",
+                "BLOCK_TIMEOUT_MS": 20,
+            },
+            "MIXER": {
+                # 播放混音：TTS、音乐与提示音经同一个输出流播放
+                "TTS_GAIN": 1.0,
+                "MUSIC_GAIN": 0.8,
+                # TTS 播放时音乐降到 DUCK_GAIN，结束并保持 HOLD 后恢复
+                "DUCK_GAIN": 0.2,
+                "DUCK_ATTACK_MS": 50,
+                "DUCK_RELEASE_MS": 400,
+                "DUCK_HOLD_MS": 300,
+            },
         },
         "AUDIO_DEVICES": {
             "input_device_id": None,
@@ -14,6 +14,7 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from src.audio_codecs.device_cache import AudioDeviceCache
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 
@@ -33,6 +34,7 @@ class AudioWidget(QWidget):
         super().__init__(parent)
         self.logger = get_logger(__name__)
         self.config_manager = ConfigManager.get_instance()
+        self.device_cache = AudioDeviceCache.get_instance()
 
         # UI控件引用
         self.ui_controls = {}
@@ -118,7 +120,7 @@ class AudioWidget(QWidget):
             )
 
         if self.ui_controls["scan_devices_btn"]:
-            self.ui_controls["scan_devices_btn"].clicked.connect(self._scan_devices)
+            self.ui_controls["scan_devices_btn"].clicked.connect(self._rescan_devices)
 
     def _on_input_device_changed(self):
         """
@@ -171,9 +173,22 @@ class AudioWidget(QWidget):
         except Exception as e:
             self.logger.error(f"更新设备信息失败: {e}", exc_info=True)
 
+    def _rescan_devices(self):
+        """
+        手动重新扫描：刷新设备缓存（参数变化的设备会重新探测）后再扫描.
+
+        音频流运行中不能重新初始化 PortAudio，新插入的设备需重启应用后才会出现。
+        """
+        try:
+            self.device_cache.refresh()
+            self._append_status("已刷新设备缓存（新插入的设备需重启应用后显示）")
+        except Exception as e:
+            self.logger.warning(f"刷新音频设备缓存失败: {e}")
+        self._scan_devices()
+
     def _scan_devices(self):
         """
-        扫描音频设备.
+        扫描音频设备（读取设备缓存，不重复枚举）.
         """
         try:
             self._append_status("正在扫描音频设备...")
@@ -183,11 +198,15 @@ class AudioWidget(QWidget):
             self.output_devices.clear()
 
             # 获取系统默认设备
-            default_input = sd.default.device[0] if sd.default.device else None
-            default_output = sd.default.device[1] if sd.default.device else None
+            default_input_info = self.device_cache.default_device("input")
+            default_output_info = self.device_cache.default_device("output")
+            default_input = default_input_info["index"] if default_input_info else None
+            default_output = (
+                default_output_info["index"] if default_output_info else None
+            )
 
             # 扫描所有设备
-            devices = sd.query_devices()
+            devices = self.device_cache.devices()
             for i, dev_info in enumerate(devices):
                 device_name = dev_info["name"]
 
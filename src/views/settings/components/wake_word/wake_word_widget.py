@@ -11,6 +11,13 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from src.audio_processing.keywords import (
+    format_display_line,
+    load_keywords_file,
+    parse_display_line,
+    parse_keyword_line,
+    save_keywords_file,
+)
 from src.utils.config_manager import ConfigManager
 from src.utils.logging_config import get_logger
 from src.utils.resource_finder import get_project_root, resource_finder
@@ -222,7 +229,7 @@ class WakeWordWidget(QWidget):
 
     def _load_keywords_from_file(self) -> str:
         """
-        从 keywords.txt 文件加载唤醒词，只显示中文部分.
+        从 keywords.txt 文件加载唤醒词，显示中文部分（以及单独设置的 :加分 #阈值）.
         """
         try:
             # 获取配置的模型路径
@@ -243,14 +250,10 @@ class WakeWordWidget(QWidget):
                 self.logger.warning(f"关键词文件不存在: {keywords_file}")
                 return ""
 
-            keywords = []
-            with open(keywords_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and "@" in line and not line.startswith("#"):
-                        # 只提取@后面的中文部分显示
-                        chinese_part = line.split("@", 1)[1].strip()
-                        keywords.append(chinese_part)
+            keywords = [
+                format_display_line(entry)
+                for entry in load_keywords_file(keywords_file)
+            ]
 
             return "\n".join(keywords)
 
@@ -317,6 +320,9 @@ class WakeWordWidget(QWidget):
     def _save_keywords_to_file(self, keywords_text: str):
         """
         保存唤醒词到 keywords.txt 文件，自动将中文转换为拼音格式.
+
+        每行一个中文唤醒词，可在后面附加 ":2.0"（加分）和 "#0.3"（阈值）单独调整该词；
+        运行中的唤醒词检测会自动加载新文件，无需重启.
         """
         try:
             # 检查pypinyin是否可用
@@ -351,22 +357,28 @@ class WakeWordWidget(QWidget):
             # 处理输入的关键词文本（每行一个中文）
             lines = [line.strip() for line in keywords_text.split("\n") if line.strip()]
 
-            processed_lines = []
-            for chinese_text in lines:
+            entries = []
+            for line in lines:
+                chinese_text, boost, threshold = parse_display_line(line)
                 # 自动转换为拼音格式
                 keyword_line = self._chinese_to_keyword_format(chinese_text)
-                processed_lines.append(keyword_line)
-
-            # 写入文件
-            with open(keywords_file, "w", encoding="utf-8") as f:
-                f.write("\n".join(processed_lines) + "\n")
-
-            self.logger.info(f"成功保存 {len(processed_lines)} 个关键词到 {keywords_file}")
+                entry = parse_keyword_line(keyword_line)
+                if entry is None:
+                    self.logger.warning(f"跳过无法转换的唤醒词: {chinese_text}")
+                    continue
+                entry.boost = boost
+                entry.threshold = threshold
+                entries.append(entry)
+
+            # 写入文件（整体替换，运行中的检测器不会读到半个文件）
+            save_keywords_file(keywords_file, entries)
+
+            self.logger.info(f"成功保存 {len(entries)} 个关键词到 {keywords_file}")
             QMessageBox.information(
                 self,
                 "保存成功",
-                f"成功保存 {len(processed_lines)} 个唤醒词\n\n"
-                f"已自动转换为拼音格式",
+                f"成功保存 {len(entries)} 个唤醒词\n\n"
+                f"已自动转换为拼音格式，唤醒词检测会自动使用新的唤醒词",
             )
 
         except Exception as e:
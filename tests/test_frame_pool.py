@@ -0,0 +1,116 @@
+import asyncio
+
+import numpy as np
+
+from src.audio_codecs.frame_channel import FrameChannel
+from src.audio_codecs.frame_pool import AudioFramePool, PooledFrame
+
+
+def test_acquire_release_recycles_without_allocation():
+    pool = AudioFramePool(160, count=2)
+
+    for _ in range(10):
+        frame = pool.acquire()
+        frame.release()
+
+    stats = pool.get_stats()
+    assert stats["acquired"] == 10
+    assert stats["recycled"] == 10
+    assert stats["runtime_allocations"] == 0
+    assert stats["in_use"] == 0
+
+
+def test_frame_returns_to_pool_after_last_reference():
+    pool = AudioFramePool(160, count=1)
+    frame = pool.acquire()
+    frame.retain()
+    frame.retain()
+
+    frame.release()
+    frame.release()
+    assert pool.get_stats()["in_use"] == 1
+
+    frame.release()
+    stats = pool.get_stats()
+    assert stats["in_use"] == 0
+    assert stats["recycled"] == 1
+
+
+def test_exhausted_pool_counts_runtime_allocations():
+    pool = AudioFramePool(160, count=1)
+    first = pool.acquire()
+    second = pool.acquire()
+
+    stats = pool.get_stats()
+    assert stats["runtime_allocations"] == 1
+    assert stats["allocated"] == 2
+
+    first.release()
+    second.release()
+    assert pool.get_stats()["free"] == 2
+
+
+def test_pcm_is_view_of_pooled_buffer():
+    pool = AudioFramePool(160, count=1)
+    frame = pool.acquire(length=100)
+
+    frame.pcm[:] = 7
+    assert np.shares_memory(frame.pcm, frame.samples)
+    assert frame.samples[99] == 7 and frame.samples[100] == 0
+    assert frame.nbytes == 100 * np.dtype(np.int16).itemsize
+    assert bytes(frame.memoryview()) == frame.samples[:100].tobytes()
+    frame.release()
+
+
+def test_consumer_path_releases_frames():
+    pool = AudioFramePool(160, count=4)
+    channel = FrameChannel(4, on_drop=PooledFrame.release)
+
+    for _ in range(3):
+        frame = pool.acquire()
+        # 生产者交给消费者一个引用后释放自己的引用
+        channel.put_nowait(frame.retain())
+        frame.release()
+    assert pool.get_stats()["in_use"] == 3
+
+    async def consume():
+        for _ in range(3):
+            (await channel.get()).release()
+
+    asyncio.run(consume())
+    stats = pool.get_stats()
+    assert stats["in_use"] == 0
+    assert stats["recycled"] == 3
+
+
+def test_drop_paths_release_frames():
+    pool = AudioFramePool(160, count=8)
+    channel = FrameChannel(2, on_drop=PooledFrame.release)
+
+    # 写满后继续写入：被挤掉的最旧帧归还帧池
+    for _ in range(5):
+        channel.put_nowait(pool.acquire())
+    assert channel.get_stats()["dropped"] == 3
+    assert pool.get_stats()["in_use"] == 2
+
+    # 清空通道：剩余帧全部归还
+    assert channel.clear() == 2
+    stats = pool.get_stats()
+    assert stats["in_use"] == 0
+    assert stats["recycled"] == 5
+    assert stats["runtime_allocations"] == 0
+
+
+def test_closed_channel_releases_late_frames():
+    pool = AudioFramePool(160, count=4)
+    channel = FrameChannel(4, on_drop=PooledFrame.release)
+    channel.put_nowait(pool.acquire())
+
+    assert channel.close() == 1
+    # 关闭后生产者（持有旧快照的录音回调）写入的帧直接归还
+    channel.put_nowait(pool.acquire())
+    stats = pool.get_stats()
+    assert channel.closed
+    assert channel.qsize() == 0
+    assert stats["in_use"] == 0
+    assert stats["recycled"] == 2
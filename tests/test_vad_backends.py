@@ -0,0 +1,148 @@
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.audio_processing.vad_backends import SileroVADBackend, create_vad_backend
+
+MODEL = Path(__file__).parent.parent / "models" / "silero_vad.onnx"
+
+
+class FakeSession:
+    """模拟 silero_vad.onnx：概率取窗口平均幅度，输出状态为输入状态加1."""
+
+    def __init__(self, path, sess_options=None, providers=None):
+        self.providers = providers
+        self.calls = []
+
+    def run(self, output_names, feeds):
+        self.calls.append({name: np.array(value) for name, value in feeds.items()})
+        probability = np.abs(feeds["input"][:, -512:]).mean(axis=1, keepdims=True)
+        return [probability.astype(np.float32), feeds["state"] + 1]
+
+
+class FakeVadModel:
+    """模拟 sherpa_onnx 1.12.x：is_speech() 要求输入长度等于 window_size()."""
+
+    def __init__(self, config):
+        self.config = config
+        self.lengths = []
+        self.resets = 0
+
+    def window_size(self):
+        return self.config.silero_vad.window_size + 64
+
+    def is_speech(self, samples):
+        self.lengths.append(len(samples))
+        assert len(samples) == self.window_size()
+        return bool(np.abs(samples[-512:]).mean() > 0.1)
+
+    def reset(self):
+        self.resets += 1
+
+
+class FakeVadModelConfig:
+    def __init__(self):
+        self.silero_vad = types.SimpleNamespace()
+
+    def validate(self):
+        # 与 sherpa_onnx 一致：最短时长必须为正
+        silero = self.silero_vad
+        return silero.min_speech_duration > 0 and silero.min_silence_duration > 0
+
+
+@pytest.fixture
+def fake_onnxruntime(monkeypatch):
+    module = types.ModuleType("onnxruntime")
+    module.SessionOptions = types.SimpleNamespace
+    module.InferenceSession = FakeSession
+    monkeypatch.setitem(sys.modules, "onnxruntime", module)
+    return module
+
+
+@pytest.fixture
+def fake_sherpa_onnx(monkeypatch):
+    module = types.ModuleType("sherpa_onnx")
+    module.VadModelConfig = FakeVadModelConfig
+    module.VadModel = types.SimpleNamespace(create=FakeVadModel)
+    # 模拟未安装 onnxruntime
+    monkeypatch.setitem(sys.modules, "onnxruntime", None)
+    monkeypatch.setitem(sys.modules, "sherpa_onnx", module)
+    return module
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    path = tmp_path / "silero_vad.onnx"
+    path.touch()
+    return path
+
+
+def windows(*levels) -> np.ndarray:
+    return np.stack([np.full(512, level, dtype=np.int16) for level in levels])
+
+
+def test_silero_backend_does_not_fall_back_to_webrtc(fake_onnxruntime, model_file):
+    backend = create_vad_backend({"BACKEND": "silero", "MODEL": str(model_file)}, 16000)
+
+    assert isinstance(backend, SileroVADBackend)
+    assert backend.runtime == "onnxruntime"
+    assert backend.frame_size == 512
+
+
+def test_onnxruntime_threads_state_and_context(fake_onnxruntime, model_file):
+    backend = SileroVADBackend({"MODEL": str(model_file)}, 16000)
+    probabilities = backend.process(windows(8192, 16384, 0))
+    calls = backend._session.calls
+
+    assert np.allclose(probabilities, [0.25, 0.5, 0.0])
+    # 每次推理的状态是上一次输出的状态
+    assert [call["state"][0, 0, 0] for call in calls] == [0, 1, 2]
+    assert calls[0]["state"].shape == (2, 1, 128)
+    assert all(call["sr"] == 16000 for call in calls)
+    # 输入为 64 个上下文采样 + 512 个新采样，上下文来自上一窗口末尾
+    assert calls[0]["input"].shape == (1, 576)
+    assert np.all(calls[0]["input"][0, :64] == 0)
+    assert np.allclose(calls[1]["input"][0, :64], 0.25)
+    assert np.allclose(calls[2]["input"][0, :64], 0.5)
+
+    # reset 后状态和上下文清零
+    backend.reset()
+    backend.process(windows(8192))
+    assert calls[3]["state"][0, 0, 0] == 0
+    assert np.all(calls[3]["input"][0, :64] == 0)
+
+
+def test_sherpa_onnx_runtime_feeds_full_window(fake_sherpa_onnx, model_file):
+    backend = SileroVADBackend({"MODEL": str(model_file)}, 16000)
+
+    assert backend.runtime == "sherpa_onnx"
+    assert backend.frame_size == 512
+    decisions = backend.process(windows(0, 16384, 0))
+    assert decisions.tolist() == [0.0, 1.0, 0.0]
+    assert backend.model.lengths == [576, 576, 576]
+    backend.reset()
+    assert backend.model.resets == 1
+
+
+def test_unsupported_sample_rate_is_rejected(fake_onnxruntime, model_file):
+    with pytest.raises(ValueError):
+        SileroVADBackend({"MODEL": str(model_file)}, 44100)
+
+
+@pytest.mark.skipif(not MODEL.exists(), reason="缺少 silero_vad.onnx 模型")
+def test_real_model_outputs_probabilities():
+    pytest.importorskip("onnxruntime")
+    backend = SileroVADBackend({"MODEL": str(MODEL)}, 16000)
+
+    silence = backend.process(np.zeros((10, 512), dtype=np.int16))
+    assert np.all(silence < backend.threshold)
+
+    noise = np.random.default_rng(0).normal(0, 3000, (20, 512)).astype(np.int16)
+    backend.reset()
+    probabilities = backend.process(noise)
+    assert np.all((probabilities >= 0.0) & (probabilities <= 1.0))
+    backend.reset()
+    assert np.allclose(backend.process(noise), probabilities, atol=1e-5)